@@ -0,0 +1,65 @@
+# benchmarks/bench_crawler.py
+
+import sys
+import os
+import threading
+import time
+import contextlib
+import io
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crawler import WebCrawler
+
+# Simulated server response time per page
+LATENCY = 0.05
+
+
+class SyntheticWiki(BaseHTTPRequestHandler):
+    """
+    /wiki/Page_N links to pages 2N and 2N + 1, a binary tree of articles
+    """
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        number = int(self.path.rsplit('_', 1)[1])
+        links = ''.join(f'<a href="/wiki/Page_{child}">Page {child}</a> ' for child in (2 * number, 2 * number + 1))
+        body = (f'<html><body><h1 id="firstHeading">Page {number}</h1><div id="mw-content-text">'
+                f'<p>Article number {number} about search engines.</p><p>{links}</p></div></body></html>').encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_benchmark(max_pages=100):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SyntheticWiki)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"Local server, {LATENCY * 1000:.0f} ms per page, {max_pages} pages, no rate limit")
+    results = {}
+    try:
+        for workers in [1, 4, 16]:
+            crawler = WebCrawler(base_url=base_url, max_workers=workers, requests_per_second=0)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                documents = crawler.crawl_wikipedia_pages([base_url + '/wiki/Page_1'],
+                                                          max_pages=max_pages, max_depth=10)
+            seconds = time.perf_counter() - start
+            results[workers] = seconds
+            print(f"{workers:>3} workers: {len(documents)} pages in {seconds:6.2f}s "
+                  f"({len(documents) / seconds:6.1f} pages/sec)")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
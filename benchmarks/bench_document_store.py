@@ -0,0 +1,66 @@
+# benchmarks/bench_document_store.py
+
+import sys
+import os
+import random
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.document_store import DocumentStore
+from benchmarks.common import generate_documents
+
+
+def add_links(documents, internal_links=20, external_links=10, seed=17):
+    """
+    Give every document links to other documents and to pages outside the corpus
+    """
+    rng = random.Random(seed)
+    doc_ids = list(documents)
+    for document in documents.values():
+        links = {documents[doc_id]['url'] for doc_id in rng.sample(doc_ids, internal_links)}
+        links.update(f"https://example.org/wiki/External_{rng.randrange(50000)}"
+                     for _ in range(external_links))
+        document['links'] = links
+
+
+def time_lookups(get, doc_ids):
+    start = time.perf_counter()
+    for doc_id in doc_ids:
+        get(doc_id)
+    return (time.perf_counter() - start) / len(doc_ids)
+
+
+def run_benchmark(num_documents=100000, document_length=200):
+    tracemalloc.start()
+    documents = generate_documents(num_documents, document_length)
+    add_links(documents)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    store = DocumentStore(documents)
+    store_bytes = tracemalloc.get_traced_memory()[0] - dict_bytes
+    tracemalloc.stop()
+
+    stats = store.stats()
+    content_bytes = sum(len(document['content']) for document in documents.values())
+    print(f"Synthetic corpus: {num_documents} documents, {document_length} tokens each, "
+          f"30 links per document")
+    # tracemalloc counts Python allocations still held, not resident memory
+    print("Memory (traced Python allocations):")
+    print(f"{'dict of dicts':>16}: {dict_bytes / 2**20:8.1f} MB")
+    print(f"{'document store':>16}: {store_bytes / 2**20:8.1f} MB  ({dict_bytes / store_bytes:.1f}x smaller; "
+          f"content {content_bytes / stats['compressed_content_bytes']:.1f}x compressed)")
+
+    rng = random.Random(0)
+    doc_ids = rng.sample(sorted(documents), 10000)
+    results = {'dict_bytes': dict_bytes, 'store_bytes': store_bytes}
+    for field in ['title', 'content']:
+        dict_seconds = time_lookups(lambda doc_id: documents[doc_id][field], doc_ids)
+        store_seconds = time_lookups(lambda doc_id: store.get_field(doc_id, field), doc_ids)
+        results[f"{field}_seconds"] = store_seconds
+        print(f"{field:>16}: dict {dict_seconds * 1e6:6.2f} us, store {store_seconds * 1e6:6.2f} us per lookup")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
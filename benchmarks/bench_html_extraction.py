@@ -0,0 +1,76 @@
+# benchmarks/bench_html_extraction.py
+
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crawler import WebCrawler
+from benchmarks.common import generate_vocabulary
+
+BASE_URL = 'https://en.wikipedia.org'
+
+
+def generate_page(rng, vocabulary, paragraphs=150, words_per_paragraph=60):
+    """
+    Markup shaped like a Wikipedia article: chrome around the content,
+    an infobox, paragraphs with links, citations and inline markup
+    """
+    parts = ['<!DOCTYPE html><html><head><title>Page</title>',
+             '<script>' + 'var x = 1; ' * 500 + '</script>',
+             '<link rel="stylesheet" href="/style.css"></head><body>',
+             '<div id="mw-navigation">' + '<li><a href="/wiki/Special:Nav">Nav</a></li>' * 100 + '</div>',
+             '<h1 id="firstHeading" class="firstHeading"><span class="mw-page-title-main">'
+             f'{rng.choice(vocabulary).title()}</span></h1>',
+             '<div id="mw-content-text" class="mw-body-content"><div class="mw-parser-output">',
+             '<table class="infobox">' + '<tr><th>Key</th><td>Value &amp; more</td></tr>' * 20 + '</table>']
+    for number in range(paragraphs):
+        words = []
+        for _ in range(words_per_paragraph):
+            word = rng.choice(vocabulary)
+            roll = rng.random()
+            if roll < 0.05:
+                word = f'<a href="/wiki/{word.title()}" title="{word}">{word}</a>'
+            elif roll < 0.07:
+                word = f'<b>{word}</b>'
+            elif roll < 0.08:
+                word = f'{word}&#160;&ndash;'
+            words.append(word)
+        citation = f'<sup id="cite_ref-{number}" class="reference"><a href="#cite_note-{number}">[{number}]</a></sup>'
+        parts.append(f'<p>{" ".join(words)}{citation}</p>\n')
+    parts.append('</div></div><div id="footer">' + '<p>Footer text</p>' * 20 + '</div></body></html>')
+    return ''.join(parts)
+
+
+def time_extraction(crawler, pages):
+    start = time.perf_counter()
+    extracted = [crawler.extract_page(markup, url) for url, markup in pages]
+    return time.perf_counter() - start, extracted
+
+
+def run_benchmark(num_pages=40, paragraphs=150):
+    rng = random.Random(0)
+    vocabulary = generate_vocabulary(20000)
+    pages = [(f'{BASE_URL}/wiki/Page_{number}', generate_page(rng, vocabulary, paragraphs))
+             for number in range(num_pages)]
+    total_bytes = sum(len(markup.encode('utf-8')) for _, markup in pages)
+    print(f"Synthetic pages: {num_pages} pages, {total_bytes / num_pages / 1024:.0f} KB each")
+
+    results = {}
+    outputs = {}
+    for extractor in ['soup', 'stream']:
+        crawler = WebCrawler(BASE_URL, extractor=extractor)
+        seconds, outputs[extractor] = time_extraction(crawler, pages)
+        results[f"{extractor}_pages_per_second"] = num_pages / seconds
+        print(f"{extractor:>8}: {num_pages / seconds:7.1f} pages/sec  "
+              f"({total_bytes / seconds / 2**20:5.1f} MB/s)")
+    assert outputs['soup'] == outputs['stream'], "extractors disagree"
+    results['speedup'] = results['stream_pages_per_second'] / results['soup_pages_per_second']
+    print(f"Speedup: {results['speedup']:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,52 @@
+# benchmarks/bench_index_file.py
+
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.index_file import write_index, MappedIndex
+from benchmarks.common import generate_token_streams, to_word_positions, time_call
+
+
+def build_trie(streams):
+    trie = Trie()
+    for doc_id, tokens in streams.items():
+        trie.insert_document(doc_id, to_word_positions(tokens))
+    return trie
+
+
+def run_benchmark(num_documents=200, document_length=5000, vocabulary_size=5000):
+    streams = generate_token_streams(num_documents, document_length, vocabulary_size)
+    documents = {
+        doc_id: {'title': f"Document {doc_id}", 'url': f"https://example.org/{doc_id}",
+                 'content': ' '.join(tokens), 'links': set()}
+        for doc_id, tokens in streams.items()
+    }
+    query = streams[1][:2]
+
+    print(f"Synthetic corpus: {num_documents} documents, "
+          f"{document_length} tokens each, vocabulary {vocabulary_size}")
+
+    trie, build_time = time_call(build_trie, streams)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'index.bin')
+        _, write_time = time_call(write_index, path, trie, documents)
+        index, open_time = time_call(MappedIndex, path)
+        matches, query_time = time_call(index.intersection_search, query)
+        size = os.path.getsize(path)
+        del matches
+        index.close()
+
+    print(f"Build trie in memory : {build_time * 1000:10.1f} ms")
+    print(f"Write index file     : {write_time * 1000:10.1f} ms  ({size / 2**20:.2f} MB)")
+    print(f"Open mapped index    : {open_time * 1000:10.3f} ms")
+    print(f"First query {query}: {query_time * 1000:10.3f} ms")
+    return {'build_seconds': build_time, 'write_seconds': write_time,
+            'open_seconds': open_time, 'first_query_seconds': query_time}
+
+
+if __name__ == "__main__":
+    run_benchmark()
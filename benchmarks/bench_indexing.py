@@ -0,0 +1,55 @@
+# benchmarks/bench_indexing.py
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from benchmarks.common import generate_token_streams, to_word_positions, time_call
+
+
+def index_per_position(corpus):
+    """
+    Index one posting at a time with Trie.insert
+    """
+    trie = Trie()
+    for doc_id, word_positions in corpus.items():
+        for word, positions in word_positions.items():
+            for position in positions:
+                trie.insert(word, doc_id, position)
+    return trie
+
+
+def index_bulk(corpus):
+    """
+    Index one document at a time with Trie.insert_document
+    """
+    trie = Trie()
+    for doc_id, word_positions in corpus.items():
+        trie.insert_document(doc_id, word_positions)
+    return trie
+
+
+def run_benchmark(num_documents=200, document_length=5000, vocabulary_size=5000):
+    streams = generate_token_streams(num_documents, document_length, vocabulary_size)
+    corpus = {doc_id: to_word_positions(tokens) for doc_id, tokens in streams.items()}
+    total_tokens = num_documents * document_length
+
+    print(f"Synthetic corpus: {num_documents} documents, "
+          f"{document_length} tokens each, vocabulary {vocabulary_size}")
+
+    results = {}
+    for name, build in [('per-position insert', index_per_position),
+                        ('bulk insert_document', index_bulk)]:
+        trie, elapsed = time_call(build, corpus)
+        results[name] = total_tokens / elapsed
+        print(f"{name:>22}: {elapsed:8.3f}s  {results[name]:12,.0f} tokens/sec")
+
+    speedup = results['bulk insert_document'] / results['per-position insert']
+    print(f"Speedup: {speedup:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,64 @@
+# benchmarks/bench_intersection.py
+
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.postings import intersect_sorted
+from benchmarks.common import generate_token_streams, to_word_positions
+
+
+def set_intersection(occurrence_lists):
+    """
+    The previous approach: materialise every doc-id list as a set
+    """
+    return set.intersection(*(set(occurrence_list.doc_ids()) for occurrence_list in occurrence_lists))
+
+
+def time_queries(intersect, queries, rounds=20):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for occurrence_lists in queries:
+            intersect(occurrence_lists)
+    return (time.perf_counter() - start) / (rounds * len(queries))
+
+
+def run_benchmark(num_documents=20000, document_length=100, vocabulary_size=20000):
+    streams = generate_token_streams(num_documents, document_length, vocabulary_size)
+    trie = Trie()
+    for doc_id, tokens in streams.items():
+        trie.insert_document(doc_id, to_word_positions(tokens))
+    frozen = trie.freeze()
+
+    by_frequency = sorted(frozen.iter_terms(), key=lambda item: len(item[1]), reverse=True)
+    common = [occurrence_list for _, occurrence_list in by_frequency[:5]]
+    medium = [occurrence_list for _, occurrence_list in by_frequency[200:205]]
+    rare = [occurrence_list for _, occurrence_list in by_frequency[3000:3005]]
+
+    query_mixes = {
+        'rare + common': [[r, c] for r, c in zip(rare, common)],
+        'medium + common': [[m, c] for m, c in zip(medium, common)],
+        'common + common': [[common[i], common[i + 1]] for i in range(4)],
+        'rare + medium + 2 common': [[r, m, common[0], common[1]] for r, m in zip(rare, medium)],
+    }
+
+    print(f"Synthetic corpus: {num_documents} documents, {document_length} tokens each")
+    print(f"Document frequency: common ~{len(common[0])}, medium ~{len(medium[0])}, rare ~{len(rare[0])}")
+    print(f"{'query mix':>26} {'sets':>10} {'rarest-1st':>10} {'speedup':>8}")
+
+    results = {}
+    for name, queries in query_mixes.items():
+        for occurrence_lists in queries:
+            assert set(intersect_sorted(occurrence_lists)) == set_intersection(occurrence_lists)
+        set_time = time_queries(set_intersection, queries)
+        gallop_time = time_queries(intersect_sorted, queries)
+        results[name] = {'set_seconds': set_time, 'gallop_seconds': gallop_time}
+        print(f"{name:>26} {set_time * 1e6:8.1f}us {gallop_time * 1e6:8.1f}us {set_time / gallop_time:7.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,39 @@
+# benchmarks/bench_memory.py
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from benchmarks.common import generate_token_streams, to_word_positions, deep_sizeof
+
+
+def build_trie(num_documents, document_length, vocabulary_size):
+    streams = generate_token_streams(num_documents, document_length, vocabulary_size)
+    trie = Trie()
+    for doc_id, tokens in streams.items():
+        trie.insert_document(doc_id, to_word_positions(tokens))
+    return trie
+
+
+def run_benchmark(num_documents=200, document_length=5000, vocabulary_size=5000):
+    trie = build_trie(num_documents, document_length, vocabulary_size)
+    total_positions = num_documents * document_length
+
+    print(f"Synthetic corpus: {num_documents} documents, "
+          f"{document_length} tokens each, vocabulary {vocabulary_size}")
+
+    before = deep_sizeof(trie.occurrence_lists)
+    trie.compact()
+    after = deep_sizeof(trie.occurrence_lists)
+
+    print("\nPosting list memory:")
+    print(f"  dict of lists : {before / 2**20:8.2f} MB  ({before / total_positions:6.2f} bytes/position)")
+    print(f"  compact arrays: {after / 2**20:8.2f} MB  ({after / total_positions:6.2f} bytes/position)")
+    print(f"  reduction     : {before / after:8.2f}x")
+    return {'dict_bytes': before, 'compact_bytes': after}
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,101 @@
+# benchmarks/bench_near_duplicates.py
+
+import sys
+import os
+import contextlib
+import io
+import random
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.searcher import SearchEngine
+from benchmarks.common import WhitespaceProcessor, generate_documents, generate_vocabulary, time_call
+
+
+def add_near_duplicates(documents, fraction, max_edits=3, seed=0):
+    """
+    Append copies of random documents, each with up to max_edits words
+    replaced, like redirects and mirrors; returns {copy: original}
+    """
+    rng = random.Random(seed)
+    originals = sorted(documents)
+    copies = {}
+    next_doc_id = max(originals) + 1
+    for _ in range(int(len(originals) * fraction)):
+        original = rng.choice(originals)
+        words = documents[original]['content'].split()
+        for _ in range(rng.randint(0, max_edits)):
+            words[rng.randrange(len(words))] = 'edited'
+        documents[next_doc_id] = dict(documents[original], title=f"Copy of {original}",
+                                      url=f"https://example.org/wiki/Copy_{next_doc_id}",
+                                      content=' '.join(words))
+        copies[next_doc_id] = original
+        next_doc_id += 1
+    return copies
+
+
+def build(documents, duplicates):
+    indexer = Indexer(Trie())
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, seconds = time_call(indexer.build_index, documents, WhitespaceProcessor(), duplicates=duplicates)
+        indexer.freeze()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'index.bin')
+        with contextlib.redirect_stdout(io.StringIO()):
+            indexer.save_binary_index(path, {doc_id: {} for doc_id in documents})
+        index_bytes = os.path.getsize(path)
+    return indexer, seconds, index_bytes
+
+
+def run_benchmark(num_documents=4000, document_length=300, duplicate_fraction=0.25, num_queries=500):
+    documents = generate_documents(num_documents, document_length)
+    copies = add_near_duplicates(documents, duplicate_fraction)
+    print(f"Synthetic corpus: {num_documents} documents, {document_length} tokens each, "
+          f"plus {len(copies)} copies with up to 3 words edited")
+
+    results = {}
+    indexers = {}
+    for mode in [None, 'collapse', 'skip']:
+        indexer, seconds, index_bytes = build(documents, mode)
+        indexers[mode] = indexer
+        name = mode or 'no detection'
+        results[f"{name}_build_seconds"] = seconds
+        results[f"{name}_index_bytes"] = index_bytes
+        print(f"{name:>14}: built in {seconds:6.2f}s, index file {index_bytes / 2**20:6.2f} MB, "
+              f"{indexer.index_stats['total_terms']:,} positions")
+
+    stats = indexers['skip'].duplicate_stats
+    found = indexers['skip'].skipped_duplicates
+    true_positives = sum(1 for doc_id, original in found.items()
+                         if copies.get(doc_id) == original or copies.get(doc_id) == copies.get(original))
+    all_pairs = len(documents) * (len(documents) - 1) // 2
+    saved = 1 - results['skip_index_bytes'] / results['no detection_index_bytes']
+    print(f"Duplicates found: {len(found)} of {len(copies)} copies, {true_positives} correct; "
+          f"{stats['candidate_comparisons']:,} signature comparisons instead of {all_pairs:,} pairs")
+    print(f"Skipping them saves {stats['skipped_positions']:,} positions and "
+          f"{saved:.1%} of the index file")
+    results.update({'copies': len(copies), 'found': len(found), 'correct': true_positives,
+                    'comparisons': stats['candidate_comparisons'], 'index_saved_fraction': saved})
+
+    # Queries answered with duplicates collapsed, against the full result lists
+    rng = random.Random(1)
+    vocabulary = generate_vocabulary(300)
+    queries = [' '.join(rng.sample(vocabulary, rng.randint(1, 2))) for _ in range(num_queries)]
+    indexer = indexers['collapse']
+    for collapse in [False, True]:
+        engine = SearchEngine(indexer.trie, documents, indexer=indexer, ranking='bm25',
+                              processor=WhitespaceProcessor(), cache_size=0, collapse_duplicates=collapse)
+        top, seconds = time_call(lambda: [engine.search(query, k=10) for query in queries])
+        repeated = sum(1 for results in top for doc_id, _ in results if doc_id in copies)
+        name = 'collapsed' if collapse else 'all results'
+        print(f"{name:>14}: {num_queries / seconds:8,.0f} queries/sec, "
+              f"{repeated} copies in the top 10 of {num_queries} queries")
+        results[f"{name}_queries_per_second"] = num_queries / seconds
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
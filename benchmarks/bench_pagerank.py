@@ -0,0 +1,87 @@
+# benchmarks/bench_pagerank.py
+
+import sys
+import os
+import random
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.document_store import DocumentStore
+from src.link_graph import build_link_graph, pagerank, _pagerank_python, DAMPING, HAS_NUMPY
+from src.searcher import SearchEngine
+from benchmarks.common import (
+    WhitespaceProcessor, generate_documents, generate_vocabulary, build_indexer,
+    zipf_cumulative_weights, time_call
+)
+
+
+def add_zipf_links(documents, links_per_document, seed=0):
+    """
+    Links to other documents, a few of which are linked from most pages
+    """
+    rng = random.Random(seed)
+    doc_ids = sorted(documents)
+    targets = doc_ids[:]
+    rng.shuffle(targets)
+    cumulative = zipf_cumulative_weights(len(targets), exponent=0.8)
+    for doc_id in doc_ids:
+        linked = rng.choices(targets, cum_weights=cumulative, k=links_per_document)
+        documents[doc_id]['links'] = {documents[target]['url'] for target in linked}
+
+
+def generate_link_store(num_pages, links_per_page):
+    documents = {doc_id: {'title': f"Page {doc_id}", 'url': f"https://example.org/wiki/Page_{doc_id}",
+                          'content': ''}
+                 for doc_id in range(1, num_pages + 1)}
+    add_zipf_links(documents, links_per_page)
+    return DocumentStore(documents)
+
+
+def run_benchmark(num_pages=100000, links_per_page=25, num_documents=2000, num_queries=2000):
+    store = generate_link_store(num_pages, links_per_page)
+    graph, build_seconds = time_call(build_link_graph, store)
+    graph_bytes = (graph.doc_ids.itemsize * len(graph.doc_ids) + graph.offsets.itemsize * len(graph.offsets)
+                   + graph.targets.itemsize * len(graph.targets))
+    print(f"Link graph: {graph.num_nodes} pages, {graph.num_edges:,} links, built in {build_seconds:.2f}s, "
+          f"{graph_bytes / 2**20:.1f} MB")
+    results = {'edges': graph.num_edges, 'build_seconds': build_seconds, 'graph_bytes': graph_bytes}
+
+    # One Python iteration, for comparison with the vectorised iteration
+    _, python_seconds = time_call(_pagerank_python, graph, DAMPING, 0, 1)
+    print(f"{'python':>28}: {python_seconds:7.3f}s per iteration")
+    results['python_iteration_seconds'] = python_seconds
+    if HAS_NUMPY:
+        for edge_chunk in [1 << 22, 1 << 18]:
+            tracemalloc.start()
+            _, seconds = time_call(pagerank, graph, edge_chunk=edge_chunk)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            name = f"numpy, {edge_chunk:,} edge chunks"
+            print(f"{name:>28}: {seconds:7.3f}s to converge, peak {peak / 2**20:6.1f} MB")
+            results[f"numpy_seconds_{edge_chunk}"] = seconds
+            results[f"numpy_peak_bytes_{edge_chunk}"] = peak
+    else:
+        print("NumPy is not installed; skipping the vectorised iteration")
+
+    # Query cost of blending the prior into the scores
+    documents = generate_documents(num_documents, 200)
+    add_zipf_links(documents, 20)
+    indexer = build_indexer(documents)
+    indexer.static_scores = pagerank(build_link_graph(documents))
+    rng = random.Random(0)
+    vocabulary = generate_vocabulary(200)
+    queries = [' '.join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(num_queries)]
+    print(f"Queries: {num_queries} over {num_documents} documents, top 10, BM25")
+    for static_weight in [0, 1.0]:
+        engine = SearchEngine(indexer.trie, documents, indexer=indexer, ranking='bm25',
+                              processor=WhitespaceProcessor(), cache_size=0, static_weight=static_weight)
+        _, seconds = time_call(lambda: [engine.search(query, k=10) for query in queries])
+        name = f"static_weight={static_weight}"
+        print(f"{name:>28}: {num_queries / seconds:10,.0f} queries/sec")
+        results[f"queries_per_second_{static_weight}"] = num_queries / seconds
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
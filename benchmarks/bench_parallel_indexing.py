@@ -0,0 +1,47 @@
+# benchmarks/bench_parallel_indexing.py
+
+import sys
+import os
+import contextlib
+import io
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.text_processor import TextProcessor
+from benchmarks.common import generate_documents, time_call
+
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def build(documents, processor, workers):
+    """
+    Build an index with Indexer.build_index, silencing its progress output
+    """
+    indexer = Indexer(Trie())
+    with contextlib.redirect_stdout(io.StringIO()):
+        indexer.build_index(documents, processor, workers=workers)
+    return indexer
+
+
+def run_benchmark(num_documents=400, document_length=2000, vocabulary_size=5000):
+    documents = generate_documents(num_documents, document_length, vocabulary_size)
+    processor = TextProcessor()
+    total_tokens = num_documents * document_length
+
+    print(f"Synthetic corpus: {num_documents} documents, "
+          f"{document_length} tokens each, vocabulary {vocabulary_size}, "
+          f"{os.cpu_count()} CPUs")
+
+    results = {}
+    for workers in WORKER_COUNTS:
+        _, elapsed = time_call(build, documents, processor, workers)
+        results[workers] = elapsed
+        print(f"{workers} worker(s): {elapsed:8.3f}s  {total_tokens / elapsed:12,.0f} tokens/sec  "
+              f"speedup {results[1] / elapsed:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
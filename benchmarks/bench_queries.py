@@ -0,0 +1,76 @@
+# benchmarks/bench_queries.py
+
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.query_parser import parse_query
+from src.query_executor import QueryExecutor
+from benchmarks.common import generate_documents, build_indexer, WhitespaceProcessor
+
+
+def set_phrase_match(trie, words):
+    """
+    Baseline: documents from set intersection, then a set of shifted
+    positions per term to test adjacency
+    """
+    occurrence_lists = [trie.get_occurrence_list(word) for word in words]
+    candidates = set.intersection(*(set(occurrence_list.doc_ids()) for occurrence_list in occurrence_lists))
+    matches = []
+    for doc_id in sorted(candidates):
+        starts = set(occurrence_lists[0].get_positions(doc_id))
+        for offset, occurrence_list in enumerate(occurrence_lists[1:], 1):
+            starts &= {position - offset for position in occurrence_list.get_positions(doc_id)}
+        if starts:
+            matches.append(doc_id)
+    return matches
+
+
+def time_queries(run, queries, rounds=3):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in queries:
+            run(query)
+    return (time.perf_counter() - start) / (rounds * len(queries))
+
+
+def run_benchmark(num_documents=5000, document_length=300, vocabulary_size=20000, seed=11):
+    documents = generate_documents(num_documents, document_length, vocabulary_size)
+    indexer = build_indexer(documents)
+    trie = indexer.trie
+    executor = QueryExecutor(trie, WhitespaceProcessor(), documents)
+
+    rng = random.Random(seed)
+    terms = sorted(trie.iter_terms(), key=lambda item: len(item[1]), reverse=True)
+    common = [word for word, _ in terms[:20]]
+    phrases = [rng.sample(common, 2) for _ in range(40)]
+
+    query_mixes = {
+        'phrase (2 common terms)': [f'"{a} {b}"' for a, b in phrases],
+        'NEAR/5 (2 common terms)': [f'{a} NEAR/5 {b}' for a, b in phrases],
+        'OR (2 common terms)': [f'{a} OR {b}' for a, b in phrases],
+        'AND NOT (2 common terms)': [f'{a} NOT {b}' for a, b in phrases],
+    }
+
+    print(f"Synthetic corpus: {num_documents} documents, {document_length} tokens each")
+    results = {}
+    for name, queries in query_mixes.items():
+        seconds = time_queries(lambda query: executor.execute(parse_query(query)), queries)
+        results[name] = seconds
+        print(f"{name:>26}: {seconds * 1e3:8.2f} ms/query")
+
+    for a, b in phrases:
+        assert executor.execute(parse_query(f'"{a} {b}"'))[0] == set_phrase_match(trie, [a, b])
+    set_seconds = time_queries(lambda words: set_phrase_match(trie, words), phrases)
+    merge_seconds = results['phrase (2 common terms)']
+    results['phrase with position sets'] = set_seconds
+    print(f"{'phrase with position sets':>26}: {set_seconds * 1e3:8.2f} ms/query "
+          f"(merge walk {set_seconds / merge_seconds:.1f}x faster)")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,50 @@
+# benchmarks/bench_query_cache.py
+
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.searcher import SearchEngine
+from benchmarks.common import (
+    WhitespaceProcessor, generate_documents, generate_vocabulary, build_indexer,
+    zipf_cumulative_weights, time_call
+)
+
+
+def generate_query_log(num_queries, distinct_queries=500, seed=0):
+    """
+    Query log in which a few queries repeat often (Zipf over distinct queries)
+    """
+    rng = random.Random(seed)
+    vocabulary = generate_vocabulary(200, seed)
+    queries = [' '.join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(distinct_queries)]
+    return rng.choices(queries, cum_weights=zipf_cumulative_weights(distinct_queries), k=num_queries)
+
+
+def run_benchmark(num_documents=2000, document_length=200, num_queries=5000):
+    documents = generate_documents(num_documents, document_length)
+    indexer = build_indexer(documents)
+    query_log = generate_query_log(num_queries)
+
+    print(f"Synthetic corpus: {num_documents} documents, {document_length} tokens each; "
+          f"{num_queries} queries, {len(set(query_log))} distinct")
+
+    results = {}
+    for name, cache_size in [('no cache', 0), ('query cache', 1024)]:
+        engine = SearchEngine(indexer.trie, documents, indexer=indexer, ranking='bm25',
+                              processor=WhitespaceProcessor(), cache_size=cache_size)
+        _, elapsed = time_call(lambda: [engine.search(query, k=10) for query in query_log])
+        results[name] = num_queries / elapsed
+        print(f"{name:>12}: {elapsed:8.3f}s  {results[name]:10,.0f} queries/sec")
+        stats = engine.cache_stats()
+        if stats:
+            print(f"{'':>12}  {stats['hit_rate']:.1%} hit rate, {stats['entries']} entries")
+
+    print(f"Speedup: {results['query cache'] / results['no cache']:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
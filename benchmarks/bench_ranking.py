@@ -0,0 +1,70 @@
+# benchmarks/bench_ranking.py
+
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.searcher import SearchEngine
+from src.vector_ranking import HAS_NUMPY
+from benchmarks.common import generate_documents, build_indexer, WhitespaceProcessor
+
+
+def make_queries(indexer, count=200, seed=3):
+    """
+    One- to three-term queries drawn from the 2000 most common terms
+    """
+    rng = random.Random(seed)
+    terms = sorted(indexer.trie.iter_terms(), key=lambda item: len(item[1]), reverse=True)
+    common = [word for word, _ in terms[:2000]]
+    return [' '.join(rng.sample(common, rng.randint(1, 3))) for _ in range(count)]
+
+
+def make_broad_queries(indexer, count=50, seed=5):
+    """
+    Single very common terms and two-letter wildcards, matching thousands of documents
+    """
+    rng = random.Random(seed)
+    terms = sorted(indexer.trie.iter_terms(), key=lambda item: len(item[1]), reverse=True)
+    common = [word for word, _ in terms[:50]]
+    prefixes = sorted({word[:2] for word, _ in terms[:500]})
+    return [rng.choice(common) if rng.random() < 0.5 else rng.choice(prefixes) + '*'
+            for _ in range(count)]
+
+
+def queries_per_second(search_engine, queries, **options):
+    start = time.perf_counter()
+    for query in queries:
+        search_engine.search(query, **options)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def run_benchmark(num_documents=5000, document_length=300, vocabulary_size=20000):
+    documents = generate_documents(num_documents, document_length, vocabulary_size)
+    indexer = build_indexer(documents)
+    backends = ['python', 'numpy'] if HAS_NUMPY else ['python']
+    search_engines = {
+        backend: SearchEngine(indexer.trie, documents, indexer=indexer,
+                              processor=WhitespaceProcessor(), backend=backend)
+        for backend in backends
+    }
+    query_sets = {'selective': make_queries(indexer), 'broad': make_broad_queries(indexer)}
+
+    print(f"Synthetic corpus: {num_documents} documents, {document_length} tokens each")
+    results = {}
+    for query_set, queries in query_sets.items():
+        print(f"\n{query_set} queries")
+        for ranking in ['frequency', 'bm25']:
+            for k in [None, 10]:
+                for backend, search_engine in search_engines.items():
+                    qps = queries_per_second(search_engine, queries, ranking=ranking, k=k)
+                    label = f"{ranking}, {'all results' if k is None else f'top {k}'}, {backend}"
+                    results[f"{query_set}: {label}"] = qps
+                    print(f"{label:>32}: {qps:10.1f} queries/sec")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
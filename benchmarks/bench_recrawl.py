@@ -0,0 +1,88 @@
+# benchmarks/bench_recrawl.py
+
+import sys
+import os
+import contextlib
+import io
+import shutil
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crawler import WebCrawler
+from src.http_cache import HttpCache
+
+# Paragraphs per page, about the size of a Wikipedia article's HTML
+PARAGRAPHS = 150
+
+
+class VersionedWiki(BaseHTTPRequestHandler):
+    """
+    /wiki/Page_N links to pages 2N and 2N + 1 up to server.num_pages;
+    pages carry an ETag and answer 304 to If-None-Match for their current version
+    """
+
+    def do_GET(self):
+        number = int(self.path.rsplit('_', 1)[1])
+        etag = f'"{number}-{self.server.versions.get(number, 1)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        links = ''.join(f'<a href="/wiki/Page_{child}">Page {child}</a> ' for child in (2 * number, 2 * number + 1) if child <= self.server.num_pages)
+        paragraphs = ''.join(f'<p>Paragraph {n} of article {number} about <b>search</b> engines and '
+                             f'<a href="/wiki/Page_1">inverted indexes</a>.<sup>[{n}]</sup></p>'
+                             for n in range(PARAGRAPHS))
+        body = (f'<html><body><h1 id="firstHeading">Page {number}</h1><div id="mw-content-text">'
+                f'{paragraphs}<p>{links}</p></div></body></html>').encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_benchmark(max_pages=200, changed_fraction=0.1):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), VersionedWiki)
+    server.versions = {}
+    server.num_pages = max_pages
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    cache_dir = tempfile.mkdtemp()
+
+    print(f"Local server, {max_pages} pages, {changed_fraction:.0%} changed before the re-crawl")
+    results = {}
+    try:
+        for name in ['cold crawl', 're-crawl']:
+            if name == 're-crawl':
+                for number in range(1, max_pages + 1, round(1 / changed_fraction)):
+                    server.versions[number] = 2
+            cache = HttpCache(cache_dir)
+            crawler = WebCrawler(base_url=base_url, max_workers=4, requests_per_second=0, cache=cache)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                documents = crawler.crawl_wikipedia_pages([base_url + '/wiki/Page_1'],
+                                                          max_pages=max_pages, max_depth=10)
+            seconds = time.perf_counter() - start
+            stats = cache.stats()
+            results[name] = dict(stats, seconds=seconds)
+            print(f"{name:>10}: {len(documents)} pages in {seconds:6.2f}s, "
+                  f"{stats['downloaded']} downloaded ({stats['bytes_downloaded'] / 2**20:.1f} MB), "
+                  f"{stats['not_modified']} not modified ({stats['bytes_saved'] / 2**20:.1f} MB saved)")
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(cache_dir)
+    print(f"Speedup: {results['cold crawl']['seconds'] / results['re-crawl']['seconds']:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,46 @@
+# benchmarks/bench_sharding.py
+
+import sys
+import os
+import contextlib
+import io
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.sharding import build_shards, ShardedSearchEngine
+from benchmarks.common import WhitespaceProcessor, generate_documents, time_call
+from benchmarks.bench_query_cache import generate_query_log
+
+SHARD_COUNTS = [1, 2, 4, 8]
+
+
+def run_benchmark(num_documents=5000, document_length=300, num_queries=300):
+    documents = generate_documents(num_documents, document_length)
+    processor = WhitespaceProcessor()
+    # Distinct queries only, so every query is evaluated
+    query_log = sorted(set(generate_query_log(num_queries * 10)))[:num_queries]
+
+    print(f"Synthetic corpus: {num_documents} documents, {document_length} tokens each; "
+          f"{len(query_log)} BM25 queries, top 10, {os.cpu_count()} CPUs")
+
+    results = {}
+    for num_shards in SHARD_COUNTS:
+        directory = tempfile.mkdtemp()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                paths = build_shards(documents, processor, num_shards, directory)
+            with ShardedSearchEngine(paths, processor, ranking='bm25', cache_size=0) as engine:
+                engine.search(query_log[0], k=10)  # Start the shard processes
+                _, elapsed = time_call(lambda: [engine.search(query, k=10) for query in query_log])
+        finally:
+            shutil.rmtree(directory)
+        results[num_shards] = len(query_log) / elapsed
+        print(f"{num_shards} shard(s): {elapsed:8.3f}s  {results[num_shards]:10,.0f} queries/sec  "
+              f"speedup {results[num_shards] / results[1]:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
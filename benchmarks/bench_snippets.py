@@ -0,0 +1,46 @@
+# benchmarks/bench_snippets.py
+
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.searcher import SearchEngine
+from benchmarks.common import generate_documents, build_indexer, WhitespaceProcessor
+
+
+def time_snippets(snippet, requests):
+    start = time.perf_counter()
+    for doc_id, query_terms in requests:
+        snippet(doc_id, query_terms)
+    return (time.perf_counter() - start) / len(requests)
+
+
+def run_benchmark(num_documents=200, vocabulary_size=20000, seed=13):
+    rng = random.Random(seed)
+    print(f"Synthetic corpus: {num_documents} documents per length")
+    print(f"{'tokens/doc':>10} {'scan':>10} {'positions':>10} {'speedup':>8}")
+    results = {}
+    for document_length in [300, 3000, 30000]:
+        documents = generate_documents(num_documents, document_length, vocabulary_size)
+        indexer = build_indexer(documents)
+        search_engine = SearchEngine(indexer.trie, documents, indexer=indexer,
+                                     processor=WhitespaceProcessor())
+        # Two query terms taken from each document
+        requests = []
+        for doc_id, document in documents.items():
+            words = document['content'].split()
+            requests.append((doc_id, rng.sample(words, 2)))
+
+        scan_seconds = time_snippets(search_engine._scan_snippet, requests)
+        position_seconds = time_snippets(search_engine.get_snippet, requests)
+        results[document_length] = {'scan_seconds': scan_seconds, 'position_seconds': position_seconds}
+        print(f"{document_length:>10} {scan_seconds * 1e3:8.2f}ms {position_seconds * 1e3:8.3f}ms "
+              f"{scan_seconds / position_seconds:7.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,46 @@
+# benchmarks/bench_startup.py
+
+import sys
+import os
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Code timed in a fresh interpreter, so nothing is imported beforehand
+STARTUP_CASES = [
+    ('import src.searcher', "import src.searcher"),
+    ('import + TextProcessor()', "import src.searcher\nfrom src.text_processor import TextProcessor\nTextProcessor()"),
+]
+
+TIMER = """
+import time
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start)
+"""
+
+
+def cold_start(code, runs=5):
+    """
+    Median seconds taken by code in runs fresh Python processes
+    """
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', TIMER.format(code=code)], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        timings.append(float(output.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def run_benchmark(runs=5):
+    print(f"Cold start, median of {runs} fresh processes")
+    results = {}
+    for name, code in STARTUP_CASES:
+        results[name] = cold_start(code, runs)
+        print(f"{name:>26}: {results[name] * 1000:8.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,68 @@
+# benchmarks/bench_term_dictionary.py
+
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from benchmarks.common import generate_vocabulary, deep_sizeof
+
+
+def build_trie(vocabulary):
+    trie = Trie()
+    for doc_id, word in enumerate(vocabulary, 1):
+        trie.insert_document(doc_id, {word: [0]})
+    return trie
+
+
+def time_lookups(trie, words, rounds=3):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for word in words:
+            trie.search(word)
+    return (time.perf_counter() - start) / (rounds * len(words))
+
+
+def run_benchmark(vocabulary_size=200000, lookups=50000):
+    vocabulary = generate_vocabulary(vocabulary_size)
+    trie = build_trie(vocabulary)
+    words = random.Random(1).sample(vocabulary, min(lookups, vocabulary_size))
+
+    # Posting lists are identical in both structures, so measure only the term dictionary
+    tree_bytes = deep_sizeof(trie.root)
+    tree_lookup = time_lookups(trie, words)
+
+    frozen = trie.freeze()
+    frozen_bytes = deep_sizeof(frozen.terms)
+    frozen_lookup = time_lookups(frozen, words)
+
+    # Type-ahead: short, very common prefixes must cost as little as long ones
+    prefixes = ['', words[0][:1], words[0][:2], words[0][:4], words[0]]
+    prefix_times = {}
+    for name, index in [('trie', trie), ('frozen', frozen)]:
+        index.prefix_search('')  # Build completion caches outside the timing
+        for prefix in prefixes:
+            start = time.perf_counter()
+            for _ in range(1000):
+                index.prefix_search(prefix, 10)
+            prefix_times[(name, prefix)] = (time.perf_counter() - start) / 1000
+
+    print(f"Vocabulary: {vocabulary_size} terms")
+    print(f"  TrieNode tree   : {tree_bytes / 2**20:8.2f} MB  {tree_lookup * 1e6:6.2f} us/lookup")
+    print(f"  frozen term dict: {frozen_bytes / 2**20:8.2f} MB  {frozen_lookup * 1e6:6.2f} us/lookup")
+    print(f"  memory reduction: {tree_bytes / frozen_bytes:8.1f}x")
+    print("  prefix_search(prefix, 10) latency:")
+    for prefix in prefixes:
+        matches = frozen.terms.prefix_range(prefix)
+        print(f"    {prefix!r:>12} ({matches[1] - matches[0]:6d} terms): "
+              f"trie {prefix_times[('trie', prefix)] * 1e6:7.2f} us   "
+              f"frozen {prefix_times[('frozen', prefix)] * 1e6:7.2f} us")
+    return {'tree_bytes': tree_bytes, 'frozen_bytes': frozen_bytes,
+            'tree_lookup_seconds': tree_lookup, 'frozen_lookup_seconds': frozen_lookup}
+
+
+if __name__ == "__main__":
+    run_benchmark()
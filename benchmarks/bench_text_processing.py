@@ -0,0 +1,51 @@
+# benchmarks/bench_text_processing.py
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.text_processor import TextProcessor
+from benchmarks.common import generate_documents, time_call
+
+
+def process_all(processor, documents):
+    """
+    Run every document through processor.process_document
+    """
+    return [processor.process_document(doc_data['content'], doc_id)
+            for doc_id, doc_data in documents.items()]
+
+
+def run_benchmark(num_documents=200, document_length=2000, vocabulary_size=5000):
+    documents = generate_documents(num_documents, document_length, vocabulary_size)
+    total_tokens = num_documents * document_length
+
+    print(f"Synthetic corpus: {num_documents} documents, "
+          f"{document_length} tokens each, vocabulary {vocabulary_size}")
+
+    processors = [
+        ('word_tokenize, no stem cache', TextProcessor(fast_tokenizer=False, stem_cache_size=0)),
+        ('fast tokenizer, no stem cache', TextProcessor(stem_cache_size=0)),
+        ('fast tokenizer + stem cache', TextProcessor()),
+    ]
+    results = {}
+    outputs = []
+    for name, processor in processors:
+        output, elapsed = time_call(process_all, processor, documents)
+        outputs.append(output)
+        results[name] = total_tokens / elapsed
+        print(f"{name:>30}: {elapsed:8.3f}s  {results[name]:12,.0f} tokens/sec")
+
+    assert all(output == outputs[0] for output in outputs), "Processors disagree"
+    print("Output identical across modes")
+    info = processors[-1][1].stem_cache_info()
+    print(f"Stem cache: {info['hit_rate']:.1%} hit rate, {info['size']} stems cached")
+
+    speedup = results['fast tokenizer + stem cache'] / results['word_tokenize, no stem cache']
+    print(f"Speedup: {speedup:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
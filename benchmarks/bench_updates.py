@@ -0,0 +1,72 @@
+# benchmarks/bench_updates.py
+
+import sys
+import os
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.indexer import Indexer
+from src.segments import SegmentedIndex
+from src.searcher import SearchEngine
+from benchmarks.common import WhitespaceProcessor, generate_documents, build_indexer, time_call
+
+
+def apply_updates(indexer, documents, replacements, rng, count):
+    """
+    Replace count random documents with new content; every tenth is deleted instead
+    """
+    processor = WhitespaceProcessor()
+    for step in range(count):
+        doc_id = rng.choice(list(documents))
+        if step % 10 == 9:
+            indexer.delete_document(doc_id)
+            del documents[doc_id]
+        else:
+            documents[doc_id] = rng.choice(replacements)
+            indexer.update_document(doc_id, documents[doc_id], processor)
+
+
+def query_latency(engine, queries, rounds=5):
+    """
+    Mean seconds per query
+    """
+    _, elapsed = time_call(lambda: [engine.search(query, k=10) for _ in range(rounds) for query in queries])
+    return elapsed / (rounds * len(queries))
+
+
+def run_benchmark(num_documents=2000, document_length=200, batches=5, batch_size=400):
+    documents = generate_documents(num_documents, document_length)
+    replacements = list(generate_documents(200, document_length, seed=1).values())
+    queries = [' '.join(document['content'].split()[:2]) for document in list(documents.values())[:20]]
+    rng = random.Random(0)
+
+    print(f"Synthetic corpus: {num_documents} documents, {document_length} tokens each; "
+          f"{batches} batches of {batch_size} updates (10% deletes)")
+
+    _, rebuild_time = time_call(build_indexer, documents, freeze=False)
+    print(f"Full rebuild: {rebuild_time * 1000:10.1f} ms")
+
+    index = SegmentedIndex(flush_threshold=250, max_segments=4)
+    indexer = Indexer(index)
+    for doc_id, doc_data in documents.items():
+        indexer.add_document(doc_id, doc_data, WhitespaceProcessor())
+    indexer.finish_index()
+    engine = SearchEngine(index, documents, indexer=indexer, processor=WhitespaceProcessor())
+    print(f"Batch 0: query {query_latency(engine, queries) * 1000:8.3f} ms, "
+          f"{index.segment_count()} segments")
+
+    results = {'rebuild': rebuild_time, 'update': [], 'query': []}
+    for batch in range(1, batches + 1):
+        _, elapsed = time_call(apply_updates, indexer, documents, replacements, rng, batch_size)
+        engine.refresh_statistics()
+        latency = query_latency(engine, queries)
+        results['update'].append(elapsed / batch_size)
+        results['query'].append(latency)
+        print(f"Batch {batch}: update {elapsed / batch_size * 1000:8.3f} ms, "
+              f"query {latency * 1000:8.3f} ms, {index.segment_count()} segments")
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,180 @@
+# benchmarks/common.py
+
+import random
+import time
+
+SYLLABLES = [
+    'ba', 'be', 'bi', 'bo', 'ca', 'co', 'da', 'de', 'di', 'fa', 'fi', 'ga',
+    'ka', 'ki', 'la', 'le', 'li', 'lo', 'ma', 'me', 'mi', 'mo', 'na', 'ne',
+    'ni', 'no', 'pa', 'pe', 'pi', 'ra', 're', 'ri', 'ro', 'sa', 'se', 'si',
+    'so', 'ta', 'te', 'ti', 'to', 'va', 've', 'za', 'zo', 'tri', 'str', 'gon'
+]
+
+
+def generate_vocabulary(size, seed=0):
+    """
+    Generate a deterministic vocabulary of unique pseudo-words
+    """
+    rng = random.Random(seed)
+    vocabulary = []
+    seen = set()
+    while len(vocabulary) < size:
+        word = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            vocabulary.append(word)
+    return vocabulary
+
+
+def zipf_cumulative_weights(size, exponent=1.0):
+    """
+    Cumulative Zipfian weights for ranks 1..size
+    """
+    cumulative = []
+    total = 0.0
+    for rank in range(1, size + 1):
+        total += 1.0 / (rank ** exponent)
+        cumulative.append(total)
+    return cumulative
+
+
+def generate_token_streams(num_documents, document_length, vocabulary_size=5000,
+                           seed=0, exponent=1.0):
+    """
+    Generate {doc_id: [tokens]} with Zipf-distributed terms
+    """
+    rng = random.Random(seed)
+    vocabulary = generate_vocabulary(vocabulary_size, seed)
+    cumulative = zipf_cumulative_weights(vocabulary_size, exponent)
+    streams = {}
+    for doc_id in range(1, num_documents + 1):
+        streams[doc_id] = rng.choices(vocabulary, cum_weights=cumulative, k=document_length)
+    return streams
+
+
+def to_word_positions(tokens):
+    """
+    Convert a token stream into the {word: [positions]} format produced
+    by TextProcessor.process_document
+    """
+    word_positions = {}
+    for position, token in enumerate(tokens):
+        if token not in word_positions:
+            word_positions[token] = []
+        word_positions[token].append(position)
+    return word_positions
+
+
+def time_call(func, *args, **kwargs):
+    """
+    Run func once and return (result, elapsed seconds)
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def latency_summary(seconds):
+    """
+    Mean and nearest-rank percentiles of a list of latencies, in milliseconds
+    """
+    ordered = sorted(seconds)
+    summary = {'count': len(ordered), 'mean_ms': sum(ordered) / len(ordered) * 1e3}
+    for percentile in (50, 90, 99):
+        rank = max(0, -(-percentile * len(ordered) // 100) - 1)
+        summary[f"p{percentile}_ms"] = ordered[rank] * 1e3
+    summary['max_ms'] = ordered[-1] * 1e3
+    return summary
+
+
+def deep_sizeof(obj, seen=None):
+    """
+    Approximate recursive memory footprint of an object in bytes
+    Follows containers, __dict__ and __slots__; arrays and bytes count their buffers
+    """
+    import sys
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, memoryview)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+        return size
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+        return size
+    if hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+class WhitespaceProcessor:
+    """
+    Minimal stand-in for TextProcessor on synthetic corpora
+    Synthetic content is already lowercase terms separated by spaces, so
+    splitting is enough; benchmarks then measure index and search cost only
+    """
+
+    def preprocess_text(self, text):
+        return text.lower().strip()
+
+    def process_document(self, text, doc_id):
+        return to_word_positions(text.split())
+
+    def process_document_with_offsets(self, text, doc_id):
+        from array import array
+        offsets = array('I')
+        cursor = 0
+        tokens = text.split()
+        for token in tokens:
+            start = text.index(token, cursor)
+            cursor = start + len(token)
+            offsets.extend((start, cursor))
+        return to_word_positions(tokens), offsets
+
+    def process_query(self, query):
+        return query.lower().split()
+
+
+def generate_documents(num_documents, document_length, vocabulary_size=5000, seed=0):
+    """
+    Generate {doc_id: document} dictionaries shaped like crawler output
+    """
+    streams = generate_token_streams(num_documents, document_length, vocabulary_size, seed)
+    return {
+        doc_id: {
+            'title': f"Document {doc_id}",
+            'url': f"https://example.org/wiki/Document_{doc_id}",
+            'content': ' '.join(tokens),
+            'links': set()
+        }
+        for doc_id, tokens in streams.items()
+    }
+
+
+def build_indexer(documents, processor=None, freeze=True):
+    """
+    Index documents with Indexer.build_index, silencing its progress output
+    """
+    import contextlib
+    import io
+    from src.trie import Trie
+    from src.indexer import Indexer
+
+    indexer = Indexer(Trie())
+    with contextlib.redirect_stdout(io.StringIO()):
+        indexer.build_index(documents, processor or WhitespaceProcessor())
+    if freeze:
+        indexer.freeze()
+    return indexer
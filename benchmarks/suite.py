@@ -0,0 +1,222 @@
+# benchmarks/suite.py
+
+import sys
+import os
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import platform
+import random
+import subprocess
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.searcher import SearchEngine
+from benchmarks.common import (
+    WhitespaceProcessor, generate_documents, generate_vocabulary, zipf_cumulative_weights,
+    deep_sizeof, latency_summary, time_call
+)
+
+# Metrics for which a higher value is better; for all others lower is better
+HIGHER_IS_BETTER = ('docs_per_sec', 'tokens_per_sec')
+
+
+def git_commit():
+    """
+    Commit hash of the working tree, or None outside a git checkout
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_processor(name):
+    if name == 'text':
+        from src.text_processor import TextProcessor
+        return TextProcessor()
+    return WhitespaceProcessor()
+
+
+def make_queries(num_queries, terms_per_query, vocabulary_size, seed):
+    """
+    Queries of terms_per_query distinct terms, drawn with the corpus' Zipf distribution
+    """
+    rng = random.Random(seed + terms_per_query)
+    vocabulary = generate_vocabulary(vocabulary_size, seed)
+    cumulative = zipf_cumulative_weights(vocabulary_size)
+    queries = []
+    while len(queries) < num_queries:
+        terms = set(rng.choices(vocabulary, cum_weights=cumulative, k=terms_per_query))
+        if len(terms) == terms_per_query:
+            queries.append(' '.join(sorted(terms)))
+    return queries
+
+
+def measure_latencies(func, calls):
+    latencies = []
+    for args in calls:
+        start = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - start)
+    return latency_summary(latencies)
+
+
+def run_suite(num_documents=5000, document_length=300, vocabulary_size=20000, num_queries=200,
+              processor='whitespace', workers=1, seed=0):
+    """
+    Index a synthetic corpus and measure indexing, memory, query and
+    snippet cost; returns a JSON-serialisable dictionary
+    """
+    documents = generate_documents(num_documents, document_length, vocabulary_size, seed)
+    text_processor = make_processor(processor)
+    total_tokens = num_documents * document_length
+
+    indexer = Indexer(Trie())
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, elapsed = time_call(indexer.build_index, documents, text_processor, workers=workers)
+    indexing = {
+        'seconds': elapsed,
+        'docs_per_sec': num_documents / elapsed,
+        'tokens_per_sec': total_tokens / elapsed,
+    }
+
+    memory = {'trie_bytes': deep_sizeof(indexer.trie)}
+    indexer.freeze()
+    memory['frozen_trie_bytes'] = deep_sizeof(indexer.trie)
+    memory['token_offsets_bytes'] = deep_sizeof(indexer.token_offsets)
+    memory['frozen_bytes_per_token'] = memory['frozen_trie_bytes'] / total_tokens
+
+    search_engine = SearchEngine(indexer.trie, documents, indexer=indexer, processor=text_processor,
+                                 cache_size=0)
+    queries = {}
+    for name, terms_per_query in [('single_term', 1), ('two_term', 2), ('three_term', 3)]:
+        query_set = make_queries(num_queries, terms_per_query, vocabulary_size, seed)
+        for ranking in ['frequency', 'bm25']:
+            queries[f"{name}_{ranking}_top10"] = measure_latencies(
+                lambda query: search_engine.search(query, k=10, ranking=ranking),
+                [(query,) for query in query_set])
+
+    # Two terms taken from each sampled document, so every snippet has a match
+    rng = random.Random(seed)
+    snippet_calls = []
+    for doc_id in rng.sample(sorted(documents), min(num_queries, num_documents)):
+        words = documents[doc_id]['content'].split()
+        snippet_calls.append((doc_id, rng.sample(words, 2)))
+    snippets = measure_latencies(search_engine.get_snippet, snippet_calls)
+
+    return {
+        'metadata': {
+            'commit': git_commit(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'parameters': {
+            'num_documents': num_documents,
+            'document_length': document_length,
+            'vocabulary_size': vocabulary_size,
+            'num_queries': num_queries,
+            'processor': processor,
+            'workers': workers,
+            'seed': seed,
+        },
+        'indexing': indexing,
+        'memory': memory,
+        'queries': queries,
+        'snippets': snippets,
+    }
+
+
+def flatten_metrics(results, prefix=''):
+    """
+    {'a.b': value} for every number in the indexing, memory, queries and snippets sections
+    """
+    metrics = {}
+    for key, value in results.items():
+        if prefix == '' and key in ('metadata', 'parameters'):
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, name + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = value
+    return metrics
+
+
+def compare_results(baseline, current):
+    """
+    Yield (metric, baseline value, current value, change) for metrics in both
+    change is positive when current is better: a speedup or a size reduction
+    """
+    baseline_metrics = flatten_metrics(baseline)
+    for metric, value in flatten_metrics(current).items():
+        old = baseline_metrics.get(metric)
+        if old is None or metric.endswith('.count') or old == 0 or value == 0:
+            continue
+        if metric.endswith(HIGHER_IS_BETTER):
+            change = value / old - 1
+        else:
+            change = old / value - 1
+        yield metric, old, value, change
+
+
+def print_summary(results):
+    parameters = results['parameters']
+    print(f"Synthetic corpus: {parameters['num_documents']} documents, "
+          f"{parameters['document_length']} tokens each, vocabulary {parameters['vocabulary_size']}, "
+          f"{parameters['processor']} processor")
+    indexing = results['indexing']
+    print(f"Indexing: {indexing['seconds']:.3f}s  {indexing['docs_per_sec']:,.0f} docs/sec  "
+          f"{indexing['tokens_per_sec']:,.0f} tokens/sec")
+    memory = results['memory']
+    print(f"Memory: trie {memory['trie_bytes'] / 2**20:.2f} MB, frozen {memory['frozen_trie_bytes'] / 2**20:.2f} MB "
+          f"({memory['frozen_bytes_per_token']:.2f} bytes/token), offsets {memory['token_offsets_bytes'] / 2**20:.2f} MB")
+    print(f"{'':>28} {'mean':>8} {'p50':>8} {'p90':>8} {'p99':>8}  (ms)")
+    for name, summary in list(results['queries'].items()) + [('snippets', results['snippets'])]:
+        print(f"{name:>28} {summary['mean_ms']:8.3f} {summary['p50_ms']:8.3f} "
+              f"{summary['p90_ms']:8.3f} {summary['p99_ms']:8.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark suite over a synthetic corpus")
+    parser.add_argument('--documents', type=int, default=5000)
+    parser.add_argument('--length', type=int, default=300, help="tokens per document")
+    parser.add_argument('--vocabulary', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=200, help="queries per query type")
+    parser.add_argument('--processor', choices=['whitespace', 'text'], default='whitespace')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.documents, args.length, args.vocabulary, args.queries,
+                        args.processor, args.workers, args.seed)
+    print_summary(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline['parameters'] != results['parameters']:
+            print("Warning: the baseline was run with different parameters")
+        print(f"\nCompared with {baseline['metadata'].get('commit') or args.compare} (+ is better):")
+        for metric, old, new, change in compare_results(baseline, results):
+            print(f"{metric:>44} {old:14,.3f} {new:14,.3f} {change:+8.1%}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
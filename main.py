@@ -1,15 +1,48 @@
 # main.py
 
+import argparse
+import os
+
 from src.trie import Trie
 from src.text_processor import TextProcessor
 from src.crawler import WebCrawler
+from src.http_cache import HttpCache
 from src.searcher import SearchEngine
 from src.indexer import Indexer
+from src.index_file import MappedIndex
+from src.pipeline import IndexingPipeline
 
-def main():
-    # Initialize components
-    crawler = WebCrawler()
-    processor = TextProcessor()
+# Number of results shown per query
+RESULTS_PER_QUERY = 10
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Wikipedia search engine")
+    parser.add_argument('--index', help="Binary index file to load, or to write after indexing")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Re-crawl and re-index even if the index file exists")
+    parser.add_argument('--ranking', choices=['frequency', 'bm25'], default='frequency',
+                        help="Ranking function for search results")
+    parser.add_argument('--max-pages', type=int, default=10,
+                        help="Maximum number of pages to crawl")
+    parser.add_argument('--max-depth', type=int, default=0,
+                        help="Follow article links up to this many hops from the start pages")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Pages fetched concurrently while crawling")
+    parser.add_argument('--cache-dir',
+                        help="Directory caching fetched pages; re-crawls only download changed pages")
+    parser.add_argument('--backend', choices=['python', 'numpy'], default='python',
+                        help="Scoring backend; numpy vectorises scoring when NumPy is installed")
+    parser.add_argument('--pagerank-weight', type=float, default=0,
+                        help="Score added to the best linked page's results, in proportion to PageRank "
+                             "(0, the default, ranks by text alone)")
+    return parser.parse_args()
+
+def build_search_engine(processor, index_path=None, ranking='frequency', backend='python',
+                        max_pages=10, max_depth=0, workers=4, cache_dir=None, pagerank_weight=0):
+    """
+    Crawl and index the start pages, optionally saving a binary index
+    """
+    crawler = WebCrawler(max_workers=workers, cache=HttpCache(cache_dir) if cache_dir else None)
     trie = Trie()
     
     # Wikipedia pages to crawl
@@ -22,15 +55,38 @@ def main():
         "https://en.wikipedia.org/wiki/Database"
     ]
 
-    print("Crawling Wikipedia pages...")
-    documents = crawler.crawl_wikipedia_pages(start_urls)
-
-    # Create and build index
+    # Crawl and index at the same time, each page indexed as it arrives
+    print("Crawling and indexing Wikipedia pages...")
     indexer = Indexer(trie)
-    indexer.build_index(documents, processor)
+    pipeline = IndexingPipeline(crawler, indexer, processor)
+    documents = pipeline.run(start_urls, max_pages=max_pages, max_depth=max_depth)
+    
+    # Freeze the trie into a compact read-only term dictionary
+    frozen_trie = indexer.freeze()
+    
+    if index_path:
+        indexer.save_binary_index(index_path, documents)
+        print(f"Index saved to {index_path}")
+    
+    return SearchEngine(frozen_trie, documents, indexer=indexer, ranking=ranking,
+                        processor=processor, backend=backend, static_weight=pagerank_weight)
+
+def main():
+    args = parse_args()
+    processor = TextProcessor()
     
-    # Initialize search engine
-    search_engine = SearchEngine(trie, documents)
+    if args.index and os.path.exists(args.index) and not args.rebuild:
+        # Open the saved index instead of crawling again
+        index = MappedIndex(args.index)
+        print(f"Loaded index from {args.index} "
+              f"({index.num_docs} documents, {index.num_terms} terms)")
+        search_engine = SearchEngine(index, index.documents, indexer=index,
+                                     ranking=args.ranking, processor=processor,
+                                     backend=args.backend, static_weight=args.pagerank_weight)
+    else:
+        search_engine = build_search_engine(processor, args.index, args.ranking, args.backend,
+                                            args.max_pages, args.max_depth, args.workers, args.cache_dir,
+                                            args.pagerank_weight)
 
     # Search interface
     while True:
@@ -52,13 +108,13 @@ def main():
             continue
 
         # Perform search
-        results = search_engine.search(query)
+        results = search_engine.search(query, k=RESULTS_PER_QUERY)
         
         if not results:
             print(f"\nNo results found for '{query}'")
             continue
 
-        print(f"\nFound {len(results)} results for '{query}':")
+        print(f"\nTop {len(results)} results for '{query}':")
         
         for doc_id, score in results:
             print("\n" + "-"*50)
@@ -67,7 +123,7 @@ def main():
             print(f"URL: {search_engine.get_document_url(doc_id)}")
             
             # Generate and display snippet
-            snippet = search_engine.get_snippet(doc_id, processed_query)
+            snippet = search_engine.get_snippet(doc_id, processed_query, highlight=True)
             print(f"Snippet: {snippet}")
 
 
@@ -3,16 +3,125 @@
 import requests
 from bs4 import BeautifulSoup
 import re
+import threading
 import time
-from urllib.parse import urljoin, urlparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urljoin, urlparse, urldefrag
+
+from src.document_store import DocumentStore
+from src.html_extractor import extract_wikipedia_page
+
+# Version of extract_page's output; cached pages of other versions are parsed again
+EXTRACTOR_VERSION = 1
+
+# Page extraction backends, see WebCrawler.extract_page
+EXTRACTORS = ('stream', 'soup')
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Longest wait in seconds before a retry; a server asking for more is given up on
+MAX_BACKOFF = 60
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: allows `rate` requests per second on
+    average and bursts of up to `capacity` requests
+    Thread-safe; acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        """
+        Take a token, returning how long the caller must wait for it
+        The token may be borrowed from the future, which keeps waiting
+        callers in order without holding the lock while they sleep
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+
+class HostRateLimiter:
+    """
+    One TokenBucket per host, so politeness applies to each server separately
+    """
+
+    def __init__(self, requests_per_second, burst=1):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        if not self.requests_per_second:
+            return 0
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+            bucket = self.buckets[host]
+        return bucket.acquire()
+
 
 class WebCrawler:
-    def __init__(self):
+    def __init__(self, base_url='https://en.wikipedia.org', max_workers=4, requests_per_second=1.0,
+                 burst=1, max_retries=3, backoff=0.5, timeout=10, cache=None, extractor='stream',
+                 max_backoff=MAX_BACKOFF):
+        """
+        base_url: site whose /wiki/ links are followed
+        max_workers: pages fetched concurrently
+        requests_per_second, burst: per-host token bucket politeness limit
+        max_retries, backoff: retries of failed requests, waiting
+            backoff * 2 ** attempt seconds (or the server's Retry-After)
+        max_backoff: cap on that wait; a response whose Retry-After
+            exceeds it is not retried
+        cache: optional HttpCache; pages in it are revalidated with
+            If-None-Match / If-Modified-Since instead of downloaded again
+        extractor: 'stream' extracts pages in one html.parser pass,
+            'soup' through a BeautifulSoup tree; both give the same pages
+        """
+        if extractor not in EXTRACTORS:
+            raise ValueError(f"Unknown extractor {extractor!r}; expected one of {EXTRACTORS}")
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.rate_limiter = HostRateLimiter(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.extractor = extractor
         self.visited_urls = set()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # The pool must hold a connection per worker to reuse them
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
     def extract_links(self, soup, base_url):
         """
@@ -22,87 +131,193 @@ class WebCrawler:
         for link in soup.find_all('a', href=True):
             href = link['href']
             if href.startswith('/wiki/'):
-                full_url = urljoin('https://en.wikipedia.org', href)
+                full_url = urljoin(self.base_url, href)
                 links.add(full_url)
         return links
 
+    def should_follow(self, url):
+        """
+        True for article links; namespaced pages such as File: or Special: are skipped
+        """
+        path = urlparse(url).path
+        return path.startswith('/wiki/') and ':' not in path[len('/wiki/'):]
+
+    def _retry_delay(self, attempt, response=None):
+        """
+        Seconds to wait before retrying, honouring a numeric Retry-After header
+        Backoff is capped at max_backoff; None if the server asks for longer
+        """
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return int(retry_after) if int(retry_after) <= self.max_backoff else None
+        return min(self.backoff * 2 ** attempt, self.max_backoff)
+
+    def fetch(self, url, headers=None):
+        """
+        GET a URL politely, retrying connection errors, timeouts, 429 and
+        5xx responses with exponential backoff
+        A response whose Retry-After exceeds max_backoff raises at once
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+            else:
+                delay = None
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    response.raise_for_status()
+                    return response
+                time.sleep(delay)
+            attempt += 1
+
+    def extract_page(self, markup, url):
+        """
+        Extract title, paragraph text and links from a Wikipedia page
+        Returns None for pages without main content
+        """
+        if self.extractor == 'stream':
+            return extract_wikipedia_page(markup, url, self.base_url)
+        return self._extract_page_with_soup(markup, url)
+
+    def _extract_page_with_soup(self, markup, url):
+        """
+        extract_page on a BeautifulSoup tree of the page
+        """
+        soup = BeautifulSoup(markup, 'html.parser')
+        
+        # Get title
+        title = soup.find(id="firstHeading").text
+        
+        # Get main content
+        content_div = soup.find(id="mw-content-text")
+        if content_div:
+            # Extract links before removing elements
+            links = self.extract_links(content_div, url)
+            
+            # Remove unwanted elements
+            for unwanted in content_div.find_all(['script', 'style', 'table', 'sup']):
+                unwanted.decompose()
+            
+            # Extract text from paragraphs
+            paragraphs = content_div.find_all('p')
+            content = ' '.join(p.get_text() for p in paragraphs)
+            
+            # Clean content
+            content = re.sub(r'\[\d+\]', '', content)
+            content = re.sub(r'\s+', ' ', content)
+            
+            return {
+                'title': title,
+                'content': content.strip(),
+                'url': url,
+                'links': links
+            }
+        
+        return None
+
     def get_wikipedia_content(self, url):
         """
         Fetch and extract main content from a Wikipedia page
+        With a cache, a page fetched before is requested conditionally. If
+        the server answers 304 Not Modified, the page is taken from the
+        cache without parsing it again and marked not_modified.
         """
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Get title
-            title = soup.find(id="firstHeading").text
+            entry = self.cache.get(url) if self.cache is not None else None
+            response = self.fetch(url, entry.validators() if entry is not None else None)
+            if entry is not None and response.status_code == 304:
+                self.cache.record_not_modified(entry)
+                page = entry.page
+                if page is None or entry.extractor != EXTRACTOR_VERSION:
+                    page = self.extract_page(entry.body, url)
+                return dict(page, not_modified=True) if page else None
             
-            # Get main content
-            content_div = soup.find(id="mw-content-text")
-            if content_div:
-                # Extract links before removing elements
-                links = self.extract_links(content_div, url)
-                
-                # Remove unwanted elements
-                for unwanted in content_div.find_all(['script', 'style', 'table', 'sup']):
-                    unwanted.decompose()
-                
-                # Extract text from paragraphs
-                paragraphs = content_div.find_all('p')
-                content = ' '.join(p.get_text() for p in paragraphs)
-                
-                # Clean content
-                content = re.sub(r'\[\d+\]', '', content)
-                content = re.sub(r'\s+', ' ', content)
-                
-                return {
-                    'title': title,
-                    'content': content.strip(),
-                    'url': url,
-                    'links': links
-                }
-            
-            return None
+            page = self.extract_page(response.text, url)
+            if self.cache is not None:
+                self.cache.put(url, response.content, response.headers, page, EXTRACTOR_VERSION)
+            return page
         except Exception as e:
             print(f"Error fetching {url}: {str(e)}")
             return None
         
-    def crawl_wikipedia_pages(self, start_urls, max_pages=10):  # Changed from 6 to 10
+    def iter_pages(self, start_urls, max_pages=10, max_depth=0):
         """
-        Crawl Wikipedia pages starting from given URLs
+        Crawl Wikipedia pages starting from given URLs, yielding
+        (frontier_order, page_data) as soon as each page is downloaded
+        Pages are fetched concurrently by max_workers threads. With
+        max_depth > 0, article links found on a page are added to the
+        frontier until max_depth links away from a start URL. New fetches
+        are only started while the caller consumes pages, so at most
+        max_workers pages are in flight ahead of it. Every crawl starts
+        afresh, so a re-crawl revisits the same pages.
         """
-        documents = {}
-        doc_id = 1
-        all_links = set()
-
-        for url in start_urls:
-            if doc_id > max_pages:
-                break
-                
-            if url not in self.visited_urls:
-                print(f"Crawling page {doc_id}/10: {url}")  # Updated progress message
-                self.visited_urls.add(url)
-                
-                page_data = self.get_wikipedia_content(url)
-                if page_data:
-                    # Store the page data
-                    documents[doc_id] = page_data
-                    
-                    # Add links to content for verification
-                    links_text = "\n Related links: " + "\n".join(page_data['links'])
-                    documents[doc_id]['content'] += links_text
-                    
-                    # Update all_links set
-                    all_links.update(page_data['links'])
-                    
-                    doc_id += 1
-                    
-                # Be nice to Wikipedia's servers
-                time.sleep(1)
-
-        # Verify interconnected links
-        for doc in documents.values():
-            doc['has_internal_links'] = any(link in all_links for link in doc['links'])
+        self.visited_urls = set()
+        frontier = deque((urldefrag(url)[0], 0) for url in start_urls)
+        crawled = 0
+        order = 0
+        in_flight = {}  # {future: (frontier order, depth)}
 
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while frontier or in_flight:
+                # Keep the workers busy without fetching more pages than needed
+                while frontier and len(in_flight) < self.max_workers and crawled + len(in_flight) < max_pages:
+                    url, depth = frontier.popleft()
+                    if url in self.visited_urls:
+                        continue
+                    self.visited_urls.add(url)
+                    order += 1
+                    print(f"Crawling page {crawled + len(in_flight) + 1}/{max_pages}: {url}")
+                    in_flight[executor.submit(self.get_wikipedia_content, url)] = (order, depth)
+
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda future: in_flight[future][0]):
+                    page_order, depth = in_flight.pop(future)
+                    page_data = future.result()
+                    if not page_data:
+                        continue
+                    crawled += 1
+                    if depth < max_depth:
+                        for link in sorted(page_data['links']):
+                            link = urldefrag(link)[0]
+                            if link not in self.visited_urls and self.should_follow(link):
+                                frontier.append((link, depth + 1))
+                    yield page_order, page_data
+
+    def crawl_wikipedia_pages(self, start_urls, max_pages=10, max_depth=0):
+        """
+        Crawl Wikipedia pages starting from given URLs
+        Returns {doc_id: page data}; document ids follow the order in
+        which pages entered the frontier. See iter_pages.
+        """
+        pages = dict(self.iter_pages(start_urls, max_pages, max_depth))
+        documents = {doc_id: pages[page_order] for doc_id, page_order in enumerate(sorted(pages), 1)}
+        mark_internal_links(documents)
         return documents
+
+
+def mark_internal_links(documents):
+    """
+    Set has_internal_links on every document whose links appear among the
+    links collected from all crawled documents
+    """
+    if isinstance(documents, DocumentStore):
+        documents.mark_internal_links()
+        return
+
+    all_links = set()
+    for doc in documents.values():
+        all_links.update(doc['links'])
+
+    # Verify interconnected links
+    for doc in documents.values():
+        doc['has_internal_links'] = any(link in all_links for link in doc['links'])
@@ -0,0 +1,222 @@
+# src/document_store.py
+
+import zlib
+from array import array
+from collections.abc import MutableMapping
+
+# zlib level for document content: 6 is the zlib default speed/size trade-off
+COMPRESSION_LEVEL = 6
+
+# has_internal_links per slot: not computed yet, False, True
+_UNKNOWN, _NO, _YES = 0, 1, 2
+
+
+class DocumentStore(MutableMapping):
+    """
+    Compact {doc_id: document} store for crawled pages
+
+    Titles are kept in one UTF-8 buffer, content zlib-compressed per
+    document, and URLs and links as ids into a table of distinct URLs, with
+    each document's links an array of URL ids. A document is decoded only
+    when it is read, and get_field() decodes a single field of it.
+    Replacing or deleting a document leaves its old data in place until
+    compact() is called. Document ids must be non-negative integers.
+    """
+
+    def __init__(self, documents=None, compression_level=COMPRESSION_LEVEL):
+        self.compression_level = compression_level
+        self._slot_of = array('i')        # Slot of each doc id, -1 when absent
+        self._doc_ids = array('I')        # Doc id of each slot
+        self._titles = bytearray()
+        self._title_offsets = array('Q', [0])
+        self._contents = bytearray()
+        self._content_offsets = array('Q', [0])
+        self._url_ids = array('I')        # URL id of each slot
+        self._link_ids = array('I')
+        self._link_offsets = array('Q', [0])
+        self._has_internal_links = bytearray()
+        self._urls = []                   # URL of each URL id
+        self._url_table = {}              # {url: URL id}
+        self._doc_of_url = array('i')     # Doc id of each URL id, -1 for pages not stored
+        self._count = 0
+        if documents:
+            for doc_id, document in documents.items():
+                self[doc_id] = document
+
+    def _intern_url(self, url):
+        url_id = self._url_table.get(url)
+        if url_id is None:
+            url_id = self._url_table[url] = len(self._urls)
+            self._urls.append(url)
+            self._doc_of_url.append(-1)
+        return url_id
+
+    def _slot(self, doc_id):
+        if isinstance(doc_id, int) and 0 <= doc_id < len(self._slot_of):
+            return self._slot_of[doc_id]
+        return -1
+
+    def _append_slot(self, doc_id, title, url_id, compressed, link_ids, has_internal_links):
+        if doc_id >= len(self._slot_of):
+            self._slot_of.extend([-1] * (doc_id + 1 - len(self._slot_of)))
+        self._slot_of[doc_id] = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._titles.extend(title)
+        self._title_offsets.append(len(self._titles))
+        self._contents.extend(compressed)
+        self._content_offsets.append(len(self._contents))
+        self._url_ids.append(url_id)
+        self._link_ids.extend(link_ids)
+        self._link_offsets.append(len(self._link_ids))
+        self._has_internal_links.append(has_internal_links)
+        self._doc_of_url[url_id] = doc_id
+
+    def __setitem__(self, doc_id, document):
+        if not isinstance(doc_id, int) or doc_id < 0:
+            raise KeyError(doc_id)
+        if doc_id in self:
+            del self[doc_id]
+        has_internal_links = document.get('has_internal_links')
+        self._append_slot(
+            doc_id,
+            document.get('title', '').encode('utf-8'),
+            self._intern_url(document.get('url', '')),
+            zlib.compress(document.get('content', '').encode('utf-8'), self.compression_level),
+            array('I', sorted(self._intern_url(link) for link in document.get('links', ()))),
+            _UNKNOWN if has_internal_links is None else (_YES if has_internal_links else _NO)
+        )
+        self._count += 1
+
+    def __getitem__(self, doc_id):
+        slot = self._slot(doc_id)
+        if slot < 0:
+            raise KeyError(doc_id)
+        document = {
+            'title': self._title_at(slot),
+            'url': self._urls[self._url_ids[slot]],
+            'content': self._content_at(slot),
+            'links': {self._urls[url_id] for url_id in self._link_ids_at(slot)},
+        }
+        if self._has_internal_links[slot] != _UNKNOWN:
+            document['has_internal_links'] = self._has_internal_links[slot] == _YES
+        return document
+
+    def __delitem__(self, doc_id):
+        slot = self._slot(doc_id)
+        if slot < 0:
+            raise KeyError(doc_id)
+        self._slot_of[doc_id] = -1
+        url_id = self._url_ids[slot]
+        if self._doc_of_url[url_id] == doc_id:
+            self._doc_of_url[url_id] = -1
+        self._count -= 1
+
+    def __contains__(self, doc_id):
+        return self._slot(doc_id) >= 0
+
+    def __iter__(self):
+        return (doc_id for doc_id, slot in enumerate(self._slot_of) if slot >= 0)
+
+    def __len__(self):
+        return self._count
+
+    def _title_at(self, slot):
+        return self._titles[self._title_offsets[slot]:self._title_offsets[slot + 1]].decode('utf-8')
+
+    def _content_at(self, slot):
+        compressed = self._contents[self._content_offsets[slot]:self._content_offsets[slot + 1]]
+        return zlib.decompress(compressed).decode('utf-8')
+
+    def _link_ids_at(self, slot):
+        return self._link_ids[self._link_offsets[slot]:self._link_offsets[slot + 1]]
+
+    def get_field(self, doc_id, field):
+        """
+        A single field of a document, decoding nothing else
+        """
+        slot = self._slot(doc_id)
+        if slot < 0:
+            raise KeyError(doc_id)
+        if field == 'title':
+            return self._title_at(slot)
+        if field == 'url':
+            return self._urls[self._url_ids[slot]]
+        if field == 'content':
+            return self._content_at(slot)
+        if field == 'links':
+            return {self._urls[url_id] for url_id in self._link_ids_at(slot)}
+        return self[doc_id][field]
+
+    def doc_id_of_url(self, url):
+        """
+        Id of the stored document with this URL, or None
+        """
+        url_id = self._url_table.get(url)
+        if url_id is None or self._doc_of_url[url_id] < 0:
+            return None
+        return self._doc_of_url[url_id]
+
+    def link_ids(self, doc_id):
+        """
+        URL ids of the pages a document links to, as array('I')
+        """
+        slot = self._slot(doc_id)
+        if slot < 0:
+            raise KeyError(doc_id)
+        return self._link_ids_at(slot)
+
+    def linked_doc_ids(self, doc_id):
+        """
+        Sorted ids of the stored documents a document links to
+        """
+        doc_of_url = self._doc_of_url
+        return sorted({doc_of_url[url_id] for url_id in self.link_ids(doc_id) if doc_of_url[url_id] >= 0})
+
+    def mark_internal_links(self):
+        """
+        Set has_internal_links as crawler.mark_internal_links does, from the URL ids
+        """
+        linked = set()
+        for doc_id in self:
+            linked.update(self.link_ids(doc_id))
+        for doc_id in self:
+            slot = self._slot_of[doc_id]
+            has_internal_links = any(url_id in linked for url_id in self._link_ids_at(slot))
+            self._has_internal_links[slot] = _YES if has_internal_links else _NO
+
+    def compact(self):
+        """
+        Drop the data of replaced and deleted documents
+        Compressed content is copied as it is, without recompressing.
+        URLs no longer referenced stay in the URL table.
+        """
+        old = DocumentStore.__new__(DocumentStore)
+        old.__dict__.update(self.__dict__)
+        self.__init__(compression_level=self.compression_level)
+        self._urls, self._url_table = old._urls, old._url_table
+        self._doc_of_url = array('i', [-1]) * len(self._urls)
+        for doc_id in old:
+            slot = old._slot_of[doc_id]
+            self._append_slot(
+                doc_id,
+                old._titles[old._title_offsets[slot]:old._title_offsets[slot + 1]],
+                old._url_ids[slot],
+                old._contents[old._content_offsets[slot]:old._content_offsets[slot + 1]],
+                old._link_ids_at(slot),
+                old._has_internal_links[slot]
+            )
+            self._count += 1
+
+    def stats(self):
+        """
+        Sizes of the stored data in bytes; slots include replaced and
+        deleted documents until compact()
+        """
+        return {
+            'documents': self._count,
+            'slots': len(self._doc_ids),
+            'urls': len(self._urls),
+            'title_bytes': len(self._titles),
+            'compressed_content_bytes': len(self._contents),
+            'link_bytes': self._link_ids.itemsize * len(self._link_ids),
+        }
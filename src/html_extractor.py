@@ -0,0 +1,245 @@
+# src/html_extractor.py
+
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# Elements html.parser never sees an end tag for
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image',
+    'img', 'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source',
+    'spacer', 'track', 'wbr'
+])
+
+# Elements whose text is not part of the text of the elements around them
+NON_TEXT_ELEMENTS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+# Kind of text of CDATA sections, which count as text wherever they are
+CDATA = '<![CDATA['
+
+# Elements of the main content dropped before its paragraphs are read
+REMOVED_ELEMENTS = frozenset(['script', 'style', 'table', 'sup'])
+
+PRESERVE_WHITESPACE_ELEMENTS = frozenset(['pre', 'textarea'])
+
+ASCII_WHITESPACE = frozenset('\x20\x0a\x09\x0c\x0d')
+
+TITLE_ID = 'firstHeading'
+CONTENT_ID = 'mw-content-text'
+
+# Flags of an open element: what closing it ends
+_TITLE, _REMOVED, _PARAGRAPH, _NON_TEXT, _PRESERVE, _CONTENT = 1, 2, 4, 8, 16, 32
+
+_NUMERIC_REFERENCE = re.compile(r'^(?:[xX]([0-9a-fA-F]+)|([0-9]+))(.*)$', re.S)
+
+
+def numeric_reference(name):
+    """
+    Character of a numeric character reference such as 65 or x41
+    Follows the HTML specification: out-of-range values and surrogates
+    become U+FFFD and C1 controls are read as Windows-1252.
+    Returns (character, data following the reference)
+    """
+    match = _NUMERIC_REFERENCE.match(name)
+    if match is None:
+        return '', name
+    hex_digits, decimal_digits, extra = match.groups()
+    number = int(hex_digits, 16) if hex_digits is not None else int(decimal_digits)
+    if number == 0 or number > 0x10ffff or 0xd800 <= number <= 0xdfff:
+        return '\ufffd', extra
+    if 0x80 <= number <= 0x9f:
+        try:
+            return bytes([number]).decode('cp1252'), extra
+        except UnicodeDecodeError:
+            pass
+    return chr(number), extra
+
+
+class WikipediaPageParser(HTMLParser):
+    """
+    Single pass over a Wikipedia page collecting its title, the text of
+    the paragraphs of its main content and the /wiki/ links in it
+
+    Produces what extracting with BeautifulSoup's html.parser tree does:
+    the same tag nesting (an end tag closes every element opened after
+    the matching start tag), entity handling and whitespace-only strings,
+    so no tree is built. Script, style, table and sup elements inside the
+    main content are skipped as if they had been removed from the tree.
+    Text is handed to the open title and paragraphs whenever a tag ends
+    it, as BeautifulSoup creates a string.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.stack = []              # (tag, flags) of the open elements
+        self.data = []               # Text since the last tag
+        self.title = None            # Text chunks of the title element, once found
+        self.title_text = None       # Kind of text of the title, see _text_kind
+        self.links = []              # href values of the anchors in the main content
+        self.paragraphs = []         # Text chunks of each paragraph in the main content
+        self.open_paragraphs = []    # Indices of the paragraphs open now
+        self.found_content = False
+        self.title_open = False
+        # Open elements in the main content, removed from it, without text, preserving whitespace
+        self.content_depth = 0
+        self.removed_depth = 0
+        self.preserve_depth = 0
+        self.non_text = []           # Open NON_TEXT_ELEMENTS, innermost last
+        self.closed_void = []        # Void elements whose redundant end tag is still to come
+
+    def _text_kind(self):
+        """
+        None for ordinary text, else the innermost open non-text element
+        """
+        return self.non_text[-1] if self.non_text else None
+
+    def _flush(self, kind=None):
+        """
+        Hand the text since the last tag to the open title and paragraphs
+        Elements keep the ordinary text and CDATA inside them; a non-text
+        title element such as script keeps only its own kind of text.
+        """
+        if not self.data:
+            return
+        text = ''.join(self.data)
+        self.data = []
+        kind = kind or self._text_kind()
+        if not self.preserve_depth and all(character in ASCII_WHITESPACE for character in text):
+            text = '\n' if '\n' in text else ' '
+        if self.title_open and (kind == self.title_text or kind == CDATA and self.title_text is None):
+            self.title.append(text)
+        if self.open_paragraphs and not self.removed_depth and kind in (None, CDATA):
+            for index in self.open_paragraphs:
+                self.paragraphs[index].append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        attributes = {}
+        for name, value in attrs:
+            attributes[name] = '' if value is None else value
+        element_id = attributes.get('id')
+
+        in_content = self.content_depth > 0
+        flags = 0
+        if self.title is None and element_id == TITLE_ID:
+            self.title = []
+            self.title_text = tag if tag in NON_TEXT_ELEMENTS else None
+            self.title_open = True
+            flags |= _TITLE
+        if in_content:
+            if tag == 'a' and 'href' in attributes:
+                self.links.append(attributes['href'])
+            if tag in REMOVED_ELEMENTS:
+                self.removed_depth += 1
+                flags |= _REMOVED
+            elif tag == 'p' and not self.removed_depth:
+                self.open_paragraphs.append(len(self.paragraphs))
+                self.paragraphs.append([])
+                flags |= _PARAGRAPH
+        if tag in NON_TEXT_ELEMENTS:
+            self.non_text.append(tag)
+            flags |= _NON_TEXT
+        if tag in PRESERVE_WHITESPACE_ELEMENTS:
+            self.preserve_depth += 1
+            flags |= _PRESERVE
+        if in_content or (not self.found_content and element_id == CONTENT_ID):
+            self.found_content = True
+            self.content_depth += 1
+            flags |= _CONTENT
+
+        self.stack.append((tag, flags))
+        if tag in VOID_ELEMENTS:
+            self._pop()
+            self.closed_void.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self.closed_void.remove(tag)
+        else:
+            self._pop()
+
+    def handle_endtag(self, tag):
+        if tag in self.closed_void:
+            # End tag of a void element, already closed at its start tag
+            self.closed_void.remove(tag)
+            return
+        self._flush()
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                while len(self.stack) > depth:
+                    self._pop()
+                return
+
+    def _pop(self):
+        tag, flags = self.stack.pop()
+        if flags & _TITLE:
+            self.title_open = False
+        if flags & _REMOVED:
+            self.removed_depth -= 1
+        if flags & _PARAGRAPH:
+            self.open_paragraphs.pop()
+        if flags & _NON_TEXT:
+            self.non_text.pop()
+        if flags & _PRESERVE:
+            self.preserve_depth -= 1
+        if flags & _CONTENT:
+            self.content_depth -= 1
+
+    def handle_data(self, data):
+        self.data.append(data)
+
+    def handle_entityref(self, name):
+        character = html5.get(name + ';')
+        self.data.append(character if character is not None else '&' + name)
+
+    def handle_charref(self, name):
+        character, extra = numeric_reference(name)
+        self.data.append(character + extra)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith('CDATA['):
+            self.data.append(data[len('CDATA['):])
+            self._flush(CDATA)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def extract_wikipedia_page(markup, url, base_url):
+    """
+    Title, paragraph text and /wiki/ links of a Wikipedia page in one pass
+    Returns the same dictionary as WebCrawler's BeautifulSoup extraction,
+    None for pages without main content. Raises ValueError without a title.
+    """
+    if isinstance(markup, bytes):
+        markup = markup.decode('utf-8', errors='replace')
+    parser = WikipediaPageParser()
+    parser.feed(markup)
+    parser.close()
+    if parser.title is None:
+        raise ValueError(f"No #{TITLE_ID} element in {url}")
+    if not parser.found_content:
+        return None
+
+    content = ' '.join(''.join(paragraph) for paragraph in parser.paragraphs)
+    content = re.sub(r'\[\d+\]', '', content)
+    content = re.sub(r'\s+', ' ', content)
+    return {
+        'title': ''.join(parser.title),
+        'content': content.strip(),
+        'url': url,
+        'links': {urljoin(base_url, href) for href in parser.links if href.startswith('/wiki/')}
+    }
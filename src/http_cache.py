@@ -0,0 +1,118 @@
+# src/http_cache.py
+
+import hashlib
+import json
+import os
+import threading
+
+
+class CacheEntry:
+    """
+    A cached response: raw body, validators and the page extracted from it
+    """
+
+    def __init__(self, url, body, etag=None, last_modified=None, page=None, extractor=None):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.page = page
+        self.extractor = extractor
+
+    def validators(self):
+        """
+        Headers that make a request conditional on the page having changed
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    On-disk cache of fetched pages keyed by URL
+
+    Every entry is two files named by the SHA-256 of the URL: the raw
+    response body, and JSON holding the ETag and Last-Modified validators
+    with the page extracted from the body. Files are written to a
+    temporary path and renamed into place; the JSON is written last, so
+    an entry is only seen once it is complete. Thread-safe.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.not_modified = 0      # Revalidated pages, not downloaded again
+        self.downloaded = 0        # Pages downloaded in full
+        self.bytes_saved = 0       # Body bytes not downloaded thanks to revalidation
+        self.bytes_downloaded = 0
+
+    def _path(self, url, suffix):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + suffix)
+
+    def _write(self, path, data):
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def get(self, url):
+        """
+        The cached entry for a URL, or None
+        """
+        try:
+            with open(self._path(url, '.json'), 'rb') as f:
+                metadata = json.loads(f.read().decode('utf-8'))
+            with open(self._path(url, '.html'), 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if metadata.get('url') != url:
+            return None
+        page = metadata.get('page')
+        if page is not None:
+            page['links'] = set(page.get('links', ()))
+        return CacheEntry(url, body, metadata.get('etag'), metadata.get('last_modified'),
+                          page, metadata.get('extractor'))
+
+    def put(self, url, body, headers, page=None, extractor=None):
+        """
+        Store a downloaded body with the validators from its response headers
+        Responses without an ETag or Last-Modified cannot be revalidated and
+        are not stored.
+        """
+        with self.lock:
+            self.downloaded += 1
+            self.bytes_downloaded += len(body)
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        if page is not None:
+            page = dict(page, links=sorted(page.get('links', ())))
+        metadata = {'url': url, 'etag': etag, 'last_modified': last_modified,
+                    'page': page, 'extractor': extractor}
+        self._write(self._path(url, '.html'), body)
+        self._write(self._path(url, '.json'), json.dumps(metadata).encode('utf-8'))
+
+    def record_not_modified(self, entry):
+        """
+        Count a 304 answer for a cached entry
+        """
+        with self.lock:
+            self.not_modified += 1
+            self.bytes_saved += len(entry.body)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'downloaded': self.downloaded,
+                'not_modified': self.not_modified,
+                'bytes_downloaded': self.bytes_downloaded,
+                'bytes_saved': self.bytes_saved,
+            }
@@ -0,0 +1,382 @@
+# src/index_file.py
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+
+from src.postings import CompactOccurrenceList, intersect_doc_ids
+from src.ranking import inverse_document_frequency
+from src.term_dictionary import TermDictionary, CompletionCache, COMPLETION_CACHE_SIZE
+
+MAGIC = b'SEIDX\x00\x00\x01'
+FORMAT_VERSION = 5
+
+# Sections, each recorded as (offset, length) in the header
+SECTIONS = [
+    'stats',              # JSON encoded index statistics
+    'term_text',          # UTF-8 terms concatenated in sorted order
+    'term_offsets',       # array('I'): num_terms + 1 offsets into term_text
+    'term_postings',      # array('Q'): file offset of each term's postings record
+    'term_dfs',           # array('I'): document frequency of each term
+    'term_idf',           # array('d'): BM25 IDF of each term
+    'postings',           # per-term records: doc ids, frequencies, position offsets, positions
+    'doc_ids',            # array('I'): sorted document ids
+    'doc_field_offsets',  # array('Q'): 4 * num_docs + 1 offsets into doc_data
+    'doc_data',           # UTF-8 title, url, content and newline-joined links per document
+    'document_lengths',   # array('I'): number of indexed terms, indexed by doc id
+    'doc_token_offsets',  # array('Q'): num_docs + 1 offsets into token_offsets, by doc_ids order
+    'token_offsets',      # array('I'): start, end character offsets of each token position
+    'static_scores',      # array('d'): static ranking score (PageRank), indexed by doc id
+    'duplicate_of',       # array('i'): doc id of the original of each near-duplicate, else -1
+]
+DOC_FIELDS = ('title', 'url', 'content', 'links')
+
+HEADER = struct.Struct('<8sIIII')
+SECTION_ENTRY = struct.Struct('<QQ')
+HEADER_SIZE = HEADER.size + SECTION_ENTRY.size * len(SECTIONS)
+
+
+def _pad(f, alignment=8):
+    """
+    Pad the file with zeros up to the next alignment boundary
+    """
+    remainder = f.tell() % alignment
+    if remainder:
+        f.write(b'\x00' * (alignment - remainder))
+
+
+def write_index(filepath, trie, documents, index_stats=None, token_offsets=None,
+                document_frequencies=None, static_scores=None, duplicate_of=None):
+    """
+    Write the trie postings and documents to a binary index file
+    Document lengths and term IDF are derived from the postings.
+    token_offsets optionally maps doc ids to the character offsets of
+    their token positions, for snippets.
+    document_frequencies ({word: document frequency}) and index_stats may
+    describe a larger collection, such as all shards of a sharded index;
+    term IDF is then computed from them instead of this file's postings.
+    static_scores is an optional array('d') of per-document scores, such
+    as PageRank, indexed by doc id. duplicate_of optionally maps doc ids
+    to the original of near-duplicate documents (-1 for the others).
+    The file is written to a temporary path and renamed into place
+    """
+    temp_path = filepath + '.tmp'
+    term_text = bytearray()
+    term_offsets = array('I', [0])
+    term_postings = array('Q')
+    term_dfs = array('I')
+    idf_dfs = array('I')  # Document frequencies IDF is computed from
+    document_lengths = array('I', [0]) * (max(documents, default=0) + 1)
+    sections = {}
+
+    with open(temp_path, 'wb') as f:
+        f.write(b'\x00' * HEADER_SIZE)
+
+        # Postings are written first; the term dictionary is collected on the way
+        start = f.tell()
+        for word, occurrence_list in trie.iter_terms():
+            # Terms whose documents were all deleted match nothing, as in Trie.freeze
+            if not len(occurrence_list):
+                continue
+            if not isinstance(occurrence_list, CompactOccurrenceList):
+                occurrence_list = CompactOccurrenceList.from_occurrence_list(occurrence_list)
+            term_text.extend(word.encode('utf-8'))
+            term_offsets.append(len(term_text))
+            term_postings.append(f.tell())
+            term_dfs.append(len(occurrence_list))
+            idf_dfs.append(document_frequencies[word] if document_frequencies is not None
+                           else len(occurrence_list))
+            for doc_id, frequency in zip(occurrence_list.doc_id_array, occurrence_list.frequency_array):
+                if doc_id < len(document_lengths):
+                    document_lengths[doc_id] += frequency
+            f.write(array('I', occurrence_list.doc_id_array).tobytes())
+            f.write(array('I', occurrence_list.frequency_array).tobytes())
+            f.write(array('I', occurrence_list.position_offsets).tobytes())
+            f.write(bytes(occurrence_list.position_data))
+            _pad(f, 4)
+        sections['postings'] = (start, f.tell() - start)
+        _pad(f)
+
+        total_documents = len(documents)
+        stats = dict(index_stats or {})
+        stats.setdefault('total_documents', total_documents)
+        stats.setdefault('average_document_length',
+                         sum(document_lengths) / total_documents if total_documents else 0)
+        term_idf = array('d', (inverse_document_frequency(stats['total_documents'], document_frequency)
+                               for document_frequency in idf_dfs))
+
+        for name, data in [('stats', json.dumps(stats).encode('utf-8')),
+                           ('term_text', bytes(term_text)),
+                           ('term_offsets', term_offsets.tobytes()),
+                           ('term_postings', term_postings.tobytes()),
+                           ('term_dfs', term_dfs.tobytes()),
+                           ('term_idf', term_idf.tobytes()),
+                           ('document_lengths', document_lengths.tobytes())]:
+            start = f.tell()
+            f.write(data)
+            sections[name] = (start, len(data))
+            _pad(f)
+
+        doc_ids = array('I', sorted(documents))
+        doc_field_offsets = array('Q', [0])
+        doc_data = bytearray()
+        doc_token_offsets = array('Q', [0])
+        all_token_offsets = array('I')
+        for doc_id in doc_ids:
+            if token_offsets and doc_id in token_offsets:
+                all_token_offsets.extend(token_offsets[doc_id])
+            doc_token_offsets.append(len(all_token_offsets))
+            doc_data_fields = documents[doc_id]
+            for field in DOC_FIELDS:
+                value = doc_data_fields.get(field, '')
+                if field == 'links':
+                    value = '\n'.join(sorted(value))
+                doc_data.extend(value.encode('utf-8'))
+                doc_field_offsets.append(len(doc_data))
+
+        for name, data in [('doc_ids', doc_ids.tobytes()),
+                           ('doc_field_offsets', doc_field_offsets.tobytes()),
+                           ('doc_data', bytes(doc_data)),
+                           ('doc_token_offsets', doc_token_offsets.tobytes()),
+                           ('token_offsets', all_token_offsets.tobytes()),
+                           ('static_scores', array('d', static_scores or ()).tobytes()),
+                           ('duplicate_of', array('i', duplicate_of or ()).tobytes())]:
+            start = f.tell()
+            f.write(data)
+            sections[name] = (start, len(data))
+            _pad(f)
+
+        f.seek(0)
+        byteorder = 0 if sys.byteorder == 'little' else 1
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, byteorder, len(term_dfs), len(doc_ids)))
+        for name in SECTIONS:
+            f.write(SECTION_ENTRY.pack(*sections[name]))
+
+    os.replace(temp_path, filepath)
+
+
+class MappedOccurrenceLists(Sequence):
+    """
+    Sequence of occurrence lists backed by the mapped postings section
+    Mirrors Trie.occurrence_lists, indexed by occurrence list index
+    """
+
+    def __init__(self, index):
+        self._index = index
+
+    def __getitem__(self, term_index):
+        return self._index._occurrence_list_at(term_index)
+
+    def __len__(self):
+        return self._index.num_terms
+
+
+class MappedDocuments(Mapping):
+    """
+    Read-only {doc_id: document} view over the mapped document store
+    Each access decodes only the requested document
+    """
+
+    def __init__(self, index):
+        self._index = index
+
+    def _locate(self, doc_id):
+        doc_ids = self._index._doc_ids
+        position = bisect_left(doc_ids, doc_id)
+        if position < len(doc_ids) and doc_ids[position] == doc_id:
+            return position
+        return -1
+
+    def __getitem__(self, doc_id):
+        return {field: self.get_field(doc_id, field) for field in DOC_FIELDS}
+
+    def get_field(self, doc_id, field):
+        """
+        A single field of a document, decoding nothing else
+        """
+        position = self._locate(doc_id) if isinstance(doc_id, int) else -1
+        if position < 0:
+            raise KeyError(doc_id)
+        offsets = self._index._doc_field_offsets
+        slot = position * len(DOC_FIELDS) + DOC_FIELDS.index(field)
+        value = bytes(self._index._doc_data[offsets[slot]:offsets[slot + 1]]).decode('utf-8')
+        if field == 'links':
+            value = set(value.split('\n')) if value else set()
+        return value
+
+    def __contains__(self, doc_id):
+        return isinstance(doc_id, int) and self._locate(doc_id) >= 0
+
+    def __iter__(self):
+        return iter(self._index._doc_ids)
+
+    def __len__(self):
+        return len(self._index._doc_ids)
+
+
+class MappedIndex:
+    """
+    Read-only index opened from a file written by write_index
+
+    The file is memory-mapped and nothing is rebuilt in Python objects:
+    terms are found by binary search over the mapped TermDictionary and
+    posting lists are CompactOccurrenceLists over slices of the mapping.
+    Exposes the same lookup methods as Trie, so SearchEngine can use it
+    in place of a trie, with `documents` in place of the documents dict.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version, byteorder, self.num_terms, self.num_docs = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{filepath} is not a search engine index file")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported index format version {version}")
+        if byteorder != (0 if sys.byteorder == 'little' else 1):
+            self.close()
+            raise ValueError("Index file was written on a machine with different byte order")
+
+        self._sections = {}
+        for number, name in enumerate(SECTIONS):
+            self._sections[name] = SECTION_ENTRY.unpack_from(
+                self._mmap, HEADER.size + number * SECTION_ENTRY.size
+            )
+
+        self.index_stats = json.loads(bytes(self._section('stats')).decode('utf-8'))
+        self.terms = TermDictionary(
+            self._section('term_text'), self._section('term_offsets').cast('I')
+        )
+        self._term_postings = self._section('term_postings').cast('Q')
+        self._term_dfs = self._section('term_dfs').cast('I')
+        self.term_idf = self._section('term_idf').cast('d')
+        self.document_lengths = self._section('document_lengths').cast('I')
+        self._doc_ids = self._section('doc_ids').cast('I')
+        self._doc_field_offsets = self._section('doc_field_offsets').cast('Q')
+        self._doc_data = self._section('doc_data')
+        self._doc_token_offsets = self._section('doc_token_offsets').cast('Q')
+        self._token_offsets = self._section('token_offsets').cast('I')
+        self.static_scores = self._section('static_scores').cast('d')
+        self.duplicate_of = self._section('duplicate_of').cast('i')
+
+        self.occurrence_lists = MappedOccurrenceLists(self)
+        self.documents = MappedDocuments(self)
+        self._completions = None  # CompletionCache, built on first prefix search
+
+    def _section(self, name):
+        offset, length = self._sections[name]
+        return self._buffer[offset:offset + length]
+
+    def _occurrence_list_at(self, term_index):
+        if not 0 <= term_index < self.num_terms:
+            raise IndexError(term_index)
+        df = self._term_dfs[term_index]
+        start = self._term_postings[term_index]
+        doc_ids = self._buffer[start:start + 4 * df].cast('I')
+        start += 4 * df
+        frequencies = self._buffer[start:start + 4 * df].cast('I')
+        start += 4 * df
+        position_offsets = self._buffer[start:start + 4 * (df + 1)].cast('I')
+        start += 4 * (df + 1)
+        position_data = self._buffer[start:start + position_offsets[df]]
+        return CompactOccurrenceList(doc_ids, frequencies, position_offsets, position_data)
+
+    def search(self, word):
+        """
+        Search for a word in the term dictionary
+        Returns (is_found, occurrence_list_index) tuple
+        """
+        term_index = self.terms.find(word)
+        if term_index >= 0:
+            return True, term_index
+        return False, None
+
+    def get_occurrence_list(self, word):
+        """
+        Get the occurrence list for a word
+        """
+        term_index = self.terms.find(word)
+        if term_index >= 0:
+            return self._occurrence_list_at(term_index)
+        return None
+
+    def intersection_search(self, query_terms):
+        """
+        Find documents containing all query terms
+        """
+        if not query_terms:
+            return set()
+        occurrences = []
+        for term in query_terms:
+            occurrence_list = self.get_occurrence_list(term)
+            if occurrence_list is None:
+                return set()  # Term not found
+            occurrences.append(occurrence_list)
+        return intersect_doc_ids(occurrences)
+
+    def prefix_search(self, prefix, limit=COMPLETION_CACHE_SIZE):
+        """
+        Top completions of a prefix ranked by document frequency
+        Returns a list of (word, document_frequency) pairs
+        """
+        if self._completions is None:
+            self._completions = CompletionCache(self.terms, self._term_dfs)
+        return self._completions.top_completions(prefix, limit)
+
+    def get_token_offsets(self, doc_id):
+        """
+        Start, end character offsets of each token position in a document's
+        content, as a view into the mapping, or None if none were stored
+        """
+        position = self.documents._locate(doc_id)
+        if position < 0:
+            return None
+        start = self._doc_token_offsets[position]
+        end = self._doc_token_offsets[position + 1]
+        if start == end:
+            return None
+        return self._token_offsets[start:end]
+
+    def iter_terms(self):
+        """
+        Yield (word, occurrence_list) pairs in sorted word order
+        """
+        for term_index in range(self.num_terms):
+            yield self.terms.term_at(term_index), self._occurrence_list_at(term_index)
+
+    def prefix_terms(self, prefix):
+        """
+        Yield (word, occurrence_list) pairs of every term starting with
+        prefix, in sorted word order
+        """
+        start, end = self.terms.prefix_range(prefix)
+        for term_index in range(start, end):
+            yield self.terms.term_at(term_index), self._occurrence_list_at(term_index)
+
+    def close(self):
+        """
+        Release the mapping; occurrence lists handed out must not be used afterwards
+        """
+        try:
+            self._buffer.release()
+            self._mmap.close()
+        except BufferError:
+            # Views into the mapping are still alive; they keep it open until collected
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,81 +1,286 @@
 # src/indexer.py
 
+from array import array
 from collections import defaultdict
-import math
+from concurrent.futures import ProcessPoolExecutor
 import json
 import os
 
+from src.index_file import write_index
+from src.link_graph import build_link_graph, pagerank
+from src.near_duplicates import DuplicateDetector
+from src.ranking import inverse_document_frequency
+
+# Documents sent to a worker process at a time by build_index(workers=N)
+WORKER_CHUNK_SIZE = 8
+
+# What build_index does with near-duplicates of documents indexed before
+DUPLICATE_MODES = ('skip', 'collapse')
+
+# The processor of a worker process, set once by _init_worker
+_worker_processor = None
+
+
+def _process_content(processor, content, doc_id):
+    """
+    Run document content through the processor
+    Returns (word_positions, token_offsets); token_offsets is None if
+    the processor does not provide them
+    """
+    # Process document text, keeping token offsets for snippets if the processor provides them
+    if hasattr(processor, 'process_document_with_offsets'):
+        return processor.process_document_with_offsets(content, doc_id)
+    return processor.process_document(content, doc_id), None
+
+
+def _init_worker(processor):
+    global _worker_processor
+    _worker_processor = processor
+
+
+def _process_in_worker(item):
+    """
+    Process one document in a worker process
+    Positions are returned as array('I') so they are pickled compactly
+    """
+    doc_id, content = item
+    word_positions, token_offsets = _process_content(_worker_processor, content, doc_id)
+    postings = {word: array('I', positions) for word, positions in word_positions.items()}
+    return doc_id, postings, token_offsets
+
+
 class Indexer:
     def __init__(self, trie):
         self.trie = trie
         self.document_vectors = {}  # For storing document vectors
         self.total_documents = 0
+        self.document_lengths = array('I')  # Terms per document, indexed by doc_id
+        self.term_idf = array('d')  # BM25 IDF, indexed by occurrence list index
+        self.token_offsets = {}  # {doc_id: array('I') of start, end character offsets per position}
+        self.static_scores = array('d')  # PageRank, indexed by doc_id
+        self.duplicate_of = array('i')  # Doc id of the original of each indexed near-duplicate, else -1
+        self.skipped_duplicates = {}  # {doc_id: original} of near-duplicates left out of the index
+        self.duplicate_stats = None  # Set by build_index when it looks for duplicates
         self.index_stats = {
             'total_documents': 0,
             'total_terms': 0,
             'average_document_length': 0
         }
     
-    def build_index(self, documents, processor):
+    def build_index(self, documents, processor, workers=1, duplicates=None):
         """
         Build the index from documents
+        With workers > 1, documents are tokenized and stemmed in that many
+        worker processes; the postings are still added to the trie in
+        document order, so the index is identical to a serial build.
+        The processor must be picklable.
+        duplicates looks for near-duplicates of documents indexed before
+        them (src.near_duplicates): 'skip' leaves them out of the index,
+        'collapse' indexes them in the group of their original, so that
+        SearchEngine returns one result per group.
         """
+        if duplicates is not None and duplicates not in DUPLICATE_MODES:
+            raise ValueError(f"Unknown duplicate handling {duplicates!r}; expected one of {DUPLICATE_MODES}")
         print("Building index...")
-        self.total_documents = len(documents)
-        total_terms = 0
-        total_length = 0
+        detector = DuplicateDetector() if duplicates else None
+        if detector is not None:
+            self.duplicate_stats = {'mode': duplicates, 'skipped_postings': 0, 'skipped_positions': 0}
         
-        for doc_id, doc_data in documents.items():
-            print(f"Indexing document {doc_id}: {doc_data['title']}")
-            
-            # Process document text
-            word_positions = processor.process_document(doc_data['content'], doc_id)
-            
-            # Update document length
-            doc_length = sum(len(positions) for positions in word_positions.values())
-            total_length += doc_length
-            
-            # Create document vector
-            self.document_vectors[doc_id] = defaultdict(int)
-            
-            # Add terms to trie and update document vector
-            for word, positions in word_positions.items():
-                total_terms += len(positions)
-                self.document_vectors[doc_id][word] = len(positions)
-                
-                for position in positions:
-                    self.trie.insert(word, doc_id, position)
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(processor,)) as executor:
+                items = ((doc_id, doc_data['content']) for doc_id, doc_data in documents.items())
+                for doc_id, word_positions, token_offsets in executor.map(
+                        _process_in_worker, items, chunksize=WORKER_CHUNK_SIZE):
+                    self._build_document(doc_id, documents[doc_id], word_positions, token_offsets, detector)
+        else:
+            for doc_id, doc_data in documents.items():
+                word_positions, token_offsets = self.process_document(doc_id, doc_data, processor)
+                self._build_document(doc_id, doc_data, word_positions, token_offsets, detector)
+        
+        if detector is not None:
+            self.duplicate_stats.update(detector.stats())
+        self.finish_index()
+        self.compute_link_scores(documents)
+        
+        print("Indexing completed!")
+        self._print_index_stats()
+    
+    def _build_document(self, doc_id, doc_data, word_positions, token_offsets, detector):
+        """
+        Add a document for build_index, unless it is a near-duplicate to skip
+        """
+        if detector is not None:
+            original = detector.add(doc_id, word_positions)
+            if original is not None:
+                if self.duplicate_stats['mode'] == 'skip':
+                    self.skipped_duplicates[doc_id] = original
+                    print(f"Skipping document {doc_id}: {doc_data['title']} (near-duplicate of {original})")
+                    self.duplicate_stats['skipped_postings'] += len(word_positions)
+                    self.duplicate_stats['skipped_positions'] += sum(
+                        len(positions) for positions in word_positions.values())
+                    return
+                self._set_duplicate(doc_id, original)
+        print(f"Indexing document {doc_id}: {doc_data['title']}")
+        self.add_document(doc_id, doc_data, word_positions=word_positions, token_offsets=token_offsets)
+    
+    def process_document(self, doc_id, doc_data, processor):
+        """
+        Run a document through the processor
+        Returns (word_positions, token_offsets); token_offsets is None if
+        the processor does not provide them
+        """
+        return _process_content(processor, doc_data['content'], doc_id)
+    
+    def add_document(self, doc_id, doc_data, processor=None, word_positions=None, token_offsets=None):
+        """
+        Add one document to the index and update the statistics
+        Pass either a processor or the already processed word_positions.
+        Term IDF is not updated until finish_index is called.
+        """
+        if word_positions is None:
+            word_positions, token_offsets = self.process_document(doc_id, doc_data, processor)
+        # Add all postings of the document to the trie in one pass, first, so
+        # that nothing changes if the trie is read-only
+        self.trie.insert_document(doc_id, word_positions)
+        if token_offsets is not None:
+            self.token_offsets[doc_id] = token_offsets
+        
+        # Update document length
+        doc_length = sum(len(positions) for positions in word_positions.values())
+        self._set_document_length(doc_id, doc_length)
+        
+        # Create document vector
+        self.document_vectors[doc_id] = defaultdict(int)
+        
+        # Update document vector
+        for word, positions in word_positions.items():
+            self.document_vectors[doc_id][word] = len(positions)
         
         # Update index statistics
+        self.total_documents += 1
+        total_terms = self.index_stats['total_terms'] + doc_length
         self.index_stats.update({
             'total_documents': self.total_documents,
             'total_terms': total_terms,
-            'average_document_length': total_length / self.total_documents if self.total_documents > 0 else 0
+            'average_document_length': total_terms / self.total_documents
         })
+    
+    def delete_document(self, doc_id):
+        """
+        Remove a document from the index and the statistics
+        Returns False if the document is not indexed. Precomputed term IDF
+        is dropped, so BM25 computes IDF per query until finish_index.
+        """
+        document_vector = self.document_vectors.get(doc_id)
+        if document_vector is None:
+            return False
+        # The trie goes first, so that nothing changes if it is read-only
+        self.trie.delete_document(doc_id, list(document_vector))
+        del self.document_vectors[doc_id]
+        self.token_offsets.pop(doc_id, None)
         
-        print("Indexing completed!")
-        self._print_index_stats()
+        # Update index statistics
+        doc_length = self.document_lengths[doc_id]
+        self.document_lengths[doc_id] = 0
+        self.total_documents -= 1
+        total_terms = self.index_stats['total_terms'] - doc_length
+        self.index_stats.update({
+            'total_documents': self.total_documents,
+            'total_terms': total_terms,
+            'average_document_length': total_terms / self.total_documents if self.total_documents > 0 else 0
+        })
+        self.term_idf = array('d')
+        return True
+    
+    def update_document(self, doc_id, doc_data, processor=None, word_positions=None, token_offsets=None):
+        """
+        Replace the indexed version of a document (or add it if it is new)
+        """
+        self.delete_document(doc_id)
+        self.add_document(doc_id, doc_data, processor, word_positions, token_offsets)
+        self.term_idf = array('d')
+    
+    def finish_index(self):
+        """
+        Compute the statistics that depend on the whole collection
+        """
+        self._compute_term_idf()
+    
+    def compute_link_scores(self, documents):
+        """
+        PageRank of the documents over the links between them, as a static
+        ranking signal (see SearchEngine's static_weight)
+        Skipped near-duplicates are not part of the graph
+        """
+        graph = build_link_graph(documents, self.skipped_duplicates)
+        self.static_scores = pagerank(graph)
+        print(f"PageRank computed over {graph.num_nodes} documents and {graph.num_edges} links")
+    
+    def _set_document_length(self, doc_id, doc_length):
+        """
+        Store a document length in the flat array, growing it as needed
+        """
+        if doc_id >= len(self.document_lengths):
+            self.document_lengths.extend([0] * (doc_id + 1 - len(self.document_lengths)))
+        self.document_lengths[doc_id] = doc_length
+    
+    def _set_duplicate(self, doc_id, original):
+        """
+        Record the original of a near-duplicate in the flat array, growing it as needed
+        """
+        if doc_id >= len(self.duplicate_of):
+            self.duplicate_of.extend([-1] * (doc_id + 1 - len(self.duplicate_of)))
+        self.duplicate_of[doc_id] = original
+    
+    def _compute_term_idf(self):
+        """
+        Precompute the BM25 IDF of every term, aligned with trie.occurrence_lists
+        """
+        self.term_idf = array('d', (
+            inverse_document_frequency(self.total_documents, len(occurrence_list))
+            for occurrence_list in self.trie.occurrence_lists
+        ))
+    
+    def get_token_offsets(self, doc_id):
+        """
+        array('I') of start, end character offsets of each token position
+        in a document's content, or None if they were not recorded
+        """
+        return self.token_offsets.get(doc_id)
+    
+    def freeze(self):
+        """
+        Freeze the trie once indexing is finished
+        Term IDF is recomputed because freezing renumbers the occurrence lists
+        """
+        self.trie = self.trie.freeze()
+        self._compute_term_idf()
+        return self.trie
     
     def calculate_bm25_score(self, query_terms, doc_id, k1=1.5, b=0.75):
         """
         Calculate BM25 score for a document
         """
         score = 0
-        doc_length = sum(self.document_vectors[doc_id].values())
-        avg_doc_length = self.index_stats['average_document_length']
+        doc_length = self.document_lengths[doc_id] if doc_id < len(self.document_lengths) else 0
+        avg_doc_length = self.index_stats['average_document_length'] or 1
         
         for term in query_terms:
             # Get term frequency in document
-            is_found, node = self.trie.search(term)
+            is_found, index = self.trie.search(term)
             if not is_found:
                 continue
                 
-            tf = node.document_references.get(doc_id, 0)
+            tf = self.trie.occurrence_lists[index].term_frequency(doc_id)
+            if not tf:
+                continue
             
-            # Calculate IDF
-            docs_with_term = len(node.document_references)
-            idf = math.log((self.total_documents - docs_with_term + 0.5) / 
-                          (docs_with_term + 0.5) + 1)
+            # Look up precomputed IDF
+            if index < len(self.term_idf):
+                idf = self.term_idf[index]
+            else:
+                idf = inverse_document_frequency(self.total_documents, len(self.trie.occurrence_lists[index]))
             
             # Calculate BM25 score for term
             numerator = tf * (k1 + 1)
@@ -106,6 +311,18 @@ class Indexer:
                 self.index_stats = index_data['stats']
                 self.document_vectors = index_data['vectors']
     
+    def save_binary_index(self, filepath, documents):
+        """
+        Save the full index (term dictionary, postings and documents) to a
+        binary file that can be opened with src.index_file.MappedIndex
+        Skipped near-duplicates are left out, as they are of the index
+        """
+        if self.skipped_duplicates:
+            documents = {doc_id: documents[doc_id] for doc_id in documents
+                         if doc_id not in self.skipped_duplicates}
+        write_index(filepath, self.trie, documents, self.index_stats, self.token_offsets,
+                    static_scores=self.static_scores, duplicate_of=self.duplicate_of)
+    
     def _print_index_stats(self):
         """
         Print index statistics
@@ -113,4 +330,12 @@ class Indexer:
         print("\nIndex Statistics:")
         print(f"Total Documents: {self.index_stats['total_documents']}")
         print(f"Total Terms: {self.index_stats['total_terms']}")
-        print(f"Average Document Length: {self.index_stats['average_document_length']:.2f}")
\ No newline at end of file
+        print(f"Average Document Length: {self.index_stats['average_document_length']:.2f}")
+        if self.duplicate_stats:
+            stats = self.duplicate_stats
+            print(f"Near-Duplicates: {stats['duplicates']} of {stats['documents_checked']} documents "
+                  f"({stats['mode']}, {stats['candidate_comparisons']} candidate comparisons)")
+            if stats['skipped_positions']:
+                saved = stats['skipped_positions'] / (self.index_stats['total_terms'] + stats['skipped_positions'])
+                print(f"Postings Skipped: {stats['skipped_postings']} "
+                      f"({stats['skipped_positions']} positions, {saved:.1%} of the index)")
\ No newline at end of file
@@ -0,0 +1,157 @@
+# src/link_graph.py
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; PageRank then runs in pure Python
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Probability of following a link rather than jumping to a random page
+DAMPING = 0.85
+
+# PageRank stops once the scores change by less than this in total (L1)
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 100
+
+# Edges whose rank is spread at once by the NumPy iteration; bounds its
+# temporary arrays at a few bytes per chunk edge plus one float per page
+EDGE_CHUNK = 1 << 22
+
+
+class LinkGraph:
+    """
+    Links between stored documents in compressed sparse row form
+
+    Nodes are the documents in ascending doc id order. The links of node
+    i are targets[offsets[i]:offsets[i + 1]], as sorted node numbers with
+    self-links and links to pages outside the collection left out. That
+    is 4 bytes per link and 12 per document, in flat arrays.
+    """
+
+    def __init__(self, doc_ids, offsets, targets):
+        self.doc_ids = doc_ids      # array('I'): doc id of each node
+        self.offsets = offsets      # array('Q'): num_nodes + 1 offsets into targets
+        self.targets = targets      # array('I'): node number of each link target
+
+    @property
+    def num_nodes(self):
+        return len(self.doc_ids)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def out_degree(self, node):
+        return self.offsets[node + 1] - self.offsets[node]
+
+
+def build_link_graph(documents, excluded_doc_ids=()):
+    """
+    LinkGraph of the links between documents
+    A DocumentStore resolves links through its URL table; other mappings
+    of documents are matched by their 'url' and 'links' fields.
+    Documents in excluded_doc_ids, and links to them, are left out.
+    """
+    doc_ids = array('I', sorted(doc_id for doc_id in documents if doc_id not in excluded_doc_ids))
+    node_of = {doc_id: node for node, doc_id in enumerate(doc_ids)}
+    offsets = array('Q', [0])
+    targets = array('I')
+
+    linked_doc_ids = getattr(documents, 'linked_doc_ids', None)
+    if linked_doc_ids is None:
+        doc_of_url = {documents[doc_id].get('url'): doc_id for doc_id in doc_ids}
+
+        def linked_doc_ids(doc_id):
+            links = documents[doc_id].get('links', ())
+            return sorted({doc_of_url[link] for link in links if link in doc_of_url})
+
+    for node, doc_id in enumerate(doc_ids):
+        # Doc ids and node numbers are in the same order, so targets stay sorted
+        targets.extend(node_of[linked] for linked in linked_doc_ids(doc_id)
+                       if linked != doc_id and linked in node_of)
+        offsets.append(len(targets))
+    return LinkGraph(doc_ids, offsets, targets)
+
+
+def pagerank(graph, damping=DAMPING, tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS,
+             edge_chunk=EDGE_CHUNK):
+    """
+    PageRank of every document by power iteration
+    Rank of pages without links is spread over all pages. Returns an
+    array('d') indexed by doc id (0 for ids of no document) summing to 1.
+    Uses NumPy when it is installed, a plain Python loop otherwise.
+    """
+    num_nodes = graph.num_nodes
+    scores = array('d', [0.0]) * (max(graph.doc_ids, default=-1) + 1)
+    if not num_nodes:
+        return scores
+    if HAS_NUMPY:
+        ranks = _pagerank_numpy(graph, damping, tolerance, max_iterations, edge_chunk)
+    else:
+        ranks = _pagerank_python(graph, damping, tolerance, max_iterations)
+    for doc_id, rank in zip(graph.doc_ids, ranks):
+        scores[doc_id] = rank
+    return scores
+
+
+def _pagerank_python(graph, damping, tolerance, max_iterations):
+    num_nodes = graph.num_nodes
+    offsets, targets = graph.offsets, graph.targets
+    ranks = [1.0 / num_nodes] * num_nodes
+    for _ in range(max_iterations):
+        following = [0.0] * num_nodes
+        dangling = 0.0
+        for node in range(num_nodes):
+            start, end = offsets[node], offsets[node + 1]
+            if start == end:
+                dangling += ranks[node]
+                continue
+            share = ranks[node] / (end - start)
+            for target in targets[start:end]:
+                following[target] += share
+        base = (1 - damping + damping * dangling) / num_nodes
+        new_ranks = [base + damping * rank for rank in following]
+        change = sum(abs(new - old) for new, old in zip(new_ranks, ranks))
+        ranks = new_ranks
+        if change < tolerance:
+            break
+    return ranks
+
+
+def _chunk_bounds(offsets, edge_chunk):
+    """
+    Node boundaries splitting the graph into runs of about edge_chunk edges
+    """
+    ends = np.searchsorted(offsets, np.arange(edge_chunk, offsets[-1], edge_chunk), side='right') - 1
+    bounds = np.unique(np.concatenate([[0], ends, [len(offsets) - 1]]))
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def _pagerank_numpy(graph, damping, tolerance, max_iterations, edge_chunk):
+    num_nodes = graph.num_nodes
+    offsets = np.frombuffer(graph.offsets, dtype=np.uint64).astype(np.int64)
+    targets = np.frombuffer(graph.targets, dtype=np.uint32) if graph.num_edges else np.zeros(0, dtype=np.uint32)
+    degrees = np.diff(offsets)
+    dangling_nodes = degrees == 0
+    inverse_degrees = np.zeros(num_nodes)
+    inverse_degrees[~dangling_nodes] = 1.0 / degrees[~dangling_nodes]
+    chunks = _chunk_bounds(offsets, max(edge_chunk, 1))
+
+    ranks = np.full(num_nodes, 1.0 / num_nodes)
+    for _ in range(max_iterations):
+        shares = ranks * inverse_degrees
+        following = np.zeros(num_nodes)
+        for start, end in chunks:
+            edge_shares = np.repeat(shares[start:end], degrees[start:end])
+            following += np.bincount(targets[offsets[start]:offsets[end]], weights=edge_shares,
+                                     minlength=num_nodes)
+        dangling = ranks[dangling_nodes].sum()
+        new_ranks = (1 - damping + damping * dangling) / num_nodes + damping * following
+        change = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if change < tolerance:
+            break
+    return ranks.tolist()
@@ -0,0 +1,169 @@
+# src/near_duplicates.py
+
+import random
+import zlib
+from array import array
+from itertools import chain
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; signatures are then computed in pure Python
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Consecutive terms per shingle
+SHINGLE_SIZE = 5
+
+# MinHash values per signature, split into BANDS bands of ROWS values for LSH.
+# Documents sharing any band become candidates: with 16 bands of 8 rows,
+# pages at Jaccard similarity 0.9 are found with probability 0.9999 and
+# pages at 0.5 become candidates only 6% of the time.
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS = 8
+
+# Estimated Jaccard similarity of the shingle sets from which a document
+# counts as a near-duplicate
+DUPLICATE_THRESHOLD = 0.9
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Odd multipliers of the term hashes at each offset of a shingle
+_SHINGLE_MULTIPLIERS = [pow(0x9E3779B1, offset + 1, 1 << 32) | 1 for offset in range(64)]
+
+
+def shingle_hashes(word_positions, size=SHINGLE_SIZE):
+    """
+    32-bit hashes of the distinct shingles of a processed document
+    A shingle is size consecutive terms, read back from the positions
+    produced by process_document; shorter documents are one shingle.
+    Each term is hashed once and a shingle hashes to the sum of its term
+    hashes times per-offset multipliers, modulo 2**32.
+    """
+    if not word_positions:
+        return array('I')
+    word_hashes = [zlib.crc32(word.encode('utf-8')) for word in word_positions]
+
+    if HAS_NUMPY:
+        positions = np.fromiter(chain.from_iterable(word_positions.values()), dtype=np.int64)
+        counts = [len(positions_of_word) for positions_of_word in word_positions.values()]
+        terms = np.repeat(np.array(word_hashes, dtype=np.uint64), counts)[np.argsort(positions, kind='stable')]
+        size = min(size, len(terms))
+        count = len(terms) - size + 1
+        hashes = np.zeros(count, dtype=np.uint64)
+        for offset in range(size):
+            hashes = (hashes + terms[offset:offset + count] * np.uint64(_SHINGLE_MULTIPLIERS[offset])) \
+                & np.uint64(_MAX_HASH)
+        return array('I', np.unique(hashes).astype(np.uint32).tobytes())
+
+    terms = [word_hash for _, word_hash in sorted(
+        (position, word_hash) for word_hash, positions_of_word in zip(word_hashes, word_positions.values())
+        for position in positions_of_word)]
+    size = min(size, len(terms))
+    hashes = set()
+    for start in range(len(terms) - size + 1):
+        shingle_hash = 0
+        for offset in range(size):
+            shingle_hash = (shingle_hash + terms[start + offset] * _SHINGLE_MULTIPLIERS[offset]) & _MAX_HASH
+        hashes.add(shingle_hash)
+    return array('I', sorted(hashes))
+
+
+class MinHasher:
+    """
+    MinHash signatures of sets of 32-bit hashes
+
+    Permutation i maps a hash x to (a_i * x + b_i) mod (2**61 - 1), cut to
+    32 bits; a_i and b_i are below 2**32, so nothing overflows 64 bits and
+    the NumPy and Python computations agree exactly. The fraction of equal
+    values in two signatures estimates the Jaccard similarity of the sets.
+    """
+
+    def __init__(self, num_permutations=NUM_PERMUTATIONS, seed=1):
+        rng = random.Random(seed)
+        self.num_permutations = num_permutations
+        self.a = [rng.randrange(1, 1 << 32) for _ in range(num_permutations)]
+        self.b = [rng.randrange(0, 1 << 32) for _ in range(num_permutations)]
+        if HAS_NUMPY:
+            self._a = np.array(self.a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.b, dtype=np.uint64)[:, None]
+
+    def signature(self, hashes):
+        """
+        array('I') of num_permutations minimum hash values; hashes must not be empty
+        """
+        if HAS_NUMPY:
+            values = np.frombuffer(hashes, dtype=np.uint32).astype(np.uint64)
+            permuted = (self._a * values + self._b) % np.uint64(_MERSENNE_PRIME) & np.uint64(_MAX_HASH)
+            return array('I', permuted.min(axis=1).astype(np.uint32).tobytes())
+        return array('I', (min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+                           for a, b in zip(self.a, self.b)))
+
+
+def estimated_similarity(signature, other):
+    """
+    Fraction of MinHash values two signatures share
+    """
+    return sum(1 for value, other_value in zip(signature, other) if value == other_value) / len(signature)
+
+
+class DuplicateDetector:
+    """
+    Finds near-duplicate documents as they are indexed, with MinHash and LSH
+
+    Every document's signature is cut into bands; documents with an equal
+    band are candidates, and a candidate whose estimated similarity reaches
+    the threshold is a duplicate. Each document is compared only with the
+    few documents sharing a band, not with every document indexed before.
+    Only documents that are not duplicates are added to the bands, so a
+    duplicate always maps to an original.
+    """
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD, bands=BANDS, rows=ROWS, shingle_size=SHINGLE_SIZE,
+                 seed=1):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(bands * rows, seed)
+        self.buckets = [{} for _ in range(bands)]   # Per band: {band values: [doc ids]}
+        self.signatures = {}                        # {doc_id: signature} of the originals
+        self.documents_checked = 0
+        self.duplicates = 0
+        self.comparisons = 0                        # Candidate signatures compared
+
+    def add(self, doc_id, word_positions):
+        """
+        The doc id of an earlier document this one nearly duplicates, or None
+        if it is new, in which case later documents are compared with it
+        """
+        self.documents_checked += 1
+        hashes = shingle_hashes(word_positions, self.shingle_size)
+        if not hashes:
+            return None
+        signature = self.hasher.signature(hashes)
+        band_keys = [tuple(signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+        candidates = set()
+        for buckets, key in zip(self.buckets, band_keys):
+            candidates.update(buckets.get(key, ()))
+        # The earliest similar document is the original
+        for candidate in sorted(candidates):
+            self.comparisons += 1
+            if estimated_similarity(signature, self.signatures[candidate]) >= self.threshold:
+                self.duplicates += 1
+                return candidate
+
+        self.signatures[doc_id] = signature
+        for buckets, key in zip(self.buckets, band_keys):
+            buckets.setdefault(key, []).append(doc_id)
+        return None
+
+    def stats(self):
+        return {
+            'documents_checked': self.documents_checked,
+            'duplicates': self.duplicates,
+            'candidate_comparisons': self.comparisons,
+        }
@@ -0,0 +1,165 @@
+# src/pipeline.py
+
+import itertools
+import queue
+import threading
+
+from src.crawler import mark_internal_links
+from src.document_store import DocumentStore
+from src.searcher import SearchEngine
+
+# Pages buffered between each pipeline stage
+DEFAULT_BUFFER_SIZE = 16
+
+# Marks the end of the stream in the stage queues
+_END = object()
+
+
+class IndexingPipeline:
+    """
+    Streams crawled pages into the index as they arrive
+
+    Three stages connected by bounded queues:
+        crawl   - crawler.iter_pages, fetching and parsing on its workers
+        process - processor.process_document (tokenize, stem, positions)
+        index   - Indexer.add_document into the trie
+    A full queue blocks the stage before it, so a slow indexer throttles
+    the crawler and memory stays bounded by the buffer sizes. Queries can
+    be answered with search() while pages are still being indexed.
+    Running the pipeline again re-crawls: changed pages are re-indexed
+    under their doc id, and pages the crawler marks not_modified are
+    skipped.
+    """
+
+    def __init__(self, crawler, indexer, processor, buffer_size=DEFAULT_BUFFER_SIZE, **engine_options):
+        self.crawler = crawler
+        self.indexer = indexer
+        self.processor = processor
+        self.buffer_size = buffer_size
+        self.documents = DocumentStore()
+        self.lock = threading.RLock()
+        self.search_engine = SearchEngine(indexer.trie, self.documents, indexer=indexer,
+                                          processor=processor, **engine_options)
+        self.errors = []
+        self.unchanged_pages = 0  # Re-crawled pages skipped because the server reported no change
+        self._threads = []
+        self._indexed_generation = 0  # Documents indexed since the engine last saw the index
+        self._searched_generation = 0
+
+    def _run_stage(self, work, source, sink, first_stage=False):
+        """
+        Apply work to items from source until it is exhausted, passing
+        results to sink, then pass _END on
+        After a failure in any stage, later items are discarded; stages
+        reading a queue keep draining it so the stages before them finish.
+        """
+        try:
+            for item in source:
+                if self.errors:
+                    if first_stage:
+                        break
+                    continue
+                try:
+                    result = work(item)
+                except Exception as e:
+                    self.errors.append(e)
+                    continue
+                if result is not None:
+                    sink(result)
+        except Exception as e:
+            self.errors.append(e)
+        finally:
+            sink(_END)
+
+    def _drain(self, stage_queue):
+        """
+        Iterate a stage queue until _END
+        """
+        while True:
+            item = stage_queue.get()
+            if item is _END:
+                return
+            yield item
+
+    def start(self, start_urls, max_pages=10, max_depth=0):
+        """
+        Start crawling and indexing in background threads
+        """
+        pages = queue.Queue(maxsize=self.buffer_size)
+        processed = queue.Queue(maxsize=self.buffer_size)
+        with self.lock:
+            new_doc_ids = itertools.count(max(self.documents, default=0) + 1)
+
+        def process(page_data):
+            # Pages crawled before keep their doc id; unchanged ones are not indexed again
+            with self.lock:
+                doc_id = self.documents.doc_id_of_url(page_data['url'])
+            if doc_id is not None and page_data.get('not_modified'):
+                self.unchanged_pages += 1
+                return None
+            if doc_id is None:
+                doc_id = next(new_doc_ids)
+            word_positions, token_offsets = self.indexer.process_document(doc_id, page_data, self.processor)
+            return doc_id, page_data, word_positions, token_offsets
+
+        stages = [
+            (lambda item: item[1], self.crawler.iter_pages(start_urls, max_pages, max_depth), pages.put, True),
+            (process, self._drain(pages), processed.put),
+            (self._index, self._drain(processed), lambda item: None),
+        ]
+        self._threads = [threading.Thread(target=self._run_stage, args=stage, daemon=True) for stage in stages]
+        for thread in self._threads:
+            thread.start()
+
+    def _index(self, item):
+        doc_id, page_data, word_positions, token_offsets = item
+        with self.lock:
+            if doc_id in self.documents:
+                self.indexer.update_document(doc_id, page_data, word_positions=word_positions,
+                                             token_offsets=token_offsets)
+            else:
+                self.indexer.add_document(doc_id, page_data, word_positions=word_positions,
+                                          token_offsets=token_offsets)
+            self.documents[doc_id] = page_data
+            self._indexed_generation += 1
+        print(f"Indexed document {doc_id}: {page_data['title']}")
+
+    def wait(self):
+        """
+        Block until every crawled page is indexed, then finish the index
+        Returns the documents; the first error of any stage is re-raised
+        """
+        for thread in self._threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0]
+        with self.lock:
+            self.indexer.finish_index()
+            mark_internal_links(self.documents)
+            self.indexer.compute_link_scores(self.documents)
+            self.search_engine.refresh_statistics()
+            self._searched_generation = self._indexed_generation
+        print("Indexing completed!")
+        self.indexer._print_index_stats()
+        return self.documents
+
+    def run(self, start_urls, max_pages=10, max_depth=0):
+        """
+        Crawl and index to completion
+        """
+        self.start(start_urls, max_pages, max_depth)
+        return self.wait()
+
+    def is_running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def search(self, query, **options):
+        """
+        Search the documents indexed so far
+        """
+        with self.lock:
+            if self._searched_generation != self._indexed_generation:
+                self.indexer.finish_index()
+                self.search_engine.refresh_statistics()
+                self._searched_generation = self._indexed_generation
+            return self.search_engine.search(query, **options)
@@ -0,0 +1,391 @@
+# src/postings.py
+
+import heapq
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from collections.abc import Mapping
+
+# Gallop through a posting list only when it is this many times longer
+# than the current candidates
+GALLOP_RATIO = 32
+
+
+def encode_positions(positions, out=None):
+    """
+    Delta-encode sorted positions as varints
+    Appends to out (a bytearray) when given, otherwise returns new bytes
+    """
+    target = bytearray() if out is None else out
+    previous = 0
+    for position in positions:
+        delta = position - previous
+        previous = position
+        while delta >= 0x80:
+            target.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        target.append(delta)
+    return bytes(target) if out is None else target
+
+
+def decode_positions(data, start=0, end=None):
+    """
+    Decode delta + varint encoded positions from data[start:end]
+    data can be bytes, bytearray or a memoryview
+    """
+    if end is None:
+        end = len(data)
+    chunk = data[start:end]
+    if not chunk:
+        return []
+    if max(chunk) < 0x80:
+        # Every delta fits in one byte: a running sum in C decodes them all
+        return list(accumulate(chunk))
+    positions = []
+    previous = 0
+    value = 0
+    shift = 0
+    for byte in chunk:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            previous += value
+            positions.append(previous)
+            value = 0
+            shift = 0
+    return positions
+
+
+def gallop(doc_ids, target, start=0):
+    """
+    Smallest index >= start whose doc id is >= target
+    Probes start, start+1, start+3, start+7, ... and then binary searches the
+    last gap, so skipping far ahead costs O(log distance)
+    """
+    length = len(doc_ids)
+    step = 1
+    bound = start
+    while bound < length and doc_ids[bound] < target:
+        start = bound + 1
+        bound += step
+        step <<= 1
+    return bisect_left(doc_ids, target, start, min(bound, length))
+
+
+def intersect_sorted(occurrence_lists):
+    """
+    Sorted list of document ids present in every occurrence list
+    """
+    return intersect_doc_id_lists([occurrence_list.doc_ids() for occurrence_list in occurrence_lists])
+
+
+def intersect_doc_id_lists(doc_id_lists):
+    """
+    Sorted list of the document ids present in every sorted doc id list
+    Lists are intersected rarest first, stopping as soon as no candidates
+    are left. Candidates are galloped through lists more than
+    GALLOP_RATIO times longer; lists of similar length are cheaper to
+    scan in C against a set of the candidates.
+    """
+    if not doc_id_lists:
+        return []
+    ordered = sorted(doc_id_lists, key=len)
+    candidates = ordered[0]
+    for doc_ids in ordered[1:]:
+        length = len(doc_ids)
+        if length < GALLOP_RATIO * len(candidates):
+            candidates = sorted(set(candidates).intersection(doc_ids))
+        else:
+            matches = []
+            position = 0
+            for doc_id in candidates:
+                position = gallop(doc_ids, doc_id, position)
+                if position == length:
+                    break
+                if doc_ids[position] == doc_id:
+                    matches.append(doc_id)
+                    position += 1
+            candidates = matches
+        if not candidates:
+            break
+    return list(candidates)
+
+
+def union_sorted(sorted_lists):
+    """
+    Sorted, de-duplicated merge of sorted lists of integers
+    """
+    merged = []
+    previous = None
+    for value in heapq.merge(*sorted_lists):
+        if value != previous:
+            merged.append(value)
+            previous = value
+    return merged
+
+
+def difference_sorted(doc_ids, excluded):
+    """
+    Sorted document ids of doc_ids that do not occur in the sorted excluded list
+    """
+    result = []
+    position = 0
+    length = len(excluded)
+    for doc_id in doc_ids:
+        position = gallop(excluded, doc_id, position)
+        if position == length or excluded[position] != doc_id:
+            result.append(doc_id)
+    return result
+
+
+def phrase_starts(position_lists):
+    """
+    Positions where the terms of position_lists occur consecutively
+    Each list holds the sorted positions of one phrase term in a document.
+    The surviving start positions only move forward through each list, so
+    every list is walked once, skipping ahead with binary search.
+    """
+    if not position_lists:
+        return []
+    starts = position_lists[0]
+    for offset, positions in enumerate(position_lists[1:], 1):
+        matches = []
+        index = 0
+        length = len(positions)
+        for start in starts:
+            target = start + offset
+            index = bisect_left(positions, target, index)
+            if index == length:
+                break
+            if positions[index] == target:
+                matches.append(start)
+        starts = matches
+        if not starts:
+            break
+    return list(starts)
+
+
+def iter_positions(occurrence_list, doc_ids):
+    """
+    Yield the positions of the term in each of doc_ids, which must be
+    sorted and all contained in the list. A compact list is walked with a
+    cursor instead of a binary search per document.
+    """
+    if not isinstance(occurrence_list, CompactOccurrenceList):
+        for doc_id in doc_ids:
+            yield occurrence_list.get_positions(doc_id)
+        return
+    own_doc_ids = occurrence_list.doc_id_array
+    index = 0
+    for doc_id in doc_ids:
+        index = gallop(own_doc_ids, doc_id, index)
+        yield occurrence_list._decode(index)
+
+
+def _positions_near(positions, others, distance):
+    """
+    Positions having another position of others at most distance away
+    A position is not near itself, which matters when both lists hold the
+    same term (a NEAR/n a); positions are sorted and distinct.
+    """
+    matches = []
+    index = 0
+    length = len(others)
+    for position in positions:
+        while index < length and others[index] < position - distance:
+            index += 1
+        if index == length:
+            break
+        nearest = index
+        if others[nearest] == position:
+            nearest += 1
+        if nearest < length and others[nearest] <= position + distance:
+            matches.append(position)
+    return matches
+
+
+def near_positions(left, right, distance):
+    """
+    Sorted positions of left and right that lie within distance of a
+    position of the other list, found by walking both lists in order
+    Empty if the two never occur that close together
+    """
+    return union_sorted([_positions_near(left, right, distance),
+                         _positions_near(right, left, distance)])
+
+
+def intersect_doc_ids(occurrence_lists):
+    """
+    Set of document ids present in every occurrence list
+    """
+    return set(intersect_sorted(occurrence_lists))
+
+
+class DocumentsView(Mapping):
+    """
+    Read-only {doc_id: [positions]} view over a read-only occurrence list
+    Positions are decoded only for the documents that are accessed
+    """
+
+    def __init__(self, occurrence_list):
+        self._occurrence_list = occurrence_list
+
+    def __getitem__(self, doc_id):
+        if doc_id not in self._occurrence_list:
+            raise KeyError(doc_id)
+        return self._occurrence_list.get_positions(doc_id)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._occurrence_list
+
+    def __iter__(self):
+        return iter(self._occurrence_list.doc_ids())
+
+    def __len__(self):
+        return len(self._occurrence_list)
+
+
+class CompactOccurrenceList:
+    """
+    Read-only posting list packed into flat arrays
+
+    doc_id_array: sorted document ids
+    frequency_array: term frequency of each document
+    position_offsets: byte offsets into position_data, one more than documents
+    position_data: delta + varint encoded positions of all documents
+
+    The arrays may be array('I') objects or memoryviews over a shared buffer.
+    """
+    __slots__ = ('doc_id_array', 'frequency_array', 'position_offsets', 'position_data')
+
+    def __init__(self, doc_id_array, frequency_array, position_offsets, position_data):
+        self.doc_id_array = doc_id_array
+        self.frequency_array = frequency_array
+        self.position_offsets = position_offsets
+        self.position_data = position_data
+
+    @classmethod
+    def from_occurrence_list(cls, occurrence_list):
+        """
+        Pack a mutable OccurrenceList into the compact representation
+        """
+        doc_ids = array('I')
+        frequencies = array('I')
+        offsets = array('I', [0])
+        data = bytearray()
+        for doc_id in sorted(occurrence_list.documents):
+            positions = occurrence_list.documents[doc_id]
+            doc_ids.append(doc_id)
+            frequencies.append(len(positions))
+            encode_positions(positions, data)
+            offsets.append(len(data))
+        return cls(doc_ids, frequencies, offsets, bytes(data))
+
+    def add_occurrence(self, doc_id, position):
+        raise TypeError("CompactOccurrenceList is read-only")
+
+    def add_positions(self, doc_id, positions):
+        raise TypeError("CompactOccurrenceList is read-only")
+
+    def _locate(self, doc_id):
+        """
+        Binary search for a document, returns its index or -1
+        """
+        doc_ids = self.doc_id_array
+        index = bisect_left(doc_ids, doc_id)
+        if index < len(doc_ids) and doc_ids[index] == doc_id:
+            return index
+        return -1
+
+    def _decode(self, index):
+        return decode_positions(
+            self.position_data,
+            self.position_offsets[index],
+            self.position_offsets[index + 1]
+        )
+
+    @property
+    def documents(self):
+        return DocumentsView(self)
+
+    def doc_ids(self):
+        """
+        Sorted document ids containing the term
+        """
+        return self.doc_id_array
+
+    def document_frequency(self):
+        return len(self.doc_id_array)
+
+    def term_frequency(self, doc_id):
+        index = self._locate(doc_id)
+        return self.frequency_array[index] if index >= 0 else 0
+
+    def max_term_frequency(self):
+        return max(self.frequency_array, default=0)
+
+    def get_positions(self, doc_id):
+        """
+        Sorted positions of the term in a document, decoded on demand
+        """
+        index = self._locate(doc_id)
+        return self._decode(index) if index >= 0 else []
+
+    def __contains__(self, doc_id):
+        return self._locate(doc_id) >= 0
+
+    def __len__(self):
+        return len(self.doc_id_array)
+
+
+class UnionOccurrenceList:
+    """
+    Read-only union of several occurrence lists, such as all the terms a
+    wildcard expands to. Behaves like a single posting list whose
+    positions are the merged positions of its members.
+    """
+    __slots__ = ('occurrence_lists', '_doc_ids')
+
+    def __init__(self, occurrence_lists):
+        self.occurrence_lists = occurrence_lists
+        self._doc_ids = None
+
+    @property
+    def documents(self):
+        return DocumentsView(self)
+
+    def doc_ids(self):
+        """
+        Sorted, de-duplicated document ids of all member lists
+        """
+        if self._doc_ids is None:
+            self._doc_ids = array('I', union_sorted(
+                [occurrence_list.doc_ids() for occurrence_list in self.occurrence_lists]
+            ))
+        return self._doc_ids
+
+    def document_frequency(self):
+        return len(self.doc_ids())
+
+    def term_frequency(self, doc_id):
+        return sum(occurrence_list.term_frequency(doc_id) for occurrence_list in self.occurrence_lists)
+
+    def max_term_frequency(self):
+        """
+        Upper bound only: the members' maxima may fall in different documents
+        """
+        return sum(occurrence_list.max_term_frequency() for occurrence_list in self.occurrence_lists)
+
+    def get_positions(self, doc_id):
+        """
+        Merged sorted positions of all member terms in a document
+        """
+        return list(heapq.merge(*(occurrence_list.get_positions(doc_id)
+                                  for occurrence_list in self.occurrence_lists)))
+
+    def __contains__(self, doc_id):
+        return any(doc_id in occurrence_list for occurrence_list in self.occurrence_lists)
+
+    def __len__(self):
+        return len(self.doc_ids())
@@ -0,0 +1,87 @@
+# src/query_cache.py
+
+import threading
+from collections import OrderedDict
+
+# Queries whose results are kept by default
+QUERY_CACHE_SIZE = 1024
+
+# Result entries (doc_id, score) kept over all cached queries
+QUERY_CACHE_MAX_RESULTS = 100000
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of search results
+
+    Entries are evicted least recently used first once there are more than
+    max_entries queries or more than max_results results in total. Every
+    entry belongs to an index generation: looking up a different generation
+    empties the cache, so results never outlive a change to the index.
+    Thread-safe.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_SIZE, max_results=QUERY_CACHE_MAX_RESULTS):
+        self.max_entries = max_entries
+        self.max_results = max_results
+        self.entries = OrderedDict()  # {key: tuple of results}, least recently used first
+        self.total_results = 0
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def _check_generation(self, generation):
+        if generation != self.generation:
+            self.entries.clear()
+            self.total_results = 0
+            self.generation = generation
+
+    def get(self, key, generation):
+        """
+        Cached results for key as a new list, or None
+        """
+        with self.lock:
+            self._check_generation(generation)
+            results = self.entries.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return list(results)
+
+    def put(self, key, generation, results):
+        with self.lock:
+            self._check_generation(generation)
+            if len(results) > self.max_results:
+                return
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.total_results -= len(previous)
+            self.entries[key] = tuple(results)
+            self.total_results += len(results)
+            while len(self.entries) > self.max_entries or self.total_results > self.max_results:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_results -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_results = 0
+
+    def stats(self):
+        """
+        Cache statistics: hits, misses, hit_rate, evictions, entries and results
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'results': self.total_results
+        }
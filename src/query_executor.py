@@ -0,0 +1,197 @@
+# src/query_executor.py
+
+import re
+
+from src.postings import (
+    UnionOccurrenceList, intersect_doc_id_lists, union_sorted, difference_sorted,
+    phrase_starts, near_positions, iter_positions
+)
+from src.query_parser import TermNode, PhraseNode, AndNode, OrNode, NotNode, NearNode
+
+# Most frequent terms a single wildcard expands to; None expands it to
+# every indexed term with its prefix
+MAX_WILDCARD_EXPANSIONS = None
+
+
+class QueryExecutor:
+    """
+    Evaluates parsed queries against a trie (or any index with the same API)
+
+    Every node evaluates to a sorted list of document ids, combined with
+    merge-style intersection, union and difference. Phrases and NEAR/n
+    walk the sorted position lists of the candidate documents instead of
+    building sets of positions.
+    """
+
+    def __init__(self, trie, processor, documents, max_wildcard_expansions=MAX_WILDCARD_EXPANSIONS,
+                 excluded_doc_ids=()):
+        """
+        excluded_doc_ids: documents that were not indexed, such as skipped
+        near-duplicates; a leading NOT does not return them either
+        """
+        self.trie = trie
+        self.processor = processor
+        self.documents = documents
+        self.max_wildcard_expansions = max_wildcard_expansions
+        self.excluded_doc_ids = excluded_doc_ids
+        self._all_doc_ids = None
+        self._num_documents = 0
+
+    def all_doc_ids(self):
+        """
+        Sorted ids of every indexed document, the universe a leading NOT
+        subtracts from
+        Recomputed when documents are added to or removed from the collection
+        """
+        if self._all_doc_ids is None or self._num_documents != len(self.documents):
+            self._num_documents = len(self.documents)
+            self._all_doc_ids = sorted(doc_id for doc_id in self.documents if doc_id not in self.excluded_doc_ids)
+        return self._all_doc_ids
+
+    def invalidate(self):
+        """
+        Forget the cached document ids after documents were updated or deleted
+        """
+        self._all_doc_ids = None
+
+    def expand_wildcard(self, prefix):
+        """
+        UnionOccurrenceList of the terms starting with prefix, or None if no
+        term does
+        All of them are merged unless max_wildcard_expansions is set, which
+        keeps only that many of the most frequent.
+        """
+        if self.max_wildcard_expansions is None:
+            occurrence_lists = [occurrence_list for _, occurrence_list in self.trie.prefix_terms(prefix.lower())
+                                if len(occurrence_list)]
+        else:
+            occurrence_lists = [self.trie.get_occurrence_list(word) for word, _ in
+                                self.trie.prefix_search(prefix.lower(), self.max_wildcard_expansions)]
+        if not occurrence_lists:
+            return None
+        return UnionOccurrenceList(occurrence_lists)
+
+    def execute(self, node):
+        """
+        Evaluate a query tree
+        Returns (doc_ids, occurrence_lists, term_ids): the sorted matching
+        documents plus the occurrence lists of the terms outside NOT
+        clauses, for ranking. term_ids are None for wildcards.
+        """
+        self._resolved = {}
+        self._scoring = []
+        doc_ids = self._evaluate(node, False) if node is not None else None
+        if not doc_ids:
+            return [], [], []
+        occurrence_lists = [occurrence_list for occurrence_list, _ in self._scoring]
+        term_ids = [term_id for _, term_id in self._scoring]
+        return doc_ids, occurrence_lists, term_ids
+
+    def _resolve(self, node):
+        """
+        [(occurrence_list, term_id)] for the terms of a TermNode or PhraseNode
+        occurrence_list is None for a term that is not indexed. Returns an
+        empty list when the text holds no searchable terms (only stop words).
+        """
+        if id(node) in self._resolved:
+            return self._resolved[id(node)]
+        resolved = []
+        if isinstance(node, TermNode) and node.text.endswith('*'):
+            prefix = re.sub(r'[^a-zA-Z]', '', node.text)
+            if prefix:
+                resolved.append((self.expand_wildcard(prefix), None))
+        else:
+            for term in self.processor.process_query(node.text):
+                is_found, term_id = self.trie.search(term)
+                if is_found:
+                    resolved.append((self.trie.occurrence_lists[term_id], term_id))
+                else:
+                    resolved.append((None, None))
+        self._resolved[id(node)] = resolved
+        return resolved
+
+    def _evaluate(self, node, negated):
+        """
+        Sorted doc ids matching node, or None if the node places no
+        constraint (e.g. it consists of stop words only)
+        """
+        if isinstance(node, (TermNode, PhraseNode)):
+            resolved = self._resolve(node)
+            if not resolved:
+                return None
+            if any(occurrence_list is None for occurrence_list, _ in resolved):
+                return []
+            if not negated:
+                self._scoring.extend(resolved)
+            occurrence_lists = [occurrence_list for occurrence_list, _ in resolved]
+            candidates = intersect_doc_id_lists([occurrence_list.doc_ids()
+                                                 for occurrence_list in occurrence_lists])
+            if len(occurrence_lists) == 1:
+                return candidates
+            # Several terms, from a phrase or a hyphenated word, must be adjacent
+            positions = [iter_positions(occurrence_list, candidates) for occurrence_list in occurrence_lists]
+            return [doc_id for doc_id, *position_lists in zip(candidates, *positions)
+                    if phrase_starts(position_lists)]
+
+        if isinstance(node, AndNode):
+            included = []
+            excluded = []
+            for child in node.children:
+                if isinstance(child, NotNode):
+                    doc_ids = self._evaluate(child.child, not negated)
+                    if doc_ids is not None:
+                        excluded.append(doc_ids)
+                else:
+                    doc_ids = self._evaluate(child, negated)
+                    if doc_ids is not None:
+                        included.append(doc_ids)
+            if not included:
+                if not excluded:
+                    return None
+                included = [self.all_doc_ids()]
+            result = intersect_doc_id_lists(included)
+            for doc_ids in excluded:
+                result = difference_sorted(result, doc_ids)
+            return result
+
+        if isinstance(node, OrNode):
+            children = [self._evaluate(child, negated) for child in node.children]
+            children = [doc_ids for doc_ids in children if doc_ids is not None]
+            return union_sorted(children) if children else None
+
+        if isinstance(node, NotNode):
+            doc_ids = self._evaluate(node.child, not negated)
+            if doc_ids is None:
+                return None
+            return difference_sorted(self.all_doc_ids(), doc_ids)
+
+        if isinstance(node, NearNode):
+            left = self._evaluate(node.left, negated)
+            right = self._evaluate(node.right, negated)
+            if left is None or right is None:
+                # A stop word operand cannot be located, so only the other one counts
+                return right if left is None else left
+            return [doc_id for doc_id in intersect_doc_id_lists([left, right])
+                    if self._positions(node, doc_id)]
+
+        raise TypeError(f"Unknown query node: {node!r}")
+
+    def _positions(self, node, doc_id):
+        """
+        Sorted positions at which node matches inside a document
+        Phrases match at their first term; NEAR at both operands' positions
+        """
+        if isinstance(node, (TermNode, PhraseNode)):
+            resolved = self._resolve(node)
+            if not resolved or any(occurrence_list is None for occurrence_list, _ in resolved):
+                return []
+            return phrase_starts([occurrence_list.get_positions(doc_id)
+                                  for occurrence_list, _ in resolved])
+        if isinstance(node, NearNode):
+            left = self._positions(node.left, doc_id)
+            right = self._positions(node.right, doc_id)
+            return near_positions(left, right, node.distance)
+        if isinstance(node, (AndNode, OrNode)):
+            children = [child for child in node.children if not isinstance(child, NotNode)]
+            return union_sorted([self._positions(child, doc_id) for child in children])
+        return []
@@ -0,0 +1,209 @@
+# src/query_parser.py
+
+import re
+
+# Quoted phrases, parentheses, NEAR/n, and words (anything else up to a delimiter)
+TOKEN_PATTERN = re.compile(r'"([^"]*)"?|(\()|(\))|\bNEAR/(\d+)\b|([^\s()"]+)')
+
+# Operators are only recognised in upper case; lower case and/or/not are
+# ordinary (stop) words
+OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+class TermNode:
+    """
+    A single query word, possibly a trailing * wildcard such as comput*
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return f"TermNode({self.text!r})"
+
+
+class PhraseNode:
+    """
+    Quoted words that must occur consecutively, e.g. "data structure"
+    """
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return f"PhraseNode({self.text!r})"
+
+
+class AndNode:
+    def __init__(self, children):
+        self.children = children
+
+    def __repr__(self):
+        return f"AndNode({self.children!r})"
+
+
+class OrNode:
+    def __init__(self, children):
+        self.children = children
+
+    def __repr__(self):
+        return f"OrNode({self.children!r})"
+
+
+class NotNode:
+    def __init__(self, child):
+        self.child = child
+
+    def __repr__(self):
+        return f"NotNode({self.child!r})"
+
+
+class NearNode:
+    """
+    Both operands occur within distance positions of each other, in either order
+    """
+
+    def __init__(self, left, right, distance):
+        self.left = left
+        self.right = right
+        self.distance = distance
+
+    def __repr__(self):
+        return f"NearNode({self.left!r}, {self.right!r}, {self.distance})"
+
+
+def tokenize_query(query):
+    """
+    Split a query into (kind, value) tokens
+    kind is 'phrase', '(', ')', 'near' (value: distance), an operator or 'word'
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(query):
+        phrase, open_paren, close_paren, distance, word = match.groups()
+        if phrase is not None:
+            tokens.append(('phrase', phrase))
+        elif open_paren:
+            tokens.append(('(', open_paren))
+        elif close_paren:
+            tokens.append((')', close_paren))
+        elif distance is not None:
+            tokens.append(('near', int(distance)))
+        elif word in OPERATORS:
+            tokens.append((word, word))
+        else:
+            tokens.append(('word', word))
+    return tokens
+
+
+def has_operators(query):
+    """
+    True if the query uses phrases, grouping or boolean/proximity operators
+    Plain queries are a conjunction of words and can take the fast path
+    """
+    return any(kind != 'word' for kind, _ in tokenize_query(query))
+
+
+class QueryParser:
+    """
+    Recursive descent parser for boolean queries
+
+    Precedence, loosest first: OR, AND (also implied between adjacent
+    operands), NOT, NEAR/n. Parentheses group. The parser is forgiving, as
+    search boxes should be: dangling operators and unmatched parentheses
+    are ignored and an unterminated quote runs to the end of the query.
+    """
+
+    def __init__(self, query):
+        self.tokens = tokenize_query(query)
+        self.position = 0
+
+    def _peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][0]
+        return None
+
+    def _next(self):
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self):
+        """
+        Returns the root node, or None for a query without operands
+        """
+        node = None
+        while self.position < len(self.tokens):
+            parsed = self._parse_or()
+            if parsed is not None:
+                node = parsed if node is None else AndNode([node, parsed])
+            elif self._peek() is not None:
+                self._next()  # Skip a stray ')' or operator
+        return node
+
+    def _parse_or(self):
+        children = []
+        node = self._parse_and()
+        if node is not None:
+            children.append(node)
+        while self._peek() == 'OR':
+            self._next()
+            node = self._parse_and()
+            if node is not None:
+                children.append(node)
+        if not children:
+            return None
+        return children[0] if len(children) == 1 else OrNode(children)
+
+    def _parse_and(self):
+        children = []
+        while True:
+            kind = self._peek()
+            if kind == 'AND':
+                self._next()
+                continue
+            if kind not in ('word', 'phrase', '(', 'NOT'):
+                break
+            node = self._parse_not()
+            if node is not None:
+                children.append(node)
+        if not children:
+            return None
+        return children[0] if len(children) == 1 else AndNode(children)
+
+    def _parse_not(self):
+        if self._peek() == 'NOT':
+            self._next()
+            child = self._parse_not()
+            return NotNode(child) if child is not None else None
+        return self._parse_near()
+
+    def _parse_near(self):
+        node = self._parse_primary()
+        while node is not None and self._peek() == 'near':
+            distance = self._next()[1]
+            right = self._parse_primary()
+            if right is None:
+                break
+            node = NearNode(node, right, distance)
+        return node
+
+    def _parse_primary(self):
+        kind = self._peek()
+        if kind == 'word':
+            return TermNode(self._next()[1])
+        if kind == 'phrase':
+            return PhraseNode(self._next()[1])
+        if kind == '(':
+            self._next()
+            node = self._parse_or()
+            if self._peek() == ')':
+                self._next()
+            return node
+        return None
+
+
+def parse_query(query):
+    """
+    Parse a query string into a tree of query nodes
+    """
+    return QueryParser(query).parse()
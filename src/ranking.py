@@ -0,0 +1,351 @@
+# src/ranking.py
+
+import heapq
+import math
+from array import array
+
+from src.postings import gallop, intersect_sorted
+
+# Relative slack on score upper bounds so floating point rounding never
+# prunes a document that could still tie its way into the top k
+BOUND_SLACK = 1e-9
+
+
+def inverse_document_frequency(total_documents, document_frequency):
+    """
+    BM25 IDF of a term occurring in document_frequency documents
+    """
+    return math.log((total_documents - document_frequency + 0.5) /
+                    (document_frequency + 0.5) + 1)
+
+
+class FrequencyPositionScorer:
+    """
+    The original ranking heuristic: for every query term a document scores
+    frequency * (1 + 1 / (1 + first position))
+    """
+
+    def for_query(self, occurrence_lists, term_ids=None):
+        return FrequencyPositionQueryScorer(occurrence_lists)
+
+
+class FrequencyPositionQueryScorer:
+    """
+    FrequencyPositionScorer bound to the occurrence lists of one query
+    Terms are referred to by their position in the query
+    """
+
+    def __init__(self, occurrence_lists):
+        self.occurrence_lists = occurrence_lists
+
+    def term_score(self, term, doc_id):
+        positions = self.occurrence_lists[term].get_positions(doc_id)
+        if not positions:
+            return 0
+        # Positions are sorted, so the first one is the earliest
+        return len(positions) * (1 + 1.0 / (1 + positions[0]))
+
+    def upper_bound(self, term):
+        """
+        Highest term_score any document can get from this term
+        The position bonus is at most 1, so the score is at most 2 * frequency
+        """
+        return 2 * self.occurrence_lists[term].max_term_frequency()
+
+    def document_upper_bound(self, term, doc_id):
+        """
+        Cheap bound on term_score for one document, without decoding positions
+        """
+        return 2 * self.occurrence_lists[term].term_frequency(doc_id)
+
+
+class BM25Scorer:
+    """
+    Okapi BM25 over statistics precomputed at index time
+
+    statistics is an Indexer or MappedIndex providing document_lengths
+    (indexed by doc id), term_idf (indexed by occurrence list index) and
+    index_stats. The length normalisation of every document is folded into
+    one flat array here, so scoring a candidate is a few multiplications.
+    trie is the trie whose occurrence list indexes are passed as term ids,
+    by default the one the statistics currently hold. Indexer.freeze
+    renumbers term_idf for the frozen trie; a scorer for the trie it
+    replaced then computes IDF from the occurrence lists instead.
+    """
+
+    def __init__(self, statistics, k1=1.5, b=0.75, trie=None):
+        self.statistics = statistics
+        self.trie = trie if trie is not None else getattr(statistics, 'trie', statistics)
+        self.k1 = k1
+        self.b = b
+        self.total_documents = statistics.index_stats['total_documents']
+        average_length = statistics.index_stats['average_document_length'] or 1
+        self.length_norms = array('d', (
+            k1 * (1 - b + b * length / average_length) for length in statistics.document_lengths
+        ))
+        # Documents outside the array are treated as having average length
+        self.default_norm = k1
+        self.min_norm = min(self.length_norms, default=self.default_norm)
+
+    def idf(self, occurrence_list, term_id=None):
+        """
+        Precomputed IDF for an indexed term, computed on the fly otherwise
+        """
+        term_idf = self.statistics.term_idf
+        if term_id is not None and term_id < len(term_idf) \
+                and getattr(self.statistics, 'trie', self.statistics) is self.trie:
+            return term_idf[term_id]
+        return inverse_document_frequency(self.total_documents, occurrence_list.document_frequency())
+
+    def for_query(self, occurrence_lists, term_ids=None):
+        if term_ids is None:
+            term_ids = [None] * len(occurrence_lists)
+        weights = [self.idf(occurrence_list, term_id) * (self.k1 + 1)
+                   for occurrence_list, term_id in zip(occurrence_lists, term_ids)]
+        return BM25QueryScorer(self, occurrence_lists, weights)
+
+
+class BM25QueryScorer:
+    """
+    BM25Scorer bound to one query, with IDF * (k1 + 1) resolved per term
+    """
+
+    def __init__(self, scorer, occurrence_lists, weights):
+        self.length_norms = scorer.length_norms
+        self.default_norm = scorer.default_norm
+        self.min_norm = min(scorer.min_norm, scorer.default_norm)
+        self.occurrence_lists = occurrence_lists
+        self.weights = weights
+
+    def term_score(self, term, doc_id):
+        tf = self.occurrence_lists[term].term_frequency(doc_id)
+        if not tf:
+            return 0
+        norm = self.length_norms[doc_id] if doc_id < len(self.length_norms) else self.default_norm
+        return self.weights[term] * tf / (tf + norm)
+
+    def upper_bound(self, term):
+        """
+        The score grows with tf and shrinks with document length, so the
+        largest tf paired with the shortest document bounds every document
+        """
+        max_tf = self.occurrence_lists[term].max_term_frequency()
+        if not max_tf:
+            return 0
+        return self.weights[term] * max_tf / (max_tf + self.min_norm)
+
+    def document_upper_bound(self, term, doc_id):
+        # Exact scores need no positions, so they are already cheap
+        return self.term_score(term, doc_id)
+
+
+class StaticPrior:
+    """
+    Query-independent score added to the text score of every document
+
+    scores is a flat per-document array indexed by doc id, such as the
+    PageRank of src.link_graph. It is scaled once here so the highest
+    scoring document gets weight, and a lookup is all that is left per
+    ranked document. bound is the largest prior, for top-k pruning.
+    """
+
+    def __init__(self, scores, weight):
+        top = max(scores, default=0)
+        self.scores = array('d', (weight * score / top for score in scores)) if top > 0 else array('d')
+        self.bound = max(self.scores, default=0)
+
+    def score(self, doc_id):
+        return self.scores[doc_id] if doc_id < len(self.scores) else 0
+
+
+def _prior_score(prior, doc_id):
+    return prior.score(doc_id) if prior is not None else 0
+
+
+def score_document(doc_id, query_scorer, num_terms):
+    """
+    Sum of the term scores of a document, in query term order
+    """
+    score = 0
+    for term in range(num_terms):
+        score += query_scorer.term_score(term, doc_id)
+    return score
+
+
+def rank_all(candidates, occurrence_lists, scorer, term_ids=None, prior=None):
+    """
+    Score every candidate and return [(doc_id, score)] best first
+    A StaticPrior adds its score to the sum of the term scores.
+    Ties are ordered by ascending doc id
+    """
+    query_scorer = scorer.for_query(occurrence_lists, term_ids)
+    num_terms = len(occurrence_lists)
+    scores = [(doc_id, score_document(doc_id, query_scorer, num_terms) + _prior_score(prior, doc_id))
+              for doc_id in sorted(candidates)]
+    scores.sort(key=lambda item: item[1], reverse=True)
+    return scores
+
+
+class _TopK:
+    """
+    Bounded min-heap of (score, -doc_id) keeping the k best documents
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.heap = []
+
+    def threshold(self):
+        """
+        Score a document must exceed to enter, or None while not full
+        """
+        return self.heap[0][0] if len(self.heap) >= self.k else None
+
+    def push(self, doc_id, score):
+        entry = (score, -doc_id)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def results(self):
+        return [(-negative_doc_id, score)
+                for score, negative_doc_id in sorted(self.heap, reverse=True)]
+
+
+def _can_skip(partial, remaining_bound, threshold):
+    """
+    True if a document can no longer beat the current k-th score
+    Candidates arrive in ascending doc id order, so a later document that
+    only ties the threshold would rank after it and can be skipped as well
+    """
+    return threshold is not None and (partial + remaining_bound) * (1 + BOUND_SLACK) < threshold
+
+
+def _sum_in_query_order(contributions):
+    score = 0
+    for contribution in contributions:
+        score += contribution
+    return score
+
+
+def rank_top_k(occurrence_lists, scorer, k, conjunctive=True, term_ids=None, prior=None):
+    """
+    Return the k best [(doc_id, score)] using MaxScore pruning
+
+    Each term's score upper bound lets documents be abandoned as soon as
+    their partial score plus the bounds of the unscored terms cannot reach
+    the current k-th best score. For disjunctive queries, lists whose
+    combined bounds fall below that score stop producing candidates and
+    are only probed for documents found in the other lists.
+
+    A StaticPrior is known before any term is scored, so it starts the
+    partial score of a document and its bound joins the list bounds.
+
+    The result is identical to the first k entries of rank_all: the final
+    score of a kept document is summed in query term order.
+    """
+    if k <= 0 or not occurrence_lists:
+        return []
+    top = _TopK(k)
+    query_scorer = scorer.for_query(occurrence_lists, term_ids)
+    bounds = [query_scorer.upper_bound(term) for term in range(len(occurrence_lists))]
+    if conjunctive:
+        _conjunctive_top_k(occurrence_lists, query_scorer, bounds, top, prior)
+    else:
+        _disjunctive_top_k(occurrence_lists, query_scorer, bounds, top, prior)
+    return top.results()
+
+
+def _conjunctive_top_k(occurrence_lists, query_scorer, bounds, top, prior=None):
+    # Score the most influential terms first so hopeless documents fail early
+    order = sorted(range(len(occurrence_lists)), key=lambda term: bounds[term], reverse=True)
+    remaining_bounds = []
+    remaining = sum(bounds)
+    for term in order:
+        remaining -= bounds[term]
+        remaining_bounds.append(remaining)
+
+    contributions = [0] * len(occurrence_lists)
+    for doc_id in intersect_sorted(occurrence_lists):
+        static = _prior_score(prior, doc_id)
+        partial = 0
+        threshold = top.threshold()
+        if threshold is not None:
+            # Per-document bounds are cheaper than scoring and often enough to skip
+            document_bound = 0
+            for term in range(len(occurrence_lists)):
+                document_bound += query_scorer.document_upper_bound(term, doc_id)
+            if _can_skip(static, document_bound, threshold):
+                continue
+        for step, term in enumerate(order):
+            contribution = query_scorer.term_score(term, doc_id)
+            contributions[term] = contribution
+            partial += contribution
+            if _can_skip(partial + static, remaining_bounds[step], threshold):
+                break
+        else:
+            top.push(doc_id, _sum_in_query_order(contributions) + static)
+
+
+def _disjunctive_top_k(occurrence_lists, query_scorer, bounds, top, prior=None):
+    # Lists ordered by ascending bound; lists[:essential] are non-essential
+    order = sorted(range(len(occurrence_lists)), key=lambda term: bounds[term])
+    cumulative_bounds = []
+    total = 0
+    for term in order:
+        total += bounds[term]
+        cumulative_bounds.append(total)
+
+    doc_id_lists = [occurrence_lists[term].doc_ids() for term in order]
+    cursors = [0] * len(order)
+    essential = 0
+    contributions = [0] * len(occurrence_lists)
+    prior_bound = prior.bound if prior is not None else 0
+
+    while True:
+        # Next candidate is the smallest current doc id among essential lists
+        doc_id = None
+        for rank in range(essential, len(order)):
+            if cursors[rank] < len(doc_id_lists[rank]):
+                current = doc_id_lists[rank][cursors[rank]]
+                if doc_id is None or current < doc_id:
+                    doc_id = current
+        if doc_id is None:
+            break
+
+        for term in range(len(contributions)):
+            contributions[term] = 0
+        static = _prior_score(prior, doc_id)
+        partial = static
+        for rank in range(essential, len(order)):
+            doc_ids = doc_id_lists[rank]
+            if cursors[rank] < len(doc_ids) and doc_ids[cursors[rank]] == doc_id:
+                cursors[rank] += 1
+                contribution = query_scorer.term_score(order[rank], doc_id)
+                contributions[order[rank]] = contribution
+                partial += contribution
+
+        # Probe non-essential lists, largest bound first, while the document can still qualify
+        threshold = top.threshold()
+        skipped = False
+        for rank in range(essential - 1, -1, -1):
+            if _can_skip(partial, cumulative_bounds[rank], threshold):
+                skipped = True
+                break
+            doc_ids = doc_id_lists[rank]
+            cursors[rank] = gallop(doc_ids, doc_id, cursors[rank])
+            if cursors[rank] < len(doc_ids) and doc_ids[cursors[rank]] == doc_id:
+                contribution = query_scorer.term_score(order[rank], doc_id)
+                contributions[order[rank]] = contribution
+                partial += contribution
+        if skipped:
+            continue
+
+        top.push(doc_id, _sum_in_query_order(contributions) + static)
+
+        # Lists whose combined bounds cannot beat the k-th score stop driving candidates
+        threshold = top.threshold()
+        while (threshold is not None and essential < len(order)
+               and (cumulative_bounds[essential] + prior_bound) * (1 + BOUND_SLACK) < threshold):
+            essential += 1
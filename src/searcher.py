@@ -1,67 +1,345 @@
 # src/searcher.py
 
+import math
+import re
+
 from src.text_processor import TextProcessor
+from src.postings import intersect_sorted, union_sorted
+from src.ranking import FrequencyPositionScorer, BM25Scorer, StaticPrior, rank_all, rank_top_k
+from src.vector_ranking import VectorRanker, HAS_NUMPY
+from src.query_parser import parse_query, has_operators
+from src.query_executor import QueryExecutor, MAX_WILDCARD_EXPANSIONS
+from src.snippets import merge_hits, build_snippet
+from src.query_cache import QueryCache, QUERY_CACHE_SIZE
+
+# A word directly followed by * is a prefix wildcard, e.g. comput*
+WILDCARD_PATTERN = re.compile(r'([a-zA-Z]+)\*')
 
 class SearchEngine:
-    def __init__(self, trie, documents):
+    def __init__(self, trie, documents, indexer=None, ranking='frequency', processor=None,
+                 backend='python', or_fallback=False, cache_size=QUERY_CACHE_SIZE, static_weight=0,
+                 collapse_duplicates=True, max_wildcard_expansions=MAX_WILDCARD_EXPANSIONS):
+        """
+        indexer supplies the statistics for BM25 ranking: an Indexer built
+        on the same trie, or the MappedIndex itself when searching one
+        backend 'numpy' scores candidates with vectorised array operations;
+        without NumPy installed it falls back to 'python'
+        or_fallback makes plain queries without a conjunctive match return
+        documents containing any of their terms
+        cache_size: queries whose results are cached (0 disables the cache)
+        static_weight adds the indexer's static_scores (PageRank) to every
+        result's score, scaled so the best linked page gets static_weight
+        collapse_duplicates returns only the best ranked document of each
+        group of near-duplicates the indexer recorded (see Indexer.build_index)
+        max_wildcard_expansions caps a wildcard at that many of its most
+        frequent completions; by default it matches all of them
+        """
         self.trie = trie
         self.documents = documents
-        self.processor = TextProcessor()
+        self.indexer = indexer
+        self.processor = processor or TextProcessor()
+        self.ranking = ranking
+        self.or_fallback = or_fallback
+        self.executor = QueryExecutor(trie, self.processor, documents, max_wildcard_expansions,
+                                      getattr(indexer, 'skipped_duplicates', ()))
+        self.scorers = {'frequency': FrequencyPositionScorer()}
+        if indexer is not None:
+            if getattr(indexer, 'trie', indexer) is not trie:
+                raise ValueError("indexer must be built on the trie being searched")
+            self.scorers['bm25'] = BM25Scorer(indexer, trie=trie)
+        self._get_scorer(ranking)
+        
+        if backend not in ('python', 'numpy'):
+            raise ValueError(f"Unknown scoring backend: {backend}")
+        if backend == 'numpy' and not HAS_NUMPY:
+            print("NumPy is not installed, using the Python scoring backend")
+            backend = 'python'
+        self.backend = backend
+        self.vector_rankers = {}  # {ranking: VectorRanker}, created on first use
+        self.query_cache = QueryCache(cache_size) if cache_size else None
+        self.statistics_generation = 0  # Incremented by refresh_statistics
+        self.static_weight = static_weight
+        self.prior = self._build_prior()
+        self.collapse_duplicates = collapse_duplicates
+        self.duplicate_of, self.duplicate_share = self._duplicate_groups()
+    
+    def index_generation(self):
+        """
+        Changes whenever the index or its statistics change; cached results
+        of an older generation are discarded
+        """
+        return getattr(self.trie, 'generation', 0), self.statistics_generation
+    
+    def refresh_statistics(self):
+        """
+        Rebuild the BM25 scorer after documents were added, updated or deleted
+        """
+        if self.indexer is not None:
+            self.scorers['bm25'] = BM25Scorer(self.indexer, trie=self.trie)
+        self.prior = self._build_prior()
+        self.duplicate_of, self.duplicate_share = self._duplicate_groups()
+        self.vector_rankers = {}
+        self.executor.invalidate()
+        self.statistics_generation += 1
+    
+    def _build_prior(self):
+        """
+        StaticPrior over the indexer's static scores, or None without them
+        """
+        static_scores = getattr(self.indexer, 'static_scores', None)
+        if not self.static_weight or not static_scores:
+            return None
+        return StaticPrior(static_scores, self.static_weight)
+    
+    def _duplicate_groups(self):
+        """
+        (the indexer's duplicate_of array, share of the indexed documents
+        that are near-duplicates) when results are collapsed and there are
+        any, else (None, 0)
+        """
+        duplicate_of = getattr(self.indexer, 'duplicate_of', None)
+        if not self.collapse_duplicates or duplicate_of is None:
+            return None, 0
+        duplicates = sum(1 for original in duplicate_of if original >= 0)
+        if not duplicates:
+            return None, 0
+        return duplicate_of, duplicates / max(self.indexer.index_stats['total_documents'], duplicates)
+    
+    def _get_scorer(self, ranking):
+        if ranking not in self.scorers:
+            if ranking == 'bm25':
+                raise ValueError("BM25 ranking needs an indexer with document statistics")
+            raise ValueError(f"Unknown ranking mode: {ranking}")
+        return self.scorers[ranking]
     
-    def search(self, query):
+    def _get_vector_ranker(self, ranking):
+        if ranking not in self.vector_rankers:
+            self.vector_rankers[ranking] = VectorRanker(self._get_scorer(ranking))
+        return self.vector_rankers[ranking]
+    
+    def search(self, query, k=None, ranking=None, or_fallback=None):
         """
-        Search for documents containing all query terms
+        Search for documents matching a query
+        Plain queries match documents containing all query terms; words
+        ending in * match every indexed term with that prefix. Queries may
+        also use AND, OR, NOT, parentheses, "quoted phrases" and a NEAR/n b
+        (a and b at most n terms apart).
+        ranking selects 'frequency' (term frequency and position) or 'bm25'
+        With k set, only the k best results are returned; for plain queries
+        they are computed with a bounded heap and MaxScore pruning and
+        equal the first k of a full search
+        or_fallback ranks a plain query as OR of its terms when no document
+        contains all of them (defaults to the engine setting)
+        The numpy backend returns the same results, computed in bulk
+        Near-duplicates of a better ranked result are left out when the
+        engine collapses duplicates
         """
-        # Process query
-        query_terms = self.processor.process_query(query)
+        ranking = ranking or self.ranking
+        if or_fallback is None:
+            or_fallback = self.or_fallback
+        
+        if has_operators(query):
+            structured = True
+            # Operand order matters for phrases and NEAR, so only whitespace is normalised
+            query_key = ' '.join(query.split())
+        else:
+            structured = False
+            query_terms, prefixes = self._plain_query_terms(query)
+            # Plain queries match the same documents whatever the term order
+            query_key = tuple(sorted(query_terms + [prefix.lower() + '*' for prefix in prefixes]))
+        
+        if self.query_cache is not None:
+            cache_key = (structured, query_key, k, ranking, or_fallback)
+            generation = self.index_generation()
+            results = self.query_cache.get(cache_key, generation)
+            if results is not None:
+                return results
+        
+        def rank(limit):
+            if structured:
+                return self._search_structured(query, limit, ranking)
+            # Resolve query terms to their occurrence lists
+            occurrence_lists, term_ids = self._resolve_query(query_terms, prefixes)
+            results = self._rank_terms(occurrence_lists, term_ids, limit, ranking, conjunctive=True)
+            
+            if not results and or_fallback:
+                # No document has every term: rank documents having any of them
+                occurrence_lists, term_ids = self._resolve_query(query_terms, prefixes, skip_missing=True)
+                results = self._rank_terms(occurrence_lists, term_ids, limit, ranking, conjunctive=False)
+            return results
+        
+        if self.duplicate_of is not None:
+            results = self._collapse_duplicates(rank, k)
+        else:
+            results = rank(k)
         
-        if not query_terms:
+        if self.query_cache is not None:
+            self.query_cache.put(cache_key, generation, results)
+        return results
+    
+    def _collapse_duplicates(self, rank, k):
+        """
+        rank(k) with only the best ranked document of each duplicate group
+        rank is first asked for enough results to make up for the share of
+        duplicates, then for twice as many until k groups are found or no
+        more documents match.
+        """
+        limit = k + math.ceil(2 * k * self.duplicate_share) if k is not None else None
+        while True:
+            results = rank(limit)
+            collapsed = []
+            seen_groups = set()
+            for doc_id, score in results:
+                original = self.duplicate_of[doc_id] if doc_id < len(self.duplicate_of) else -1
+                group = original if original >= 0 else doc_id
+                if group not in seen_groups:
+                    seen_groups.add(group)
+                    collapsed.append((doc_id, score))
+            if k is None or len(collapsed) >= k or len(results) < limit:
+                return collapsed[:k] if k is not None else collapsed
+            limit *= 2
+    
+    def cache_stats(self):
+        """
+        Query cache statistics (see QueryCache.stats), or None without a cache
+        """
+        return self.query_cache.stats() if self.query_cache is not None else None
+    
+    def _rank_terms(self, occurrence_lists, term_ids, k, ranking, conjunctive):
+        """
+        Rank the documents containing all (or, if not conjunctive, any) of the terms
+        """
+        if not occurrence_lists:
             return []
         
-        # Find documents containing all terms
-        matching_docs = self.trie.intersection_search(query_terms)
+        if self.backend == 'numpy':
+            return self._get_vector_ranker(ranking).rank(occurrence_lists, k, conjunctive, term_ids,
+                                                         prior=self.prior)
+        
+        scorer = self._get_scorer(ranking)
+        if k is not None:
+            return rank_top_k(occurrence_lists, scorer, k, conjunctive, term_ids, self.prior)
+        
+        # Find documents containing all (or any) terms
+        if conjunctive:
+            matching_docs = intersect_sorted(occurrence_lists)
+        else:
+            matching_docs = union_sorted([occurrence_list.doc_ids() for occurrence_list in occurrence_lists])
         
         if not matching_docs:
             return []
             
         # Rank matching documents
-        ranked_results = self._rank_documents(matching_docs, query_terms)
+        ranked_results = self._rank_documents(matching_docs, occurrence_lists, scorer, term_ids)
         return ranked_results
     
-    def _rank_documents(self, matching_docs, query_terms):
-        """
-        Rank documents based on term frequency and position
-        """
-        scores = {}
-        for doc_id in matching_docs:
-            score = 0
-            for term in query_terms:
-                # Get occurrence list
-                occurrence_list = self.trie.get_occurrence_list(term)
-                if occurrence_list and doc_id in occurrence_list.documents:
-                    positions = occurrence_list.documents[doc_id]
-                    frequency = len(positions)
-                    position_score = 1.0 / (1 + min(positions)) if positions else 0
-                    score += frequency * (1 + position_score)
-            
-            scores[doc_id] = score
-            
-        # Sort by score
-        ranked_results = sorted(
-            scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        return ranked_results
+    def _search_structured(self, query, k, ranking):
+        """
+        Evaluate a boolean / phrase / proximity query and rank its matches
+        by the terms outside NOT clauses
+        """
+        matching_docs, occurrence_lists, term_ids = self.executor.execute(parse_query(query))
+        if not matching_docs:
+            return []
+        if self.backend == 'numpy':
+            return self._get_vector_ranker(ranking).rank(occurrence_lists, k, term_ids=term_ids,
+                                                         candidates=matching_docs, prior=self.prior)
+        ranked_results = self._rank_documents(matching_docs, occurrence_lists,
+                                              self._get_scorer(ranking), term_ids)
+        return ranked_results if k is None else ranked_results[:k]
+    
+    def _plain_query_terms(self, query):
+        """
+        (processed query terms, wildcard prefixes) of a query without operators
+        """
+        prefixes = WILDCARD_PATTERN.findall(query)
+        query_terms = self.processor.process_query(WILDCARD_PATTERN.sub(' ', query))
+        return query_terms, prefixes
+    
+    def _resolve_query(self, query_terms, prefixes, skip_missing=False):
+        """
+        Look up the occurrence list of every query term and wildcard prefix
+        A wildcard is expanded to its completions, merged into one
+        UnionOccurrenceList (see QueryExecutor.expand_wildcard). Returns (occurrence_lists, term_ids), where
+        term_ids are occurrence list indexes (None for wildcards), or
+        ([], []) if any term matches nothing. With skip_missing, terms that
+        match nothing are left out instead.
+        """
+        occurrence_lists = []
+        term_ids = []
+        for term in query_terms:
+            is_found, term_id = self.trie.search(term)
+            if not is_found:
+                if skip_missing:
+                    continue
+                return [], []
+            occurrence_lists.append(self.trie.occurrence_lists[term_id])
+            term_ids.append(term_id)
+        
+        for prefix in prefixes:
+            occurrence_list = self.executor.expand_wildcard(prefix)
+            if occurrence_list is None:
+                if skip_missing:
+                    continue
+                return [], []
+            occurrence_lists.append(occurrence_list)
+            term_ids.append(None)
+        return occurrence_lists, term_ids
+    
+    def autocomplete(self, prefix, limit=10):
+        """
+        Suggest indexed terms starting with prefix, most common first
+        """
+        cleaned_prefix = self.processor.preprocess_text(prefix)
+        if not cleaned_prefix:
+            return []
+        return [word for word, _ in self.trie.prefix_search(cleaned_prefix, limit)]
+    
+    def _rank_documents(self, matching_docs, occurrence_lists, scorer, term_ids=None):
+        """
+        Rank documents with the selected scorer
+        """
+        return rank_all(matching_docs, occurrence_lists, scorer, term_ids, self.prior)
 
-    def get_snippet(self, doc_id, query_terms, max_length=200):
+    def _document_field(self, doc_id, field):
+        """
+        One field of a document; document stores decode only that field
+        """
+        get_field = getattr(self.documents, 'get_field', None)
+        if get_field is not None:
+            return get_field(doc_id, field)
+        return self.documents[doc_id][field]
+
+    def get_snippet(self, doc_id, query_terms, max_length=200, highlight=False):
         """
         Generate a relevant text snippet from the document containing query terms
+        Uses the query terms' positions and the token offsets recorded at
+        index time, so the cost depends on the number of matches rather
+        than the document length. With highlight, matched terms are marked.
         """
         if doc_id not in self.documents:
             return ""
 
-        content = self.documents[doc_id]['content']
+        get_token_offsets = getattr(self.indexer, 'get_token_offsets', None)
+        token_offsets = get_token_offsets(doc_id) if get_token_offsets else None
+        if token_offsets is None:
+            return self._scan_snippet(doc_id, query_terms, max_length)
+
+        position_lists = []
+        for term in query_terms:
+            occurrence_list = self.trie.get_occurrence_list(term)
+            if occurrence_list is not None:
+                position_lists.append(occurrence_list.get_positions(doc_id))
+        hits = merge_hits(position_lists)
+        return build_snippet(self._document_field(doc_id, 'content'), token_offsets, hits,
+                             max_length, highlight)
+
+    def _scan_snippet(self, doc_id, query_terms, max_length=200):
+        """
+        Snippet by scanning the document text, for documents indexed
+        without token offsets
+        """
+        content = self._document_field(doc_id, 'content')
         
         # Split content into words
         words = content.lower().split()
@@ -94,7 +372,7 @@ class SearchEngine:
         Get the title of a document
         """
         if doc_id in self.documents:
-            return self.documents[doc_id]['title']
+            return self._document_field(doc_id, 'title')
         return ""
 
     def get_document_url(self, doc_id):
@@ -102,5 +380,5 @@ class SearchEngine:
         Get the URL of a document
         """
         if doc_id in self.documents:
-            return self.documents[doc_id]['url']
+            return self._document_field(doc_id, 'url')
         return ""
\ No newline at end of file
@@ -0,0 +1,397 @@
+# src/segments.py
+
+import heapq
+import threading
+from array import array
+
+from src.postings import (
+    CompactOccurrenceList, DocumentsView, difference_sorted, union_sorted, intersect_doc_ids
+)
+from src.term_dictionary import TermDictionary, COMPLETION_CACHE_SIZE
+from src.trie import Trie, FrozenTrie, OccurrenceList
+
+# Documents held by the mutable segment before it is frozen
+FLUSH_THRESHOLD = 1000
+
+# Frozen segments allowed before they are merged into one
+MAX_SEGMENTS = 4
+
+
+class Segment:
+    """
+    One part of a SegmentedIndex: a trie, the ids of the documents it
+    holds and the tombstones of those deleted since it was frozen
+    """
+    __slots__ = ('trie', 'doc_ids', 'deleted', '_sorted_deleted')
+
+    def __init__(self, trie, doc_ids=None, deleted=None):
+        self.trie = trie
+        self.doc_ids = doc_ids if doc_ids is not None else set()
+        self.deleted = deleted if deleted is not None else set()
+        self._sorted_deleted = None
+
+    def delete(self, doc_id):
+        self.deleted.add(doc_id)
+        self._sorted_deleted = None
+
+    def sorted_deleted(self):
+        if self._sorted_deleted is None:
+            self._sorted_deleted = sorted(self.deleted)
+        return self._sorted_deleted
+
+
+class SegmentOccurrenceList:
+    """
+    Read-only view of one term across all segments of a SegmentedIndex,
+    without tombstoned documents. A live document is held by exactly one
+    segment, so the members never overlap.
+    """
+    __slots__ = ('index', 'word', '_generation', '_members', '_doc_ids')
+
+    def __init__(self, index, word):
+        self.index = index
+        self.word = word
+        self._generation = None
+        self._members = None
+        self._doc_ids = None
+
+    def _current_members(self):
+        """
+        [(occurrence_list, segment)] of the segments containing the word,
+        looked up again whenever the index changed
+        """
+        generation = self.index.generation
+        if self._generation != generation:
+            members = []
+            for segment in self.index.segments:
+                occurrence_list = segment.trie.get_occurrence_list(self.word)
+                if occurrence_list is not None and len(occurrence_list):
+                    members.append((occurrence_list, segment))
+            self._members = members
+            self._doc_ids = None
+            self._generation = generation
+        return self._members
+
+    @property
+    def documents(self):
+        return DocumentsView(self)
+
+    def doc_ids(self):
+        """
+        Sorted ids of the live documents containing the term
+        """
+        members = self._current_members()
+        if self._doc_ids is None:
+            self._doc_ids = array('I', union_sorted([
+                difference_sorted(occurrence_list.doc_ids(), segment.sorted_deleted())
+                if segment.deleted else occurrence_list.doc_ids()
+                for occurrence_list, segment in members
+            ]))
+        return self._doc_ids
+
+    def document_frequency(self):
+        return len(self.doc_ids())
+
+    def term_frequency(self, doc_id):
+        for occurrence_list, segment in self._current_members():
+            if doc_id not in segment.deleted:
+                frequency = occurrence_list.term_frequency(doc_id)
+                if frequency:
+                    return frequency
+        return 0
+
+    def max_term_frequency(self):
+        """
+        Upper bound only: tombstoned documents are not excluded
+        """
+        return max((occurrence_list.max_term_frequency()
+                    for occurrence_list, _ in self._current_members()), default=0)
+
+    def get_positions(self, doc_id):
+        for occurrence_list, segment in self._current_members():
+            if doc_id not in segment.deleted and doc_id in occurrence_list:
+                return occurrence_list.get_positions(doc_id)
+        return []
+
+    def __contains__(self, doc_id):
+        return any(doc_id in occurrence_list and doc_id not in segment.deleted
+                   for occurrence_list, segment in self._current_members())
+
+    def __len__(self):
+        return len(self.doc_ids())
+
+
+def merge_segments(segments):
+    """
+    Merge segments into one FrozenTrie holding only their live documents
+    Returns (frozen_trie, doc_ids)
+    """
+    words = heapq.merge(*(
+        (word for word, _ in segment.trie.iter_terms()) for segment in segments
+    ))
+    deleted = [frozenset(segment.deleted) for segment in segments]
+    terms = []
+    occurrence_lists = []
+    previous = None
+    for word in words:
+        if word == previous:
+            continue
+        previous = word
+        merged = OccurrenceList()
+        for segment, segment_deleted in zip(segments, deleted):
+            occurrence_list = segment.trie.get_occurrence_list(word)
+            if occurrence_list is None:
+                continue
+            for doc_id in occurrence_list.doc_ids():
+                if doc_id not in segment_deleted:
+                    merged.documents[doc_id] = occurrence_list.get_positions(doc_id)
+        if merged.documents:
+            terms.append(word)
+            occurrence_lists.append(CompactOccurrenceList.from_occurrence_list(merged))
+    doc_ids = set()
+    for segment, segment_deleted in zip(segments, deleted):
+        doc_ids.update(segment.doc_ids - segment_deleted)
+    return FrozenTrie(TermDictionary.from_sorted_terms(terms), occurrence_lists), doc_ids
+
+
+class SegmentedIndex:
+    """
+    Updatable index made of segments, log-structured merge style
+
+    New documents go into a small mutable Trie. Once it holds
+    flush_threshold documents it is frozen into a read-only segment. A
+    deleted or updated document is removed from the mutable Trie directly,
+    but only tombstoned in a frozen segment; tombstoned postings are
+    skipped by queries and dropped when segments are merged. Whenever more
+    than max_segments frozen segments exist they are merged into one, in a
+    background thread if background_merge is set.
+
+    Supports the lookups of Trie, so Indexer and SearchEngine can use it in
+    place of one. Term ids are stable across flushes and merges.
+    """
+
+    def __init__(self, flush_threshold=FLUSH_THRESHOLD, max_segments=MAX_SEGMENTS,
+                 background_merge=False):
+        self.flush_threshold = flush_threshold
+        self.max_segments = max_segments
+        self.background_merge = background_merge
+        self.frozen_segments = []
+        self.active = Segment(Trie())
+        self.segments = [self.active]  # Frozen segments, then the mutable one
+        self.term_ids = {}  # {word: term id}
+        self.occurrence_lists = []  # SegmentOccurrenceList per term id
+        self.document_segments = {}  # {doc_id: Segment holding the live version}
+        self.document_words = {}  # {doc_id: words} for documents in the mutable segment
+        self.generation = 0  # Incremented on every change
+        self.lock = threading.RLock()
+        self.merge_finished = threading.Condition(self.lock)
+        self._merging = False
+        self._merge_thread = None
+
+    def _changed(self):
+        self.segments = self.frozen_segments + [self.active]
+        self.generation += 1
+
+    def insert_document(self, doc_id, word_positions):
+        """
+        Add a document; it must not be in the index already
+        """
+        with self.lock:
+            if doc_id in self.document_segments:
+                raise ValueError(f"Document {doc_id} is already indexed")
+            self.active.trie.insert_document(doc_id, word_positions)
+            self.active.doc_ids.add(doc_id)
+            self.document_segments[doc_id] = self.active
+            self.document_words[doc_id] = list(word_positions)
+            for word in word_positions:
+                if word not in self.term_ids:
+                    self.term_ids[word] = len(self.occurrence_lists)
+                    self.occurrence_lists.append(SegmentOccurrenceList(self, word))
+            self._changed()
+            if len(self.active.doc_ids) >= self.flush_threshold:
+                self.flush()
+
+    def delete_document(self, doc_id, words=None):
+        """
+        Remove a document: from the mutable segment directly, otherwise by
+        tombstoning it in its frozen segment
+        Returns False if the document is not indexed
+        """
+        with self.lock:
+            segment = self.document_segments.pop(doc_id, None)
+            if segment is None:
+                return False
+            if segment is self.active:
+                segment.trie.delete_document(doc_id, self.document_words.pop(doc_id))
+                segment.doc_ids.discard(doc_id)
+            else:
+                segment.delete(doc_id)
+            self._changed()
+            return True
+
+    def flush(self):
+        """
+        Freeze the mutable segment, then merge if there are too many segments
+        """
+        with self.lock:
+            if self.active.doc_ids:
+                frozen = Segment(self.active.trie.freeze(), self.active.doc_ids)
+                for doc_id in frozen.doc_ids:
+                    self.document_segments[doc_id] = frozen
+                self.frozen_segments = self.frozen_segments + [frozen]
+                self.active = Segment(Trie())
+                self.document_words = {}
+                self._changed()
+            if len(self.frozen_segments) > self.max_segments:
+                if self.background_merge:
+                    if self._merge_thread is None or not self._merge_thread.is_alive():
+                        self._merge_thread = threading.Thread(target=self.merge, daemon=True)
+                        self._merge_thread.start()
+                else:
+                    self.merge()
+
+    def merge(self):
+        """
+        Merge all frozen segments into one without their tombstoned documents
+        Queries and updates continue during the merge; documents deleted
+        meanwhile stay tombstoned in the merged segment. Merges run one at a
+        time: a merge started while another is running waits for it, so no
+        segment is merged twice.
+        """
+        with self.lock:
+            while self._merging:
+                self.merge_finished.wait()
+            sources = list(self.frozen_segments)
+            snapshot = [frozenset(segment.deleted) for segment in sources]
+            if len(sources) < 2 and not any(snapshot):
+                return
+            self._merging = True
+        try:
+            # Source segments are read-only apart from their tombstones, which
+            # merge_segments copies, so the expensive part runs unlocked
+            merged_trie, doc_ids = merge_segments([Segment(segment.trie, segment.doc_ids, set(deleted))
+                                                   for segment, deleted in zip(sources, snapshot)])
+            self._publish_merge(sources, snapshot, merged_trie, doc_ids)
+        finally:
+            with self.lock:
+                self._merging = False
+                self.merge_finished.notify_all()
+
+    def _publish_merge(self, sources, snapshot, merged_trie, doc_ids):
+        """
+        Replace the source segments with the merged one, carrying over the
+        tombstones added since the snapshot
+        """
+        with self.lock:
+            if any(segment not in self.frozen_segments for segment in sources):
+                return
+            merged = Segment(merged_trie, doc_ids)
+            for segment, deleted in zip(sources, snapshot):
+                for doc_id in segment.deleted - deleted:
+                    merged.delete(doc_id)
+            for doc_id in doc_ids:
+                if self.document_segments.get(doc_id) in sources:
+                    self.document_segments[doc_id] = merged
+            remaining = [segment for segment in self.frozen_segments if segment not in sources]
+            self.frozen_segments = [merged] + remaining
+            self._changed()
+
+    def wait_for_merge(self):
+        """
+        Block until a background merge has finished
+        """
+        thread = self._merge_thread
+        if thread is not None:
+            thread.join()
+
+    def segment_count(self):
+        return len(self.segments)
+
+    def search(self, word):
+        """
+        Search for a word in the term dictionary
+        Returns (is_found, occurrence_list_index) tuple
+        """
+        term_id = self.term_ids.get(word.lower())
+        if term_id is None:
+            return False, None
+        return True, term_id
+
+    def get_occurrence_list(self, word):
+        """
+        Get the occurrence list for a word
+        """
+        term_id = self.term_ids.get(word.lower())
+        return self.occurrence_lists[term_id] if term_id is not None else None
+
+    def intersection_search(self, query_terms):
+        """
+        Find documents containing all query terms
+        """
+        if not query_terms:
+            return set()
+        occurrences = []
+        for term in query_terms:
+            occurrence_list = self.get_occurrence_list(term)
+            if occurrence_list is None:
+                return set()  # Term not found
+            occurrences.append(occurrence_list)
+        return intersect_doc_ids(occurrences)
+
+    def iter_terms(self):
+        """
+        Yield (word, occurrence_list) pairs of terms with live documents in
+        sorted word order
+        """
+        return self._merge_terms(segment.trie.iter_terms() for segment in self.segments)
+
+    def prefix_terms(self, prefix):
+        """
+        Yield (word, occurrence_list) pairs of every term starting with
+        prefix that has live documents, in sorted word order
+        """
+        return self._merge_terms(segment.trie.prefix_terms(prefix) for segment in self.segments)
+
+    def _merge_terms(self, segment_terms):
+        """
+        Merge sorted (word, occurrence_list) streams of the segments into
+        the live occurrence list of each distinct word
+        """
+        previous = None
+        for word in heapq.merge(*((word for word, _ in terms) for terms in segment_terms)):
+            if word == previous:
+                continue
+            previous = word
+            occurrence_list = self.get_occurrence_list(word)
+            if len(occurrence_list):
+                yield word, occurrence_list
+
+    def prefix_search(self, prefix, limit=COMPLETION_CACHE_SIZE):
+        """
+        Top completions of a prefix ranked by live document frequency
+        Candidates are the top completions of each segment, so a term
+        spread thinly over many segments can be missed
+        """
+        candidates = set()
+        for segment in self.segments:
+            candidates.update(word for word, _ in segment.trie.prefix_search(prefix, limit))
+        completions = []
+        for word in candidates:
+            document_frequency = len(self.get_occurrence_list(word))
+            if document_frequency:
+                completions.append((-document_frequency, word))
+        return [(word, -negative_frequency) for negative_frequency, word in heapq.nsmallest(limit, completions)]
+
+    def compact(self):
+        """
+        Frozen segments are already compact; the mutable one is flushed
+        """
+        self.flush()
+
+    def freeze(self):
+        """
+        Merge every segment into a single read-only FrozenTrie
+        """
+        self.wait_for_merge()
+        with self.lock:
+            return merge_segments(self.segments)[0]
@@ -0,0 +1,164 @@
+# src/sharding.py
+
+import heapq
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.index_file import MappedIndex, write_index
+from src.link_graph import build_link_graph, pagerank
+from src.searcher import SearchEngine
+from src.text_processor import TextProcessor
+
+# The SearchEngine of a shard worker process, set once by _open_shard
+_shard_engine = None
+
+
+def shard_of(doc_id, num_shards):
+    """
+    Shard a document belongs to
+    """
+    return doc_id % num_shards
+
+
+def partition_documents(documents, num_shards):
+    """
+    Split {doc_id: document} into num_shards dictionaries by shard_of
+    """
+    shards = [{} for _ in range(num_shards)]
+    for doc_id, doc_data in documents.items():
+        shards[shard_of(doc_id, num_shards)][doc_id] = doc_data
+    return shards
+
+
+def shard_path(directory, number):
+    return os.path.join(directory, f"shard-{number}.idx")
+
+
+def build_shards(documents, processor, num_shards, directory, workers=1):
+    """
+    Index documents into num_shards binary index files in directory
+    Every shard file holds the collection-wide statistics (document count,
+    average length and document frequencies), so BM25 scores of different
+    shards are comparable. Returns the shard file paths.
+    """
+    shard_documents = partition_documents(documents, num_shards)
+    indexers = []
+    for number, shard in enumerate(shard_documents):
+        print(f"Indexing shard {number + 1}/{num_shards} ({len(shard)} documents)")
+        indexer = Indexer(Trie())
+        indexer.build_index(shard, processor, workers=workers)
+        indexer.freeze()
+        indexers.append(indexer)
+
+    # Collection statistics over all shards
+    total_documents = sum(indexer.index_stats['total_documents'] for indexer in indexers)
+    total_terms = sum(indexer.index_stats['total_terms'] for indexer in indexers)
+    collection_stats = {
+        'total_documents': total_documents,
+        'total_terms': total_terms,
+        'average_document_length': total_terms / total_documents if total_documents > 0 else 0
+    }
+    document_frequencies = Counter()
+    for indexer in indexers:
+        for word, occurrence_list in indexer.trie.iter_terms():
+            document_frequencies[word] += len(occurrence_list)
+
+    # PageRank over the links of the whole collection, not just one shard
+    static_scores = pagerank(build_link_graph(documents))
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for number, (indexer, shard) in enumerate(zip(indexers, shard_documents)):
+        path = shard_path(directory, number)
+        write_index(path, indexer.trie, shard, collection_stats, indexer.token_offsets,
+                    document_frequencies, static_scores)
+        paths.append(path)
+    return paths
+
+
+def _open_shard(path, processor, engine_options):
+    global _shard_engine
+    index = MappedIndex(path)
+    _shard_engine = SearchEngine(index, index.documents, indexer=index, processor=processor,
+                                 **engine_options)
+
+
+def _search_shard(query, k, ranking):
+    return _shard_engine.search(query, k=k, ranking=ranking)
+
+
+class ShardedSearchEngine:
+    """
+    Scatter-gather search over the shard files written by build_shards
+
+    With processes set, every shard is opened by its own worker process
+    and a query is sent to all of them at once; otherwise the shards are
+    searched one after another in this process. Each shard returns its
+    best results and they are merged by score, ties by doc id, which gives
+    the same results as a single index over all documents. The exception
+    is BM25 over wildcards: a shard expands them and computes their IDF
+    from its own documents only.
+    """
+
+    def __init__(self, shard_paths, processor=None, ranking='frequency', processes=True, **engine_options):
+        self.processor = processor or TextProcessor()
+        self.ranking = ranking
+        self.shards = [MappedIndex(path) for path in shard_paths]
+        # Local engines serve documents and snippets, and queries without processes
+        self.engines = [SearchEngine(shard, shard.documents, indexer=shard, ranking=ranking,
+                                     processor=self.processor, **engine_options)
+                        for shard in self.shards]
+        self.executors = None
+        if processes:
+            options = dict(engine_options, ranking=ranking)
+            self.executors = [
+                ProcessPoolExecutor(max_workers=1, initializer=_open_shard,
+                                    initargs=(path, self.processor, options))
+                for path in shard_paths
+            ]
+
+    def search(self, query, k=None, ranking=None):
+        """
+        Search every shard and merge the results; see SearchEngine.search
+        """
+        ranking = ranking or self.ranking
+        if self.executors is not None:
+            futures = [executor.submit(_search_shard, query, k, ranking) for executor in self.executors]
+            shard_results = [future.result() for future in futures]
+        else:
+            shard_results = [engine.search(query, k=k, ranking=ranking) for engine in self.engines]
+        merged = heapq.merge(*shard_results, key=lambda result: (-result[1], result[0]))
+        return list(islice(merged, k)) if k is not None else list(merged)
+
+    def _engine_for(self, doc_id):
+        return self.engines[shard_of(doc_id, len(self.engines))]
+
+    def get_document_title(self, doc_id):
+        return self._engine_for(doc_id).get_document_title(doc_id)
+
+    def get_document_url(self, doc_id):
+        return self._engine_for(doc_id).get_document_url(doc_id)
+
+    def get_snippet(self, doc_id, query_terms, max_length=200, highlight=False):
+        return self._engine_for(doc_id).get_snippet(doc_id, query_terms, max_length, highlight)
+
+    def close(self):
+        """
+        Stop the shard processes and unmap the shard files
+        """
+        if self.executors is not None:
+            for executor in self.executors:
+                executor.shutdown()
+            self.executors = None
+        for shard in self.shards:
+            shard.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
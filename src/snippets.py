@@ -0,0 +1,115 @@
+# src/snippets.py
+
+import heapq
+
+# Number of indexed tokens shown in a snippet
+WINDOW_SIZE = 30
+
+# Tokens of context kept before the first matched term
+LEAD_TOKENS = 3
+
+# Markers placed around matched terms when highlighting
+HIGHLIGHT_START = '**'
+HIGHLIGHT_END = '**'
+
+
+def merge_hits(position_lists):
+    """
+    Merge the positions of several query terms into one sorted list of
+    (position, term_number) hits
+    """
+    return list(heapq.merge(*(
+        [(position, term_number) for position in positions]
+        for term_number, positions in enumerate(position_lists)
+    )))
+
+
+def best_window(hits, window_size=WINDOW_SIZE):
+    """
+    (first, last) positions of the hits spanning fewer than window_size
+    tokens that cover the most distinct terms, then the most hits
+    A sliding window over the sorted hits, so the cost depends only on the
+    number of hits. The earliest window wins ties. None without hits.
+    """
+    if not hits:
+        return None
+    counts = {}
+    best = None
+    best_key = None
+    left = 0
+    for right, (position, term_number) in enumerate(hits):
+        counts[term_number] = counts.get(term_number, 0) + 1
+        while position - hits[left][0] >= window_size:
+            left_term = hits[left][1]
+            counts[left_term] -= 1
+            if not counts[left_term]:
+                del counts[left_term]
+            left += 1
+        key = (len(counts), right - left + 1)
+        if best_key is None or key > best_key:
+            best_key = key
+            best = (hits[left][0], position)
+    return best
+
+
+def _snippet_start(content, token_offsets, start):
+    """
+    Character offset at which a snippet beginning with token start begins
+    The stop words between it and the previous indexed token are included,
+    but not the punctuation that ends the previous sentence.
+    """
+    token_start = token_offsets[2 * start]
+    char_start = token_offsets[2 * start - 1] if start else 0
+    while char_start < token_start and not content[char_start].isalpha():
+        char_start += 1
+    return char_start
+
+
+def build_snippet(content, token_offsets, hits, max_length=200, highlight=False,
+                  window_size=WINDOW_SIZE):
+    """
+    Cut a snippet out of content around the best window of hits
+
+    token_offsets holds start, end character offsets per token position,
+    so only the characters of the snippet are touched. With highlight,
+    matched tokens are wrapped in HIGHLIGHT_START / HIGHLIGHT_END.
+    A window longer than max_length loses its context after the last hit
+    first, then its lead-in, and only then hits at its end.
+    """
+    num_tokens = len(token_offsets) // 2
+    if not num_tokens:
+        return ""
+    window = best_window(hits, window_size)
+    first, last = window if window else (0, 0)
+    # Lead in before the first hit only as far as the last hit still fits
+    start = max(0, min(max(first - LEAD_TOKENS, last - window_size + 1), num_tokens - window_size))
+    end = min(num_tokens, start + window_size) - 1
+
+    char_start = _snippet_start(content, token_offsets, start)
+    char_end = token_offsets[2 * end + 2] if end + 1 < num_tokens else len(content)
+    truncated = False
+    if char_end - char_start > max_length:
+        # Stop after the last token that still fits
+        while end > max(start, last) and token_offsets[2 * end + 1] - char_start > max_length:
+            end -= 1
+        while start < first and token_offsets[2 * end + 1] - char_start > max_length:
+            start += 1
+            char_start = _snippet_start(content, token_offsets, start)
+        while end > start and token_offsets[2 * end + 1] - char_start > max_length:
+            end -= 1
+        char_end = min(token_offsets[2 * end + 1], char_start + max_length)
+        truncated = True
+
+    pieces = []
+    cursor = char_start
+    if highlight:
+        for position in sorted({position for position, _ in hits if start <= position <= end}):
+            token_start = token_offsets[2 * position]
+            token_end = token_offsets[2 * position + 1]
+            pieces.append(content[cursor:token_start])
+            pieces.append(HIGHLIGHT_START + content[token_start:token_end] + HIGHLIGHT_END)
+            cursor = token_end
+    pieces.append(content[cursor:char_end])
+
+    snippet = ' '.join(''.join(pieces).split())
+    return snippet + '...' if truncated else snippet
@@ -0,0 +1,163 @@
+# src/term_dictionary.py
+
+import heapq
+from array import array
+from bisect import bisect_right
+
+# Every BLOCK_SIZE-th term is kept as a Python bytes key so lookups can
+# bisect in C to a block before searching the packed buffer
+BLOCK_SIZE = 32
+
+# Number of completions precomputed per prefix
+COMPLETION_CACHE_SIZE = 10
+
+# Prefixes matching at most this many terms are ranked by scanning them
+PREFIX_SCAN_LIMIT = 256
+
+
+class TermDictionary:
+    """
+    Read-only sorted term array with binary search lookup
+
+    term_text: UTF-8 encoded terms concatenated in sorted byte order
+    term_offsets: len(terms) + 1 offsets into term_text
+
+    Both buffers may be in-memory (bytes / array('I')) or memoryviews over
+    a mapped index file. A term's number is its rank in sorted order.
+    """
+    __slots__ = ('term_text', 'term_offsets', 'num_terms', '_block_keys')
+
+    def __init__(self, term_text, term_offsets):
+        self.term_text = term_text
+        self.term_offsets = term_offsets
+        self.num_terms = len(term_offsets) - 1
+        self._block_keys = [
+            self._key_at(term_index) for term_index in range(0, self.num_terms, BLOCK_SIZE)
+        ]
+
+    @classmethod
+    def from_sorted_terms(cls, terms):
+        """
+        Build a dictionary from terms already in sorted order
+        """
+        term_text = bytearray()
+        term_offsets = array('I', [0])
+        for term in terms:
+            term_text.extend(term.encode('utf-8'))
+            term_offsets.append(len(term_text))
+        return cls(bytes(term_text), term_offsets)
+
+    def _key_at(self, term_index):
+        offsets = self.term_offsets
+        return bytes(self.term_text[offsets[term_index]:offsets[term_index + 1]])
+
+    def term_at(self, term_index):
+        """
+        The term stored at a given rank
+        """
+        return self._key_at(term_index).decode('utf-8')
+
+    def _lower_bound(self, key):
+        """
+        Index of the first term >= key
+        """
+        block = bisect_right(self._block_keys, key) - 1
+        if block < 0:
+            return 0
+        lo = block * BLOCK_SIZE
+        hi = min(lo + BLOCK_SIZE, self.num_terms)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def find(self, word):
+        """
+        Binary search for a word, returns its term index or -1
+        """
+        key = word.lower().encode('utf-8')
+        term_index = self._lower_bound(key)
+        if term_index < self.num_terms and self._key_at(term_index) == key:
+            return term_index
+        return -1
+
+    def prefix_range(self, prefix):
+        """
+        (start, end) term indexes of the terms beginning with prefix
+        """
+        key = prefix.lower().encode('utf-8')
+        # 0xff never occurs in UTF-8, so key + 0xff sorts after every extension of key
+        return self._lower_bound(key), self._lower_bound(key + b'\xff')
+
+    def __iter__(self):
+        for term_index in range(self.num_terms):
+            yield self.term_at(term_index)
+
+    def __len__(self):
+        return self.num_terms
+
+
+class CompletionCache:
+    """
+    Top completions by document frequency for prefixes of a TermDictionary
+
+    Every prefix matching more than scan_limit terms gets its top
+    cache_size terms precomputed; smaller prefix ranges are ranked by
+    scanning them. A lookup therefore never looks at more than scan_limit
+    terms, however common the prefix is.
+    """
+
+    def __init__(self, terms, document_frequencies,
+                 cache_size=COMPLETION_CACHE_SIZE, scan_limit=PREFIX_SCAN_LIMIT):
+        self.terms = terms
+        self.document_frequencies = document_frequencies
+        self.cache_size = cache_size
+        self.scan_limit = scan_limit
+        self._cache = {}  # {prefix bytes: tuple of term indexes}
+        self._build()
+
+    def _top(self, start, end, limit):
+        """
+        Term indexes in [start, end) with the highest document frequency
+        Ties are broken by term order
+        """
+        document_frequencies = self.document_frequencies
+        return heapq.nsmallest(
+            limit, range(start, end), key=lambda term_index: (-document_frequencies[term_index], term_index)
+        )
+
+    def _build(self):
+        terms = self.terms
+        stack = [(b'', 0, terms.num_terms)]
+        while stack:
+            prefix, start, end = stack.pop()
+            self._cache[prefix] = tuple(self._top(start, end, self.cache_size))
+
+            # Split the range into one child range per next byte
+            depth = len(prefix)
+            position = start
+            if position < end and len(terms._key_at(position)) == depth:
+                position += 1  # The prefix itself is a term
+            while position < end:
+                next_byte = terms._key_at(position)[depth]
+                child_prefix = prefix + bytes([next_byte])
+                child_end = terms._lower_bound(prefix + bytes([next_byte + 1])) if next_byte < 0xff else end
+                if child_end - position > self.scan_limit:
+                    stack.append((child_prefix, position, child_end))
+                position = child_end
+
+    def top_completions(self, prefix, limit=COMPLETION_CACHE_SIZE):
+        """
+        Up to limit (word, document_frequency) pairs for terms starting with prefix
+        Limits above cache_size fall back to scanning the whole prefix range
+        """
+        start, end = self.terms.prefix_range(prefix)
+        if end - start <= self.scan_limit or limit > self.cache_size:
+            term_indexes = self._top(start, end, limit)
+        else:
+            term_indexes = self._cache[prefix.lower().encode('utf-8')][:limit]
+        return [(self.terms.term_at(term_index), self.document_frequencies[term_index])
+                for term_index in term_indexes]
@@ -1,21 +1,153 @@
 # src/text_processor.py
 
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.stem import PorterStemmer
-from nltk.corpus import stopwords
 import string
+from array import array
+from functools import lru_cache
+
+# NLTK is imported on first use, and its data is only downloaded when asked
+# for (TextProcessor(download=True)); without the data the bundled stop
+# words and the Treebank tokenizer are used instead.
+
+# NLTK's English stop word list, used when the stopwords corpus is not installed
+ENGLISH_STOP_WORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours
+yourself yourselves he him his himself she she's her hers herself it it's its
+itself they them their theirs themselves what which who whom this that that'll
+these those am is are was were be been being have has had having do does did
+doing a an the and but if or because as until while of at by for with about
+against between into through during before after above below to from up down in
+out on off over under again further then once here there when where why how all
+any both each few more most other some such no nor not only own same so than too
+very s t can will just don don't should should've now d ll m o re ve y ain aren
+aren't couldn couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven
+haven't isn isn't ma mightn mightn't mustn mustn't needn needn't shan shan't
+shouldn shouldn't wasn wasn't weren weren't won won't wouldn wouldn't
+""".split())
+
+
+@lru_cache(maxsize=None)
+def nltk_data_available(resource, package, download=False):
+    """
+    True if the NLTK data resource is installed locally, downloading its
+    package first if download is set; checked once per process
+    """
+    import nltk
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        pass
+    if not download or not nltk.download(package, quiet=True):
+        return False
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def load_stop_words(download=False):
+    """
+    English stop words from the NLTK corpus, or ENGLISH_STOP_WORDS without it
+    """
+    if nltk_data_available('corpora/stopwords', 'stopwords', download):
+        from nltk.corpus import stopwords
+        return frozenset(stopwords.words('english'))
+    return ENGLISH_STOP_WORDS
+
+
+@lru_cache(maxsize=None)
+def load_word_tokenizer(download=False):
+    """
+    NLTK's word_tokenize, or the Treebank word tokenizer it uses after
+    sentence splitting if the Punkt models are not installed
+    """
+    # Newer NLTK releases read punkt_tab, older ones punkt
+    for package in ('punkt_tab', 'punkt'):
+        if nltk_data_available(f'tokenizers/{package}', package, download):
+            from nltk.tokenize import word_tokenize
+            return word_tokenize
+    from nltk.tokenize import NLTKWordTokenizer
+    return NLTKWordTokenizer().tokenize
+
+# Lower-cases ASCII letters only, so character offsets stay unchanged
+ASCII_LOWERCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# preprocess_text splits words at every other character
+ASCII_LETTERS = frozenset(string.ascii_letters)
+
+# Distinct words whose stems are kept by each TextProcessor
+STEM_CACHE_SIZE = 65536
+
+# Words that NLTK's word_tokenize splits even without punctuation
+# (Treebank contractions); everything else in cleaned text splits on spaces
+CONTRACTIONS = {
+    'cannot': ['can', 'not'],
+    'gimme': ['gim', 'me'],
+    'gonna': ['gon', 'na'],
+    'gotta': ['got', 'ta'],
+    'lemme': ['lem', 'me'],
+    'wanna': ['wan', 'na'],
+}
+
+
+def fast_tokenize(cleaned_text):
+    """
+    Tokenize text produced by preprocess_text (lowercase letters and
+    single spaces), giving the same tokens as word_tokenize
+    """
+    tokens = cleaned_text.split()
+    if CONTRACTIONS.keys().isdisjoint(tokens):
+        return tokens
+    split_tokens = []
+    for token in tokens:
+        if token in CONTRACTIONS:
+            split_tokens.extend(CONTRACTIONS[token])
+        else:
+            split_tokens.append(token)
+    return split_tokens
 
-# Download required NLTK data
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('averaged_perceptron_tagger')
 
 class TextProcessor:
-    def __init__(self):
+    def __init__(self, fast_tokenizer=True, stem_cache_size=STEM_CACHE_SIZE, download=False):
+        """
+        fast_tokenizer: split cleaned text with fast_tokenize instead of
+            NLTK's word_tokenize; the tokens are the same
+        stem_cache_size: distinct words whose stems are memoised (LRU)
+        download: fetch missing NLTK data instead of using the fallbacks
+        """
+        from nltk.stem.porter import PorterStemmer
         self.stemmer = PorterStemmer()
-        self.stop_words = set(stopwords.words('english'))
+        self.stop_words = set(load_stop_words(download))
+        self.download = download
+        self.fast_tokenizer = fast_tokenizer
+        self.stem_cache_size = stem_cache_size
+        self.stem = lru_cache(maxsize=stem_cache_size)(self.stemmer.stem)
+    
+    def __getstate__(self):
+        # The stem cache cannot be pickled (e.g. for build_index workers)
+        state = self.__dict__.copy()
+        del state['stem']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.stem = lru_cache(maxsize=self.stem_cache_size)(self.stemmer.stem)
+    
+    def stem_cache_info(self):
+        """
+        Stem cache statistics: hits, misses, size and hit_rate
+        """
+        info = self.stem.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0
+        }
         
     def preprocess_text(self, text):
         """
@@ -36,7 +168,15 @@ class TextProcessor:
         """
         Tokenize text into words
         """
-        return word_tokenize(text)
+        return load_word_tokenizer(self.download)(text)
+    
+    def tokenize_cleaned(self, cleaned_text):
+        """
+        Tokenize the output of preprocess_text, using the fast path if enabled
+        """
+        if self.fast_tokenizer:
+            return fast_tokenize(cleaned_text)
+        return self.tokenize(cleaned_text)
     
     def remove_stop_words(self, tokens):
         """
@@ -48,28 +188,30 @@ class TextProcessor:
         """
         Apply stemming to tokens
         """
-        return [self.stemmer.stem(token) for token in tokens]
+        return [self.stem(token) for token in tokens]
     
-    def process_document(self, text, doc_id):
+    def _document_tokens(self, text):
         """
-        Process document and return words with their positions
-        Returns: Dictionary of {word: [positions]}
+        Cleaned, tokenized document text without stop words
         """
         # Preprocess text
         cleaned_text = self.preprocess_text(text)
         
         # Tokenize
-        tokens = self.tokenize(cleaned_text)
+        tokens = self.tokenize_cleaned(cleaned_text)
         
         # Remove stop words
-        tokens = self.remove_stop_words(tokens)
-        
-        # Create word positions dictionary
+        return self.remove_stop_words(tokens)
+    
+    def _word_positions(self, tokens):
+        """
+        Stem tokens and collect {word: [positions]}
+        """
         word_positions = {}
         
         for position, token in enumerate(tokens):
             # Stem the token
-            stemmed_token = self.stemmer.stem(token)
+            stemmed_token = self.stem(token)
             
             if stemmed_token not in word_positions:
                 word_positions[stemmed_token] = []
@@ -77,6 +219,46 @@ class TextProcessor:
         
         return word_positions
     
+    def process_document(self, text, doc_id):
+        """
+        Process document and return words with their positions
+        Returns: Dictionary of {word: [positions]}
+        """
+        return self._word_positions(self._document_tokens(text))
+    
+    def process_document_with_offsets(self, text, doc_id):
+        """
+        Process document like process_document, and also locate every
+        indexed token in the original text
+        Returns: ({word: [positions]}, token_offsets) where token_offsets is
+        an array('I') of start, end character offsets per token position
+        """
+        tokens = self._document_tokens(text)
+        return self._word_positions(tokens), self.align_tokens(text, tokens)
+    
+    def align_tokens(self, text, tokens):
+        """
+        Character offsets of cleaned tokens in the text they came from
+        Tokens are found left to right in the lower-cased text, as whole
+        runs of ASCII letters, so a token is not matched inside a longer
+        word such as a removed stop word; a token that cannot be found gets
+        an empty span at the current offset
+        """
+        lowered = text.translate(ASCII_LOWERCASE)
+        offsets = array('I')
+        cursor = 0
+        for token in tokens:
+            start = lowered.find(token, cursor)
+            while start >= 0 and ((start and lowered[start - 1] in ASCII_LETTERS)
+                                  or lowered[start + len(token):start + len(token) + 1] in ASCII_LETTERS):
+                start = lowered.find(token, start + 1)
+            if start < 0:
+                offsets.extend((cursor, cursor))
+                continue
+            cursor = start + len(token)
+            offsets.extend((start, cursor))
+        return offsets
+    
     def process_query(self, query):
         """
         Process search query
@@ -86,7 +268,7 @@ class TextProcessor:
         cleaned_query = self.preprocess_text(query)
         
         # Tokenize
-        tokens = self.tokenize(cleaned_query)
+        tokens = self.tokenize_cleaned(cleaned_query)
         
         # Remove stop words
         tokens = self.remove_stop_words(tokens)
@@ -101,5 +283,5 @@ class TextProcessor:
         Get original words (before stemming) for context
         """
         cleaned_text = self.preprocess_text(text)
-        tokens = self.tokenize(cleaned_text)
+        tokens = self.tokenize_cleaned(cleaned_text)
         return [token for token in tokens if token not in self.stop_words]
\ No newline at end of file
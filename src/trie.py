@@ -1,30 +1,102 @@
 # src/trie.py
 
+import heapq
+from array import array
+from bisect import insort
+
+from src.postings import CompactOccurrenceList, intersect_doc_ids
+from src.term_dictionary import TermDictionary, CompletionCache, COMPLETION_CACHE_SIZE
 
 
 class TrieNode:
+    __slots__ = ('children', 'is_end_of_word', 'occurrence_list_index', 'completions')
+
     def __init__(self):
         self.children = {}
         self.is_end_of_word = False
         self.occurrence_list_index = None  # Index to external occurrence list
+        self.completions = ()  # Top (-document_frequency, word) pairs in this subtree
 
 class OccurrenceList:
+    __slots__ = ('documents', '_sorted_doc_ids')
+
     def __init__(self):
         self.documents = {}  # {doc_id: [positions]}
+        self._sorted_doc_ids = None  # Cached result of doc_ids()
         
     def add_occurrence(self, doc_id, position):
-        if doc_id not in self.documents:
-            self.documents[doc_id] = []
-        self.documents[doc_id].append(position)
-        # Keep positions sorted
-        self.documents[doc_id].sort()
+        positions = self.documents.get(doc_id)
+        if positions is None:
+            self.documents[doc_id] = [position]
+            self._sorted_doc_ids = None
+        elif position >= positions[-1]:
+            # Positions usually arrive in order, so appending keeps them sorted
+            positions.append(position)
+        else:
+            insort(positions, position)
+
+    def add_positions(self, doc_id, positions):
+        """
+        Add all positions of a document at once
+        Positions are expected in ascending order, as produced by
+        TextProcessor.process_document
+        """
+        existing = self.documents.get(doc_id)
+        if existing is None:
+            self.documents[doc_id] = list(positions)
+            self._sorted_doc_ids = None
+        else:
+            existing.extend(positions)
+            existing.sort()
+
+    def remove_document(self, doc_id):
+        """
+        Drop all positions of a document
+        """
+        if self.documents.pop(doc_id, None) is not None:
+            self._sorted_doc_ids = None
+
+    def doc_ids(self):
+        """
+        Sorted document ids containing the term
+        """
+        if self._sorted_doc_ids is None:
+            self._sorted_doc_ids = sorted(self.documents)
+        return self._sorted_doc_ids
+
+    def document_frequency(self):
+        return len(self.documents)
+
+    def term_frequency(self, doc_id):
+        return len(self.documents.get(doc_id, ()))
+
+    def max_term_frequency(self):
+        return max(map(len, self.documents.values()), default=0)
+
+    def get_positions(self, doc_id):
+        """
+        Sorted positions of the term in a document
+        """
+        return self.documents.get(doc_id, [])
+
+    def __contains__(self, doc_id):
+        return doc_id in self.documents
+
+    def __len__(self):
+        return len(self.documents)
 
 class Trie:
     def __init__(self):
         self.root = TrieNode()
         self.occurrence_lists = []  # External storage for occurrence lists
+        self._completions_stale = True  # Completion caches need rebuilding
+        self.generation = 0  # Incremented whenever documents are added or removed
     
-    def insert(self, word, doc_id, position):
+    def _get_or_create_node(self, word):
+        """
+        Helper method to walk (and extend) the trie for a word
+        Returns the end-of-word node with an occurrence list attached
+        """
         node = self.root
         for char in word.lower():
             if char not in node.children:
@@ -35,9 +107,39 @@ class Trie:
             node.is_end_of_word = True
             node.occurrence_list_index = len(self.occurrence_lists)
             self.occurrence_lists.append(OccurrenceList())
-            
+        return node
+
+    def insert(self, word, doc_id, position):
+        self._completions_stale = True
+        self.generation += 1
+        node = self._get_or_create_node(word)
         self.occurrence_lists[node.occurrence_list_index].add_occurrence(doc_id, position)
 
+    def insert_document(self, doc_id, word_positions):
+        """
+        Insert all postings of a document in bulk
+        word_positions is the {word: [positions]} dictionary returned by
+        TextProcessor.process_document; each word costs a single trie walk
+        """
+        self._completions_stale = True
+        self.generation += 1
+        for word, positions in word_positions.items():
+            node = self._get_or_create_node(word)
+            self.occurrence_lists[node.occurrence_list_index].add_positions(doc_id, positions)
+
+    def delete_document(self, doc_id, words):
+        """
+        Remove the postings of a document
+        words are the terms the document was indexed under; terms left
+        without documents stay in the trie with an empty occurrence list
+        """
+        self._completions_stale = True
+        self.generation += 1
+        for word in words:
+            node = self._find_node(word)
+            if node is not None:
+                self.occurrence_lists[node.occurrence_list_index].remove_document(doc_id)
+
     def _find_node(self, word):
         """
         Helper method to find the node for a given word
@@ -73,13 +175,113 @@ class Trie:
             node = self._find_node(term)
             if not node or not node.is_end_of_word:
                 return set()  # Term not found
-            occurrences.append(
-                self.occurrence_lists[node.occurrence_list_index].documents.keys()
-            )
+            occurrences.append(self.occurrence_lists[node.occurrence_list_index])
             
         # Find intersection of all document sets
-        result = set.intersection(*map(set, occurrences))
-        return result
+        return intersect_doc_ids(occurrences)
+
+    def iter_terms(self):
+        """
+        Yield (word, occurrence_list) pairs in sorted word order
+        """
+        return self._iter_subtree(self.root, '')
+
+    def prefix_terms(self, prefix):
+        """
+        Yield (word, occurrence_list) pairs of every term starting with
+        prefix, in sorted word order
+        """
+        node = self.root
+        prefix = prefix.lower()
+        for char in prefix:
+            if char not in node.children:
+                return iter(())
+            node = node.children[char]
+        return self._iter_subtree(node, prefix)
+
+    def _iter_subtree(self, root, word):
+        """
+        Yield (word, occurrence_list) pairs of the terms below a node
+        """
+        stack = [(root, word)]
+        while stack:
+            node, prefix = stack.pop()
+            if node.is_end_of_word:
+                yield prefix, self.occurrence_lists[node.occurrence_list_index]
+            # Push in reverse so the smallest child is visited first
+            for char in sorted(node.children, reverse=True):
+                stack.append((node.children[char], prefix + char))
+
+    def _build_completion_caches(self):
+        """
+        Store the top COMPLETION_CACHE_SIZE terms (by document frequency) of
+        every subtree on its root node, in one post-order pass
+        """
+        stack = [(self.root, '', False)]
+        while stack:
+            node, prefix, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, prefix, True))
+                for char, child in node.children.items():
+                    stack.append((child, prefix + char, False))
+                continue
+
+            if not node.is_end_of_word and len(node.children) == 1:
+                # Chains share their only child's cache
+                node.completions = next(iter(node.children.values())).completions
+                continue
+            candidates = []
+            if node.is_end_of_word:
+                document_frequency = len(self.occurrence_lists[node.occurrence_list_index])
+                if document_frequency:
+                    candidates.append((-document_frequency, prefix))
+            for child in node.children.values():
+                candidates.extend(child.completions)
+            node.completions = tuple(heapq.nsmallest(COMPLETION_CACHE_SIZE, candidates))
+        self._completions_stale = False
+
+    def prefix_search(self, prefix, limit=COMPLETION_CACHE_SIZE):
+        """
+        Top completions of a prefix ranked by document frequency
+        Returns a list of (word, document_frequency) pairs; limits up to
+        COMPLETION_CACHE_SIZE are served from the per-node caches
+        """
+        if self._completions_stale:
+            self._build_completion_caches()
+
+        node = self.root
+        for char in prefix.lower():
+            if char not in node.children:
+                return []
+            node = node.children[char]
+
+        if limit <= COMPLETION_CACHE_SIZE:
+            completions = node.completions[:limit]
+        else:
+            # Larger requests walk the whole subtree
+            candidates = []
+            stack = [(node, prefix.lower())]
+            while stack:
+                current, word = stack.pop()
+                if current.is_end_of_word:
+                    document_frequency = len(self.occurrence_lists[current.occurrence_list_index])
+                    if document_frequency:
+                        candidates.append((-document_frequency, word))
+                for char, child in current.children.items():
+                    stack.append((child, word + char))
+            completions = heapq.nsmallest(limit, candidates)
+        return [(word, -negative_frequency) for negative_frequency, word in completions]
+
+    def compact(self):
+        """
+        Pack every occurrence list into a read-only CompactOccurrenceList
+        Call once indexing is finished; the lists can no longer be extended
+        """
+        self.occurrence_lists = [
+            occurrence_list if isinstance(occurrence_list, CompactOccurrenceList)
+            else CompactOccurrenceList.from_occurrence_list(occurrence_list)
+            for occurrence_list in self.occurrence_lists
+        ]
 
     def get_occurrence_list(self, word):
         """
@@ -88,4 +290,111 @@ class Trie:
         node = self._find_node(word)
         if node and node.occurrence_list_index is not None:
             return self.occurrence_lists[node.occurrence_list_index]
-        return None
\ No newline at end of file
+        return None
+
+    def freeze(self):
+        """
+        Build a read-only FrozenTrie from this trie once indexing is finished
+        Occurrence lists are compacted and reordered to match the sorted
+        terms; terms whose documents were all deleted are dropped
+        """
+        terms = []
+        occurrence_lists = []
+        for word, occurrence_list in self.iter_terms():
+            if not len(occurrence_list):
+                continue
+            if not isinstance(occurrence_list, CompactOccurrenceList):
+                occurrence_list = CompactOccurrenceList.from_occurrence_list(occurrence_list)
+            terms.append(word)
+            occurrence_lists.append(occurrence_list)
+        return FrozenTrie(TermDictionary.from_sorted_terms(terms), occurrence_lists)
+
+
+class FrozenTrie:
+    """
+    Read-only term dictionary produced by Trie.freeze
+
+    Terms live in one sorted byte buffer searched by binary search instead of
+    a tree of TrieNode objects. Supports the same lookups as Trie; the
+    occurrence list index of a term is its rank in sorted order.
+    """
+    __slots__ = ('terms', 'occurrence_lists', '_completions')
+
+    def __init__(self, terms, occurrence_lists):
+        self.terms = terms
+        self.occurrence_lists = occurrence_lists
+        self._completions = None  # CompletionCache, built on first prefix search
+
+    def insert(self, word, doc_id, position):
+        raise TypeError("FrozenTrie is read-only")
+
+    def insert_document(self, doc_id, word_positions):
+        raise TypeError("FrozenTrie is read-only")
+
+    def delete_document(self, doc_id, words):
+        raise TypeError("FrozenTrie is read-only")
+
+    def compact(self):
+        """
+        Occurrence lists of a frozen trie are already compact
+        """
+
+    def search(self, word):
+        """
+        Search for a word in the term dictionary
+        Returns (is_found, occurrence_list_index) tuple
+        """
+        term_index = self.terms.find(word)
+        if term_index >= 0:
+            return True, term_index
+        return False, None
+
+    def get_occurrence_list(self, word):
+        """
+        Get the occurrence list for a word
+        """
+        term_index = self.terms.find(word)
+        if term_index >= 0:
+            return self.occurrence_lists[term_index]
+        return None
+
+    def intersection_search(self, query_terms):
+        """
+        Find documents containing all query terms
+        """
+        if not query_terms:
+            return set()
+        occurrences = []
+        for term in query_terms:
+            occurrence_list = self.get_occurrence_list(term)
+            if occurrence_list is None:
+                return set()  # Term not found
+            occurrences.append(occurrence_list)
+        return intersect_doc_ids(occurrences)
+
+    def iter_terms(self):
+        """
+        Yield (word, occurrence_list) pairs in sorted word order
+        """
+        for term_index, word in enumerate(self.terms):
+            yield word, self.occurrence_lists[term_index]
+
+    def prefix_terms(self, prefix):
+        """
+        Yield (word, occurrence_list) pairs of every term starting with
+        prefix, in sorted word order; they are one range of term indexes
+        """
+        start, end = self.terms.prefix_range(prefix)
+        for term_index in range(start, end):
+            yield self.terms.term_at(term_index), self.occurrence_lists[term_index]
+
+    def prefix_search(self, prefix, limit=COMPLETION_CACHE_SIZE):
+        """
+        Top completions of a prefix ranked by document frequency
+        Returns a list of (word, document_frequency) pairs
+        """
+        if self._completions is None:
+            document_frequencies = array('I', (len(occurrence_list)
+                                               for occurrence_list in self.occurrence_lists))
+            self._completions = CompletionCache(self.terms, document_frequencies)
+        return self._completions.top_completions(prefix, limit)
@@ -0,0 +1,153 @@
+# src/vector_ranking.py
+
+from src.postings import CompactOccurrenceList, UnionOccurrenceList
+from src.ranking import BM25Scorer, FrequencyPositionScorer
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; SearchEngine falls back to src.ranking
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def _decode_first_positions(occurrence_list):
+    """
+    First position of the term in every document of a CompactOccurrenceList
+    Positions are delta encoded from 0, so the first varint of each document
+    is its first position. All documents are decoded together, one varint
+    byte per pass.
+    """
+    data = np.frombuffer(occurrence_list.position_data, dtype=np.uint8)
+    cursors = np.frombuffer(occurrence_list.position_offsets, dtype=np.uint32)[:-1].astype(np.int64)
+    values = np.zeros(len(cursors), dtype=np.int64)
+    pending = np.arange(len(cursors))
+    shift = 0
+    while len(pending):
+        current = data[cursors[pending]].astype(np.int64)
+        values[pending] |= (current & 0x7F) << shift
+        pending = pending[(current & 0x80) != 0]
+        cursors[pending] += 1
+        shift += 7
+    return values
+
+
+def posting_arrays(occurrence_list, with_positions=False):
+    """
+    (doc_ids, term_frequencies, first_positions) NumPy arrays aligned by document
+    first_positions is None unless with_positions is set. Compact lists are
+    wrapped without copying; other list types are converted.
+    """
+    if isinstance(occurrence_list, CompactOccurrenceList):
+        doc_ids = np.frombuffer(occurrence_list.doc_id_array, dtype=np.uint32).astype(np.int64)
+        frequencies = np.frombuffer(occurrence_list.frequency_array, dtype=np.uint32).astype(np.int64)
+        first_positions = _decode_first_positions(occurrence_list) if with_positions else None
+        return doc_ids, frequencies, first_positions
+
+    if isinstance(occurrence_list, UnionOccurrenceList):
+        members = [posting_arrays(member, with_positions) for member in occurrence_list.occurrence_lists]
+        if not members:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, (empty if with_positions else None)
+        all_doc_ids = np.concatenate([member[0] for member in members])
+        doc_ids, inverse = np.unique(all_doc_ids, return_inverse=True)
+        frequencies = np.zeros(len(doc_ids), dtype=np.int64)
+        np.add.at(frequencies, inverse, np.concatenate([member[1] for member in members]))
+        first_positions = None
+        if with_positions:
+            first_positions = np.full(len(doc_ids), np.iinfo(np.int64).max, dtype=np.int64)
+            np.minimum.at(first_positions, inverse, np.concatenate([member[2] for member in members]))
+        return doc_ids, frequencies, first_positions
+
+    # Mutable OccurrenceList: {doc_id: [positions]}
+    documents = occurrence_list.documents
+    ordered = occurrence_list.doc_ids()
+    doc_ids = np.array(ordered, dtype=np.int64)
+    frequencies = np.array([len(documents[doc_id]) for doc_id in ordered], dtype=np.int64)
+    first_positions = None
+    if with_positions:
+        first_positions = np.array([documents[doc_id][0] for doc_id in ordered], dtype=np.int64)
+    return doc_ids, frequencies, first_positions
+
+
+class VectorRanker:
+    """
+    Scores all candidates of a query with whole-array NumPy operations
+
+    Each term's postings become aligned doc id / term frequency arrays, the
+    candidates are found by intersecting or merging those arrays, and every
+    term contributes to all candidate scores at once. Scores equal those of
+    src.ranking: contributions are added in query term order with the same
+    floating point operations, and ties are broken by ascending doc id.
+    """
+
+    def __init__(self, scorer):
+        if not HAS_NUMPY:
+            raise ImportError("VectorRanker requires NumPy")
+        if isinstance(scorer, BM25Scorer):
+            self.length_norms = np.frombuffer(scorer.length_norms, dtype=np.float64)
+        elif not isinstance(scorer, FrequencyPositionScorer):
+            raise ValueError(f"No vectorised implementation of {type(scorer).__name__}")
+        self.scorer = scorer
+
+    def _bm25_contributions(self, weight, frequencies, candidates):
+        norms = np.full(len(candidates), self.scorer.default_norm)
+        inside = candidates < len(self.length_norms)
+        norms[inside] = self.length_norms[candidates[inside]]
+        return weight * frequencies / (frequencies + norms)
+
+    def score(self, occurrence_lists, conjunctive=True, term_ids=None, candidates=None, prior=None):
+        """
+        (doc_ids, scores) arrays for every matching document, in doc id order
+        candidates, when given, are the sorted documents to score instead
+        prior, a StaticPrior, is added after the term scores
+        """
+        is_bm25 = isinstance(self.scorer, BM25Scorer)
+        postings = [posting_arrays(occurrence_list, with_positions=not is_bm25)
+                    for occurrence_list in occurrence_lists]
+        if candidates is not None:
+            candidates = np.asarray(candidates, dtype=np.int64)
+        elif conjunctive:
+            candidates = min((doc_ids for doc_ids, _, _ in postings), key=len)
+            for doc_ids, _, _ in postings:
+                candidates = np.intersect1d(candidates, doc_ids, assume_unique=True)
+        else:
+            candidates = np.unique(np.concatenate([doc_ids for doc_ids, _, _ in postings]))
+
+        if is_bm25:
+            weights = self.scorer.for_query(occurrence_lists, term_ids).weights
+
+        scores = np.zeros(len(candidates))
+        for term, (doc_ids, frequencies, first_positions) in enumerate(postings):
+            slots = np.minimum(np.searchsorted(doc_ids, candidates), max(len(doc_ids) - 1, 0))
+            found = doc_ids[slots] == candidates if len(doc_ids) else np.zeros(len(candidates), dtype=bool)
+            matched = candidates[found]
+            if is_bm25:
+                contribution = self._bm25_contributions(weights[term], frequencies[slots[found]], matched)
+            else:
+                contribution = frequencies[slots[found]] * (1 + 1.0 / (1 + first_positions[slots[found]]))
+            # Absent terms add nothing, as in the scalar scorers
+            scores[found] += contribution
+        if prior is not None and len(prior.scores):
+            prior_scores = np.frombuffer(prior.scores, dtype=np.float64)
+            inside = candidates < len(prior_scores)
+            scores[inside] += prior_scores[candidates[inside]]
+        return candidates, scores
+
+    def rank(self, occurrence_lists, k=None, conjunctive=True, term_ids=None, candidates=None, prior=None):
+        """
+        [(doc_id, score)] best first; with k set only the k best are ordered,
+        after argpartition has discarded the rest
+        """
+        if (not occurrence_lists and candidates is None) or (k is not None and k <= 0):
+            return []
+        doc_ids, scores = self.score(occurrence_lists, conjunctive, term_ids, candidates, prior)
+        if k is not None and k < len(scores):
+            # Keep every document tying the k-th score so ties resolve by doc id
+            kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            keep = np.flatnonzero(scores >= kth_score)
+            doc_ids, scores = doc_ids[keep], scores[keep]
+        order = np.lexsort((doc_ids, -scores))
+        if k is not None:
+            order = order[:k]
+        return list(zip(doc_ids[order].tolist(), scores[order].tolist()))
@@ -0,0 +1,44 @@
+# tests/helpers.py
+
+from array import array
+
+
+class WhitespaceProcessor:
+    """
+    Lower-cases and splits on whitespace, a stand-in for TextProcessor
+    stop_words are dropped from queries and documents; positions are
+    counted after they are removed
+    """
+
+    def __init__(self, stop_words=()):
+        self.stop_words = frozenset(stop_words)
+
+    def preprocess_text(self, text):
+        return text.lower().strip()
+
+    def process_query(self, query):
+        return [token for token in query.lower().split() if token not in self.stop_words]
+
+    def process_document(self, text, doc_id):
+        word_positions = {}
+        for position, token in enumerate(self.process_query(text)):
+            word_positions.setdefault(token, []).append(position)
+        return word_positions
+
+
+class OffsetsWhitespaceProcessor(WhitespaceProcessor):
+    """
+    WhitespaceProcessor that also records the character offsets of every
+    token, as TextProcessor.process_document_with_offsets does
+    """
+
+    def process_document_with_offsets(self, text, doc_id):
+        lowered = text.lower()
+        offsets = array('I')
+        cursor = 0
+        tokens = self.process_query(text)
+        for token in tokens:
+            start = lowered.index(token, cursor)
+            cursor = start + len(token)
+            offsets.extend((start, cursor))
+        return self.process_document(text, doc_id), offsets
@@ -0,0 +1,42 @@
+# tests/test_benchmark_suite.py
+
+import sys
+import os
+import json
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import generate_documents, latency_summary
+from benchmarks.suite import run_suite, compare_results, flatten_metrics
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_01_deterministic_corpus(self):
+        """The synthetic corpus and the latency summary are reproducible"""
+        self.assertEqual(generate_documents(20, 30, seed=4), generate_documents(20, 30, seed=4))
+        self.assertNotEqual(generate_documents(20, 30, seed=4), generate_documents(20, 30, seed=5))
+        summary = latency_summary([0.001 * n for n in range(1, 101)])
+        self.assertAlmostEqual(summary['p50_ms'], 50.0)
+        self.assertAlmostEqual(summary['p99_ms'], 99.0)
+        self.assertAlmostEqual(summary['max_ms'], 100.0)
+
+    def test_02_run_and_compare(self):
+        """A small run covers every section, is valid JSON and compares with itself"""
+        results = run_suite(num_documents=50, document_length=40, vocabulary_size=300, num_queries=10)
+        self.assertEqual(json.loads(json.dumps(results)), results)
+        self.assertEqual(set(results['queries']),
+                         {f"{name}_{ranking}_top10" for name in ['single_term', 'two_term', 'three_term']
+                          for ranking in ['frequency', 'bm25']})
+        self.assertEqual(results['snippets']['count'], 10)
+        self.assertGreater(results['indexing']['tokens_per_sec'], 0)
+        self.assertLess(results['memory']['frozen_trie_bytes'], results['memory']['trie_bytes'])
+
+        changes = list(compare_results(results, results))
+        self.assertTrue(changes)
+        self.assertTrue(all(change == 0 for _, _, _, change in changes))
+        self.assertNotIn('parameters.seed', flatten_metrics(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,237 @@
+# tests/test_crawler.py
+
+import sys
+import os
+import contextlib
+import io
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.crawler import WebCrawler, TokenBucket
+from src.http_cache import HttpCache
+from src.pipeline import IndexingPipeline
+from tests.helpers import WhitespaceProcessor
+
+# Canned Wikipedia-like pages: {path: (title, paragraph, linked paths)}
+PAGES = {
+    '/wiki/Start': ('Start', 'The start page about algorithms.', ['/wiki/Alpha', '/wiki/Beta', '/wiki/File:Logo.png']),
+    '/wiki/Alpha': ('Alpha', 'Alpha covers data structures.', ['/wiki/Gamma', '/wiki/Start']),
+    '/wiki/Beta': ('Beta', 'Beta covers databases.', ['/wiki/Missing']),
+    '/wiki/Gamma': ('Gamma', 'Gamma is two links away.', ['/wiki/Flaky']),
+    '/wiki/Flaky': ('Flaky', 'Flaky fails once before it works.', []),
+}
+
+
+def render_page(title, paragraph, links):
+    anchors = ''.join(f'<a href="{link}">{link}</a> ' for link in links)
+    return (f'<html><body><h1 id="firstHeading">{title}</h1>'
+            f'<div id="mw-content-text"><p>{paragraph}<sup>[1]</sup></p><p>{anchors}</p></div>'
+            f'</body></html>').encode('utf-8')
+
+
+# Last-Modified of version 1 of a page; later versions add a day each
+LAST_MODIFIED = 'Wed, 0{} Oct 2026 07:28:00 GMT'
+
+
+class WikiStandIn(BaseHTTPRequestHandler):
+    """
+    Serves PAGES; /wiki/Flaky answers 503 on its first request and
+    /wiki/Throttled always answers 429, asking to come back in a day
+    Pages carry an ETag and Last-Modified (/wiki/Beta only Last-Modified)
+    and conditional requests for an unchanged version are answered 304.
+    Bumping server.versions[path] changes a page.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            if 'If-None-Match' in self.headers or 'If-Modified-Since' in self.headers:
+                server.conditional.append(self.path)
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            hits = server.hits[self.path]
+        if self.path == '/wiki/Flaky' and hits == 1:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        if self.path == '/wiki/Throttled':
+            self.send_response(429)
+            self.send_header('Retry-After', '86400')
+            self.end_headers()
+            return
+        if self.path not in PAGES:
+            self.send_response(404)
+            self.end_headers()
+            return
+        version = server.versions.get(self.path, 1)
+        etag = None if self.path == '/wiki/Beta' else f'"v{version}"'
+        last_modified = LAST_MODIFIED.format(version)
+        if etag is not None and self.headers.get('If-None-Match') == etag or \
+                etag is None and self.headers.get('If-Modified-Since') == last_modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+        title, paragraph, links = PAGES[self.path]
+        if version > 1:
+            paragraph += f" Revised {version} times."
+        body = render_page(title, paragraph, links)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestCrawler(unittest.TestCase):
+    def setUp(self):
+        """Start a local HTTP server serving the canned pages"""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), WikiStandIn)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.hits = {}
+        self.server.versions = {}
+        self.server.conditional = []
+        self.cache_dir = tempfile.mkdtemp()
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.cache_dir)
+
+    def _crawler(self, **options):
+        options.setdefault('requests_per_second', 0)
+        options.setdefault('backoff', 0)
+        return WebCrawler(base_url=self.base_url, **options)
+
+    def test_01_start_pages_only(self):
+        """Without a depth only the start URLs are fetched, in order"""
+        crawler = self._crawler()
+        documents = crawler.crawl_wikipedia_pages([self.base_url + '/wiki/Start', self.base_url + '/wiki/Beta'])
+        self.assertEqual([documents[doc_id]['title'] for doc_id in sorted(documents)], ['Start', 'Beta'])
+        start = documents[1]
+        self.assertEqual(start['url'], self.base_url + '/wiki/Start')
+        self.assertIn(self.base_url + '/wiki/Alpha', start['links'])
+        self.assertTrue(start['content'].startswith('The start page about algorithms.'))
+        self.assertNotIn('[1]', start['content'])
+
+    def test_02_follows_links_to_max_depth(self):
+        """The frontier follows article links breadth first up to max_depth"""
+        crawler = self._crawler(max_workers=4)
+        documents = crawler.crawl_wikipedia_pages([self.base_url + '/wiki/Start'], max_pages=50, max_depth=2)
+        titles = {document['title'] for document in documents.values()}
+        self.assertEqual(titles, {'Start', 'Alpha', 'Beta', 'Gamma'})
+        self.assertEqual(documents[1]['title'], 'Start')
+        # Namespaced links are not followed and no page is fetched twice
+        self.assertNotIn('/wiki/File:Logo.png', self.server.requests)
+        self.assertEqual(len(self.server.requests), len(set(self.server.requests)))
+
+    def test_03_max_pages_and_retries(self):
+        """Crawling stops at max_pages; a 503 is retried"""
+        crawler = self._crawler(max_workers=1)
+        documents = crawler.crawl_wikipedia_pages([self.base_url + '/wiki/Start'], max_pages=2, max_depth=5)
+        self.assertEqual([document['title'] for document in documents.values()], ['Start', 'Alpha'])
+
+        crawler = self._crawler()
+        documents = crawler.crawl_wikipedia_pages([self.base_url + '/wiki/Flaky'])
+        self.assertEqual(documents[1]['title'], 'Flaky')
+        self.assertEqual(self.server.hits['/wiki/Flaky'], 2)
+
+        crawler = self._crawler(max_retries=0)
+        self.assertEqual(crawler.crawl_wikipedia_pages([self.base_url + '/wiki/Missing']), {})
+
+    def test_04_token_bucket(self):
+        """The bucket allows a burst, then one request per 1 / rate seconds"""
+        now = [0.0]
+        waits = []
+
+        def sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            bucket.acquire()
+        self.assertEqual(waits, [0.5, 0.5])
+        now[0] += 10
+        waits.clear()
+        for _ in range(2):
+            bucket.acquire()
+        self.assertEqual(waits, [])
+
+    def test_05_conditional_recrawl(self):
+        """A re-crawl revalidates cached pages and downloads only changed ones"""
+        start_urls = [self.base_url + '/wiki/Start', self.base_url + '/wiki/Beta']
+        first = self._crawler(cache=HttpCache(self.cache_dir)).crawl_wikipedia_pages(start_urls)
+        self.assertEqual(self.server.conditional, [])
+
+        # A new crawler over the same cache directory, as on the next day
+        cache = HttpCache(self.cache_dir)
+        crawler = self._crawler(cache=cache)
+        second = crawler.crawl_wikipedia_pages(start_urls, max_pages=3, max_depth=1)
+        self.assertEqual(sorted(self.server.conditional), ['/wiki/Beta', '/wiki/Start'])
+        for doc_id in [1, 2]:
+            self.assertTrue(second[doc_id].pop('not_modified'))
+            self.assertEqual(second[doc_id], first[doc_id])
+        # Links of an unchanged page still feed the frontier
+        self.assertEqual(second[3]['title'], 'Alpha')
+        stats = cache.stats()
+        self.assertEqual((stats['not_modified'], stats['downloaded']), (2, 1))
+        self.assertEqual(stats['bytes_saved'],
+                         sum(len(render_page(*PAGES[path])) for path in ['/wiki/Start', '/wiki/Beta']))
+
+        self.server.versions['/wiki/Beta'] = 2
+        third = crawler.crawl_wikipedia_pages(start_urls)
+        self.assertTrue(third[1]['not_modified'])
+        self.assertNotIn('not_modified', third[2])
+        self.assertIn('Revised 2 times', third[2]['content'])
+
+    def test_06_pipeline_skips_unchanged_pages(self):
+        """Running the pipeline again re-indexes only the pages that changed"""
+        crawler = self._crawler(cache=HttpCache(self.cache_dir))
+        pipeline = IndexingPipeline(crawler, Indexer(Trie()), WhitespaceProcessor())
+        start_urls = [self.base_url + '/wiki/Start']
+        with contextlib.redirect_stdout(io.StringIO()):
+            documents = pipeline.run(start_urls, max_pages=3, max_depth=1)
+            doc_ids = {document['title']: doc_id for doc_id, document in documents.items()}
+            self.server.versions['/wiki/Alpha'] = 2
+            pipeline.run(start_urls, max_pages=3, max_depth=1)
+        self.assertEqual(pipeline.unchanged_pages, 2)
+        self.assertEqual({document['title']: doc_id for doc_id, document in documents.items()}, doc_ids)
+        self.assertEqual(pipeline.indexer.total_documents, 3)
+        self.assertEqual([doc_id for doc_id, _ in pipeline.search('revised')], [doc_ids['Alpha']])
+
+    def test_07_retry_after_is_capped(self):
+        """A Retry-After beyond max_backoff is not waited for; backoff stops growing at the cap"""
+        crawler = self._crawler(max_backoff=5)
+        start = time.perf_counter()
+        with self.assertRaises(requests.HTTPError):
+            crawler.fetch(self.base_url + '/wiki/Throttled')
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(self.server.hits['/wiki/Throttled'], 1)
+
+        crawler = self._crawler(backoff=1, max_backoff=5)
+        self.assertEqual([crawler._retry_delay(attempt) for attempt in range(5)], [1, 2, 4, 5, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_document_store.py
+
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.searcher import SearchEngine
+from src.crawler import mark_internal_links
+from src.document_store import DocumentStore
+from tests.helpers import WhitespaceProcessor
+
+
+DOCUMENTS = {
+    1: {'title': 'Tries', 'url': 'https://example.org/wiki/Trie', 'links': {'https://example.org/wiki/Heap'},
+        'content': 'A trie is a search tree über strings ' * 20},
+    2: {'title': 'Heaps', 'url': 'https://example.org/wiki/Heap', 'links': set(),
+        'content': 'A heap is a tree with the heap property'},
+    5: {'title': 'Sorting', 'url': 'https://example.org/wiki/Sort', 'content': 'Sorting puts items in order',
+        'links': {'https://example.org/wiki/Heap', 'https://example.org/wiki/Trie',
+                  'https://example.org/wiki/Merge_sort'}},
+}
+
+
+class TestDocumentStore(unittest.TestCase):
+    def test_01_round_trip(self):
+        """Documents read back as stored; content is compressed and fields decode alone"""
+        store = DocumentStore(DOCUMENTS)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(list(store), [1, 2, 5])
+        self.assertEqual(dict(store.items()), DOCUMENTS)
+        self.assertNotIn(3, store)
+        self.assertNotIn('1', store)
+        self.assertEqual(store.get_field(1, 'title'), 'Tries')
+        self.assertEqual(store.get_field(5, 'url'), 'https://example.org/wiki/Sort')
+        self.assertLess(store.stats()['compressed_content_bytes'], len(DOCUMENTS[1]['content']))
+        # Links resolve to stored documents; Merge_sort was not crawled
+        self.assertEqual(store.linked_doc_ids(5), [1, 2])
+        self.assertEqual(store.stats()['urls'], 4)
+
+        mark_internal_links(store)
+        self.assertTrue(store[1]['has_internal_links'])
+        self.assertFalse(store[2]['has_internal_links'])
+
+    def test_02_replace_delete_compact(self):
+        """Replaced and deleted documents disappear, and compact drops their data"""
+        store = DocumentStore(DOCUMENTS)
+        store[2] = dict(DOCUMENTS[2], title='Binary heaps')
+        del store[1]
+        self.assertEqual(list(store), [2, 5])
+        self.assertEqual(store[2]['title'], 'Binary heaps')
+        self.assertEqual(store.linked_doc_ids(5), [2])
+        with self.assertRaises(KeyError):
+            store.get_field(1, 'content')
+        self.assertEqual(store.stats()['slots'], 4)
+
+        before = store.stats()['compressed_content_bytes']
+        store.compact()
+        self.assertEqual(store.stats()['slots'], 2)
+        self.assertLess(store.stats()['compressed_content_bytes'], before)
+        self.assertEqual(store[2]['content'], DOCUMENTS[2]['content'])
+        self.assertEqual(store.linked_doc_ids(5), [2])
+
+    def test_03_search_engine_over_store(self):
+        """SearchEngine returns the same titles, URLs and snippets from a store"""
+        processor = WhitespaceProcessor()
+        indexer = Indexer(Trie())
+        indexer.build_index(DOCUMENTS, processor)
+        engines = [SearchEngine(indexer.trie, documents, indexer=indexer, processor=processor)
+                   for documents in [DOCUMENTS, DocumentStore(DOCUMENTS)]]
+        for query in ['tree', 'heap property', 'sorting']:
+            results = [engine.search(query) for engine in engines]
+            self.assertEqual(results[0], results[1])
+            for doc_id, _ in results[0]:
+                self.assertEqual(*[(engine.get_document_title(doc_id), engine.get_document_url(doc_id),
+                                    engine.get_snippet(doc_id, [query.split()[0]]))
+                                   for engine in engines])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_html_extractor.py
+
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crawler import WebCrawler
+from src.html_extractor import extract_wikipedia_page
+
+BASE_URL = 'https://en.wikipedia.org'
+
+ARTICLE = """<!DOCTYPE html>
+<html><head><title>Trie - Wikipedia</title>
+<script>var p = "<p>not text</p>";</script><style>p { color: red }</style></head>
+<body>
+<h1 id="firstHeading" class="firstHeading"><span>Tr&iuml;e</span> &amp; friends</h1>
+<div id="mw-content-text" class="mw-body-content">
+<table class="infobox"><tr><td><p>Infobox paragraph</p></td></tr></table>
+<p>A <b>trie</b> is a <a href="/wiki/Tree_(data_structure)">search tree</a><sup id="cite_ref-1">[1]</sup>
+used for <a href="/wiki/String_(computer_science)#Definition">strings</a>.[2]</p>
+<p>Entities: &lt;tag&gt; &#233;&#x20AC;&#150; &nbsp;&copy;; bare &amp and &unknown;.</p>
+<p>Nested <p>paragraphs</p> and a<br>break<br/>and <img src="x.png" alt="i">image.</p>
+<!-- <p>a commented paragraph</p> -->
+<p><![CDATA[cdata text]]> with a <script>hidden()</script>script</p>
+<pre>  keeps   spacing  </pre>
+<p>   </p>
+<p>External <a href="https://example.org/wiki/Other">link</a> and <a href="/w/index.php">edit</a>
+<a name="anchor">no href</a> <a href="/wiki/Heap">heap</a></p>
+</div>
+<p>Outside the content</p>
+</body></html>
+"""
+
+
+class TestHtmlExtractor(unittest.TestCase):
+    def setUp(self):
+        self.crawler = WebCrawler(BASE_URL, extractor='soup')
+
+    def assertSameAsSoup(self, markup):
+        expected = self.crawler.extract_page(markup, 'https://en.wikipedia.org/wiki/Trie')
+        actual = extract_wikipedia_page(markup, 'https://en.wikipedia.org/wiki/Trie', BASE_URL)
+        self.assertEqual(actual, expected)
+        return actual
+
+    def test_01_article_matches_beautifulsoup(self):
+        """The streaming extractor gives the BeautifulSoup extraction of a page"""
+        page = self.assertSameAsSoup(ARTICLE)
+        self.assertEqual(page['title'], 'Trïe & friends')
+        self.assertIn('A trie is a search tree used for strings.', page['content'])
+        self.assertIn('é€–', page['content'])
+        self.assertIn('cdata text with a script', page['content'])
+        for text in ['Infobox', 'hidden', 'commented', 'Outside', '[1]', '[2]']:
+            self.assertNotIn(text, page['content'])
+        self.assertEqual(page['links'], {
+            'https://en.wikipedia.org/wiki/Tree_(data_structure)',
+            'https://en.wikipedia.org/wiki/String_(computer_science)#Definition',
+            'https://en.wikipedia.org/wiki/Heap',
+        })
+
+        # Also as bytes, as fetched
+        self.assertEqual(extract_wikipedia_page(ARTICLE.encode('utf-8'), page['url'], BASE_URL), page)
+
+    def test_02_malformed_markup(self):
+        """Unclosed, stray and misnested tags nest as in BeautifulSoup's tree"""
+        fragments = [
+            '<p>unclosed <b>bold <i>italic</p> after</div>',
+            '</p><p>stray end tags</span></a> kept</p>',
+            '<p>misnested <b>bold <i>both</b> italic?</i> end</p>',
+            '<p>table <table><tr><td>cell</p> still in table</td></tr></table> after</p>',
+            '<p>void end tags</br></img> kept</p><p>and &#0; &#xD800; &#x110000; &#x80;</p>',
+            '<p><sup>1</sup>sup <sup>nested <sup>sups</sup></sup> gone</p>',
+            '<textarea>  a   b  </textarea><p> <span> </span> </p>',
+        ]
+        for fragment in fragments:
+            markup = f'<h1 id="firstHeading">Title</h1><div id="mw-content-text">{fragment}</div>'
+            with self.subTest(fragment=fragment):
+                self.assertSameAsSoup(markup)
+
+    def test_03_missing_elements(self):
+        """Pages without main content give None and pages without a title raise"""
+        self.assertIsNone(self.assertSameAsSoup('<h1 id="firstHeading">Title</h1><p>no content</p>'))
+        with self.assertRaises(ValueError):
+            extract_wikipedia_page('<div id="mw-content-text"><p>text</p></div>', 'u', BASE_URL)
+        with self.assertRaises(ValueError):
+            WebCrawler(BASE_URL, extractor='lxml')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# tests/test_index_file.py
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+from array import array
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.index_file import write_index, MappedIndex
+from src.ranking import BM25Scorer, inverse_document_frequency, rank_all
+
+
+class TestIndexFile(unittest.TestCase):
+    def setUp(self):
+        """Write a small index to a temporary file"""
+        self.documents = {
+            1: {'title': 'Data', 'url': 'https://example.org/wiki/Data',
+                'content': 'data structur algorithm data', 'links': {'https://example.org/wiki/A'}},
+            2: {'title': 'Python', 'url': 'https://example.org/wiki/Python',
+                'content': 'python data', 'links': set()},
+            7: {'title': 'Café', 'url': 'https://example.org/wiki/Caf%C3%A9',
+                'content': 'python python algorithm', 'links': {'x', 'y'}},
+        }
+        self.trie = Trie()
+        self.trie.insert_document(1, {'data': [0, 3], 'structur': [1], 'algorithm': [2]})
+        self.trie.insert_document(2, {'python': [0], 'data': [1]})
+        self.trie.insert_document(7, {'python': [0, 1, 300], 'algorithm': [2]})
+
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'index.bin')
+        self.token_offsets = {1: array('I', [0, 4, 5, 13, 14, 23, 24, 28]), 2: array('I', [0, 6, 7, 11])}
+        write_index(self.path, self.trie, self.documents, {'total_documents': 3}, self.token_offsets)
+        self.index = MappedIndex(self.path)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def test_01_postings_round_trip(self):
+        """Mapped postings match the in-memory trie"""
+        self.assertEqual(self.index.num_terms, 4)
+        for word, occurrence_list in self.trie.iter_terms():
+            mapped = self.index.get_occurrence_list(word)
+            self.assertEqual(dict(mapped.documents), occurrence_list.documents)
+            self.assertTrue(self.index.search(word)[0])
+        self.assertEqual(self.index.search('missing'), (False, None))
+        self.assertIsNone(self.index.get_occurrence_list('zzz'))
+        self.assertEqual(self.index.intersection_search(['python', 'algorithm']), {7})
+        self.assertEqual(self.index.intersection_search(['python', 'missing']), set())
+
+    def test_02_document_store(self):
+        """Documents and statistics are read back unchanged"""
+        self.assertEqual(self.index.index_stats['total_documents'], 3)
+        self.assertAlmostEqual(self.index.index_stats['average_document_length'], 10 / 3)
+        self.assertEqual(sorted(self.index.documents), [1, 2, 7])
+        for doc_id, document in self.documents.items():
+            self.assertEqual(self.index.documents[doc_id], document)
+        self.assertNotIn(3, self.index.documents)
+
+    def test_03_bm25_statistics(self):
+        """Document lengths and IDF are stored for BM25 ranking"""
+        self.assertEqual(list(self.index.document_lengths), [0, 4, 2, 0, 0, 0, 0, 4])
+        for term_id, (word, occurrence_list) in enumerate(self.index.iter_terms()):
+            self.assertAlmostEqual(self.index.term_idf[term_id],
+                                   inverse_document_frequency(3, len(occurrence_list)))
+        lists = [self.index.get_occurrence_list('python')]
+        ranked = rank_all(lists[0].doc_ids(), lists, BM25Scorer(self.index), [self.index.search('python')[1]])
+        self.assertEqual([doc_id for doc_id, _ in ranked], [7, 2])
+
+    def test_04_token_offsets(self):
+        """Token offsets for snippets are stored per document"""
+        for doc_id, offsets in self.token_offsets.items():
+            self.assertEqual(list(self.index.get_token_offsets(doc_id)), list(offsets))
+        self.assertIsNone(self.index.get_token_offsets(7))
+        self.assertIsNone(self.index.get_token_offsets(3))
+
+    def test_05_rejects_foreign_files(self):
+        """Opening a file that is not an index fails clearly"""
+        path = os.path.join(self.directory, 'other.bin')
+        with open(path, 'wb') as f:
+            f.write(b'\x00' * 512)
+        with self.assertRaises(ValueError):
+            MappedIndex(path)
+
+    def test_06_skips_emptied_terms(self):
+        """Terms left without documents by deletions are not written"""
+        self.trie.delete_document(2, ['python', 'data'])
+        self.trie.delete_document(7, ['python', 'algorithm'])
+        documents = {1: self.documents[1]}
+        path = os.path.join(self.directory, 'deleted.bin')
+        write_index(path, self.trie, documents)
+        with MappedIndex(path) as index:
+            self.assertEqual(index.num_terms, 3)
+            self.assertEqual(index.search('python'), (False, None))
+            self.assertEqual([word for word, _ in index.prefix_search('p')], [])
+            self.assertEqual([word for word, _ in index.iter_terms()], ['algorithm', 'data', 'structur'])
+
+
+if __name__ == "__main__":
+    unittest.main()
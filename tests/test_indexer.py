@@ -0,0 +1,75 @@
+# tests/test_indexer.py
+
+import sys
+import os
+import contextlib
+import io
+import unittest
+from array import array
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from tests.helpers import OffsetsWhitespaceProcessor
+
+
+WORDS = ['index', 'trie', 'search', 'query', 'rank', 'stem', 'token', 'page']
+
+DOCUMENTS = {
+    doc_id: {
+        'title': f"Document {doc_id}",
+        'content': ' '.join(WORDS[(doc_id * position) % len(WORDS)] for position in range(doc_id % 7 + 3)),
+        'url': f"https://example.org/{doc_id}",
+        'links': set()
+    }
+    for doc_id in range(1, 41)
+}
+
+
+def build(workers):
+    indexer = Indexer(Trie())
+    with contextlib.redirect_stdout(io.StringIO()):
+        indexer.build_index(DOCUMENTS, OffsetsWhitespaceProcessor(), workers=workers)
+    return indexer
+
+
+class TestIndexer(unittest.TestCase):
+    def test_01_parallel_build_matches_serial(self):
+        """Worker processes produce exactly the index of a serial build"""
+        serial = build(workers=1)
+        parallel = build(workers=2)
+        self.assertEqual(parallel.index_stats, serial.index_stats)
+        self.assertEqual(parallel.document_lengths, serial.document_lengths)
+        self.assertEqual(parallel.term_idf, serial.term_idf)
+        self.assertEqual(parallel.token_offsets, serial.token_offsets)
+        self.assertEqual(parallel.document_vectors, serial.document_vectors)
+        for word in WORDS:
+            self.assertEqual(parallel.trie.search(word), serial.trie.search(word))
+            self.assertEqual(parallel.trie.get_occurrence_list(word).documents,
+                             serial.trie.get_occurrence_list(word).documents)
+
+    def test_02_frozen_index_rejects_changes(self):
+        """Adding or deleting after freeze raises and leaves the indexer unchanged"""
+        indexer = build(workers=1)
+        indexer.freeze()
+        stats = dict(indexer.index_stats)
+        vectors = dict(indexer.document_vectors)
+        lengths = array('I', indexer.document_lengths)
+        offsets = dict(indexer.token_offsets)
+        doc_id = next(iter(DOCUMENTS))
+        with self.assertRaises(TypeError):
+            indexer.delete_document(doc_id)
+        with self.assertRaises(TypeError):
+            indexer.add_document(999, {'content': 'index page'}, OffsetsWhitespaceProcessor())
+        with self.assertRaises(TypeError):
+            indexer.update_document(doc_id, {'content': 'index page'}, OffsetsWhitespaceProcessor())
+        self.assertEqual(indexer.index_stats, stats)
+        self.assertEqual(indexer.document_vectors, vectors)
+        self.assertEqual(indexer.document_lengths, lengths)
+        self.assertEqual(indexer.token_offsets, offsets)
+        self.assertIn(doc_id, indexer.trie.get_occurrence_list(next(iter(vectors[doc_id]))))
+
+
+if __name__ == "__main__":
+    unittest.main()
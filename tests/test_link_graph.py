@@ -0,0 +1,121 @@
+# tests/test_link_graph.py
+
+import sys
+import os
+import random
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.searcher import SearchEngine
+from src.index_file import MappedIndex
+from src.document_store import DocumentStore
+from src.link_graph import build_link_graph, pagerank, _pagerank_python
+from tests.helpers import WhitespaceProcessor
+
+
+def wiki(name):
+    return f"https://example.org/wiki/{name}"
+
+
+# Hub is linked from every other page; Orphan links out but nothing links to it
+DOCUMENTS = {
+    1: {'title': 'Hub', 'url': wiki('Hub'), 'content': 'graph theory basics',
+        'links': {wiki('Leaf'), wiki('Hub')}},
+    2: {'title': 'Leaf', 'url': wiki('Leaf'), 'content': 'graph theory details',
+        'links': {wiki('Hub'), wiki('Elsewhere')}},
+    4: {'title': 'Orphan', 'url': wiki('Orphan'), 'content': 'graph theory graph notes',
+        'links': {wiki('Hub'), wiki('Leaf')}},
+    6: {'title': 'Dead end', 'url': wiki('Dead_end'), 'content': 'graph theory trivia',
+        'links': {wiki('Hub')}},
+    7: {'title': 'Sink', 'url': wiki('Sink'), 'content': 'unrelated text', 'links': set()},
+}
+
+
+def dense_pagerank(graph, damping=0.85, iterations=200):
+    """PageRank by the textbook definition, node by node"""
+    count = graph.num_nodes
+    ranks = [1.0 / count] * count
+    for _ in range(iterations):
+        dangling = sum(ranks[node] for node in range(count) if not graph.out_degree(node))
+        new_ranks = []
+        for node in range(count):
+            incoming = sum(ranks[source] / graph.out_degree(source) for source in range(count)
+                           if node in graph.targets[graph.offsets[source]:graph.offsets[source + 1]])
+            new_ranks.append((1 - damping) / count + damping * (incoming + dangling / count))
+        ranks = new_ranks
+    return ranks
+
+
+class TestLinkGraph(unittest.TestCase):
+    def test_01_graph_and_pagerank(self):
+        """The graph keeps links between stored pages; PageRank matches its definition"""
+        graph = build_link_graph(DOCUMENTS)
+        self.assertEqual(list(graph.doc_ids), [1, 2, 4, 6, 7])
+        # Self-links and links outside the collection are dropped
+        self.assertEqual([list(graph.targets[graph.offsets[node]:graph.offsets[node + 1]])
+                          for node in range(graph.num_nodes)], [[1], [0], [0, 1], [0], []])
+
+        # The document store resolves links through its URL table to the same graph
+        store_graph = build_link_graph(DocumentStore(DOCUMENTS))
+        self.assertEqual(store_graph.doc_ids, graph.doc_ids)
+        self.assertEqual(store_graph.offsets, graph.offsets)
+        self.assertEqual(store_graph.targets, graph.targets)
+
+        scores = pagerank(graph, tolerance=1e-12)
+        self.assertEqual(len(scores), 8)
+        self.assertEqual([scores[doc_id] for doc_id in [0, 3, 5]], [0, 0, 0])
+        self.assertAlmostEqual(sum(scores), 1.0)
+        for doc_id, expected in zip(graph.doc_ids, dense_pagerank(graph)):
+            self.assertAlmostEqual(scores[doc_id], expected)
+        self.assertEqual(max(graph.doc_ids, key=lambda doc_id: scores[doc_id]), 1)
+        self.assertEqual(len(pagerank(build_link_graph({}))), 0)
+
+    def test_02_python_and_numpy_agree(self):
+        """Both iterations give the same ranks on a larger random graph, in any chunk size"""
+        rng = random.Random(5)
+        documents = {doc_id: {'url': wiki(doc_id),
+                              'links': {wiki(rng.randrange(1, 400)) for _ in range(rng.randrange(0, 12))}}
+                     for doc_id in range(1, 400)}
+        graph = build_link_graph(documents)
+        self.assertGreater(graph.num_edges, 1000)
+        expected = _pagerank_python(graph, 0.85, 1e-12, 200)
+        for edge_chunk in [37, graph.num_edges, 1 << 22]:
+            scores = pagerank(graph, tolerance=1e-12, max_iterations=200, edge_chunk=edge_chunk)
+            for node, doc_id in enumerate(graph.doc_ids):
+                self.assertAlmostEqual(scores[doc_id], expected[node], places=12)
+
+    def test_03_static_scores_in_ranking(self):
+        """static_weight lifts well linked pages, in memory and from an index file"""
+        indexer = Indexer(Trie())
+        indexer.build_index(DOCUMENTS, WhitespaceProcessor())
+        frozen = indexer.freeze()
+        plain = SearchEngine(frozen, DOCUMENTS, indexer=indexer, processor=WhitespaceProcessor())
+        plain_results = dict(plain.search('graph theory'))
+        # The orphan page mentions the query most, but nothing links to it
+        self.assertEqual(plain.search('graph theory', k=1)[0][0], 4)
+
+        engine = SearchEngine(frozen, DOCUMENTS, indexer=indexer, processor=WhitespaceProcessor(),
+                              static_weight=3.0)
+        results = engine.search('graph theory')
+        # Hub and the Leaf it links to now rank above it
+        self.assertEqual([doc_id for doc_id, _ in results], [1, 2, 4, 6])
+        self.assertAlmostEqual(results[0][1] - plain_results[1], 3.0)
+        self.assertEqual(engine.search('graph theory', k=2), results[:2])
+        self.assertEqual(engine.search('graph AND theory', k=2), results[:2])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.bin')
+            indexer.save_binary_index(path, DOCUMENTS)
+            with MappedIndex(path) as index:
+                self.assertEqual(list(index.static_scores), list(indexer.static_scores))
+                mapped = SearchEngine(index, index.documents, indexer=index,
+                                      processor=WhitespaceProcessor(), static_weight=3.0)
+                self.assertEqual(mapped.search('graph theory'), results)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+# tests/test_near_duplicates.py
+
+import sys
+import os
+import random
+import tempfile
+import unittest
+from array import array
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.searcher import SearchEngine
+from src.index_file import MappedIndex
+from src.link_graph import build_link_graph, pagerank
+from src.near_duplicates import (
+    MinHasher, DuplicateDetector, shingle_hashes, estimated_similarity, _MERSENNE_PRIME, _MAX_HASH
+)
+from tests.helpers import WhitespaceProcessor
+
+
+def random_text(rng, length):
+    return ' '.join(f"w{rng.randrange(3000)}" for _ in range(length))
+
+
+def edit(rng, text, changes):
+    """Replace a few words of a text"""
+    words = text.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = f"edit{rng.randrange(1000)}"
+    return ' '.join(words)
+
+
+class TestNearDuplicates(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Documents with exact copies, lightly edited copies and unrelated pages"""
+        rng = random.Random(11)
+        cls.documents = {}
+        for doc_id in range(1, 41):
+            cls.documents[doc_id] = {'title': f"Page {doc_id}", 'url': f"https://example.org/wiki/Page_{doc_id}",
+                                     'content': 'shared topic ' + random_text(rng, 400)}
+        # 41-45 copy 1-5 exactly (redirects), 46-50 are mirrors of 6-10 with one word edited
+        for doc_id in range(41, 46):
+            cls.documents[doc_id] = dict(cls.documents[doc_id - 40], title=f"Redirect {doc_id}")
+        for doc_id in range(46, 51):
+            cls.documents[doc_id] = dict(cls.documents[doc_id - 40], title=f"Mirror {doc_id}",
+                                         content=edit(rng, cls.documents[doc_id - 40]['content'], 1))
+
+    def test_01_minhash_signatures(self):
+        """Signatures follow the documented permutations and estimate Jaccard similarity"""
+        hasher = MinHasher(64, seed=3)
+        rng = random.Random(2)
+        first = {rng.randrange(1 << 32) for _ in range(2000)}
+        second = set(list(first)[:1500]) | {rng.randrange(1 << 32) for _ in range(500)}
+        signature = hasher.signature(array('I', sorted(first)))
+        expected = [min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in first)
+                    for a, b in zip(hasher.a, hasher.b)]
+        self.assertEqual(list(signature), expected)
+
+        jaccard = len(first & second) / len(first | second)
+        similarity = estimated_similarity(signature, hasher.signature(array('I', sorted(second))))
+        self.assertAlmostEqual(similarity, jaccard, delta=0.15)
+
+        # Shingles are read back in position order; short documents are one shingle
+        processor = WhitespaceProcessor()
+        self.assertEqual(shingle_hashes(processor.process_document('a b a c d e f', 1)),
+                         shingle_hashes(processor.process_document('a b a c d e f', 2)))
+        self.assertEqual(len(shingle_hashes(processor.process_document('a b a c d e f', 1))), 3)
+        self.assertEqual(len(shingle_hashes(processor.process_document('a b', 1))), 1)
+        self.assertEqual(len(shingle_hashes({})), 0)
+
+    def test_02_detector(self):
+        """Copies and lightly edited copies map to their original; other pages do not"""
+        detector = DuplicateDetector()
+        processor = WhitespaceProcessor()
+        originals = {}
+        for doc_id, document in self.documents.items():
+            original = detector.add(doc_id, processor.process_document(document['content'], doc_id))
+            if original is not None:
+                originals[doc_id] = original
+        self.assertEqual(originals, {doc_id: doc_id - 40 for doc_id in range(41, 51)})
+        stats = detector.stats()
+        self.assertEqual(stats['documents_checked'], 50)
+        self.assertEqual(stats['duplicates'], 10)
+        # LSH compares a page with its few candidates, not with every page before it
+        self.assertLess(stats['candidate_comparisons'], 50)
+        self.assertIsNone(detector.add(99, {}))
+
+    def test_03_skip_and_collapse(self):
+        """Skipped duplicates are not indexed; collapsed ones give one result per group"""
+        plain = Indexer(Trie())
+        plain.build_index(self.documents, WhitespaceProcessor())
+        skipping = Indexer(Trie())
+        skipping.build_index(self.documents, WhitespaceProcessor(), duplicates='skip')
+        self.assertEqual(skipping.total_documents, 40)
+        self.assertEqual(skipping.duplicate_stats['duplicates'], 10)
+        self.assertEqual(skipping.duplicate_stats['skipped_positions'],
+                         plain.index_stats['total_terms'] - skipping.index_stats['total_terms'])
+        engine = SearchEngine(skipping.trie, self.documents, indexer=skipping, processor=WhitespaceProcessor())
+        self.assertEqual(len(engine.search('shared topic')), 40)
+
+        collapsing = Indexer(Trie())
+        collapsing.build_index(self.documents, WhitespaceProcessor(), duplicates='collapse')
+        self.assertEqual(collapsing.total_documents, 50)
+        for ranking in ['frequency', 'bm25']:
+            uncollapsed = SearchEngine(collapsing.trie, self.documents, indexer=collapsing, ranking=ranking,
+                                       processor=WhitespaceProcessor(), collapse_duplicates=False)
+            collapsed = SearchEngine(collapsing.trie, self.documents, indexer=collapsing, ranking=ranking,
+                                     processor=WhitespaceProcessor())
+            all_results = uncollapsed.search('shared topic')
+            groups = {}
+            for doc_id, score in all_results:
+                groups.setdefault(doc_id - 40 if doc_id > 40 else doc_id, (doc_id, score))
+            expected = [result for result in all_results if result in groups.values()]
+            self.assertEqual(len(expected), 40)
+            self.assertEqual(collapsed.search('shared topic'), expected)
+            for k in [1, 5, 39, 40, 60]:
+                self.assertEqual(collapsed.search('shared topic', k=k), expected[:k])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.bin')
+            collapsing.freeze()
+            collapsing.save_binary_index(path, self.documents)
+            with MappedIndex(path) as index:
+                self.assertEqual(list(index.duplicate_of), list(collapsing.duplicate_of))
+                mapped = SearchEngine(index, index.documents, indexer=index, processor=WhitespaceProcessor())
+                self.assertEqual(len(mapped.search('shared topic')), 40)
+
+        with self.assertRaises(ValueError):
+            Indexer(Trie()).build_index(self.documents, WhitespaceProcessor(), duplicates='merge')
+
+    def test_04_skipped_duplicates_leave_no_trace(self):
+        """NOT, PageRank and the saved index only see the documents that were indexed"""
+        documents = {doc_id: dict(document) for doc_id, document in self.documents.items()}
+        for doc_id, document in documents.items():
+            # Every page links to the next original; the copies all link to page 7
+            target = 7 if doc_id > 40 else doc_id % 40 + 1
+            document['links'] = {documents[target]['url']}
+        skipping = Indexer(Trie())
+        skipping.build_index(documents, WhitespaceProcessor(), duplicates='skip')
+        self.assertEqual(sorted(skipping.skipped_duplicates), list(range(41, 51)))
+
+        engine = SearchEngine(skipping.trie, documents, indexer=skipping, processor=WhitespaceProcessor())
+        self.assertEqual([doc_id for doc_id, _ in engine.search('NOT missing')], list(range(1, 41)))
+        self.assertEqual(engine.search('NOT topic'), [])
+
+        originals = {doc_id: documents[doc_id] for doc_id in range(1, 41)}
+        expected = pagerank(build_link_graph(originals))
+        self.assertEqual(list(skipping.static_scores[:41]), list(expected))
+        self.assertTrue(all(score == 0 for score in skipping.static_scores[41:]))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.bin')
+            skipping.freeze()
+            skipping.save_binary_index(path, documents)
+            with MappedIndex(path) as index:
+                self.assertEqual(sorted(index.documents), list(range(1, 41)))
+                mapped = SearchEngine(index, index.documents, indexer=index, processor=WhitespaceProcessor())
+                self.assertEqual([doc_id for doc_id, _ in mapped.search('NOT missing')], list(range(1, 41)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+# tests/test_pipeline.py
+
+import sys
+import os
+import threading
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.pipeline import IndexingPipeline
+from tests.helpers import WhitespaceProcessor
+
+
+PAGES = [
+    {'title': 'Alpha', 'content': 'search engines index pages', 'url': 'u1', 'links': {'u2'}},
+    {'title': 'Beta', 'content': 'inverted index of terms', 'url': 'u2', 'links': set()},
+    {'title': 'Gamma', 'content': 'crawlers fetch pages', 'url': 'u3', 'links': {'u9'}},
+    {'title': 'Delta', 'content': 'ranking pages by relevance', 'url': 'u4', 'links': set()},
+]
+
+
+class StubCrawler:
+    """Yields PAGES like WebCrawler.iter_pages, optionally pausing after `pause_after` pages"""
+
+    def __init__(self, pages=PAGES, pause_after=None):
+        self.pages = pages
+        self.pause_after = pause_after
+        self.paused = threading.Event()
+        self.resume = threading.Event()
+        self.yielded = 0
+
+    def iter_pages(self, start_urls, max_pages=10, max_depth=0):
+        for order, page in enumerate(self.pages[:max_pages], 1):
+            if order - 1 == self.pause_after:
+                self.paused.set()
+                self.resume.wait(5)
+            self.yielded += 1
+            yield order, dict(page)
+
+
+class FailingCrawler:
+    def iter_pages(self, start_urls, max_pages=10, max_depth=0):
+        yield 1, dict(PAGES[0])
+        raise ConnectionError("crawl failed")
+
+
+class TestPipeline(unittest.TestCase):
+    def _pipeline(self, crawler, **options):
+        return IndexingPipeline(crawler, Indexer(Trie()), WhitespaceProcessor(), **options)
+
+    def test_01_run_indexes_every_page(self):
+        """run() streams every page into the index and finishes the statistics"""
+        pipeline = self._pipeline(StubCrawler(), ranking='bm25')
+        documents = pipeline.run(['start'])
+        self.assertEqual(sorted(document['title'] for document in documents.values()),
+                         ['Alpha', 'Beta', 'Delta', 'Gamma'])
+        self.assertEqual(pipeline.indexer.total_documents, 4)
+        self.assertEqual(pipeline.indexer.index_stats['total_terms'], 15)
+        self.assertEqual(len(pipeline.search('pages')), 3)
+        self.assertEqual([documents[doc_id]['title'] for doc_id, _ in pipeline.search('inverted index')],
+                         ['Beta'])
+        self.assertTrue(documents[1]['has_internal_links'])
+        self.assertFalse(documents[2]['has_internal_links'])
+
+    def test_02_search_while_crawling(self):
+        """Queries see the pages indexed so far while the crawl is paused"""
+        crawler = StubCrawler(pause_after=2)
+        pipeline = self._pipeline(crawler)
+        pipeline.start(['start'])
+        self.assertTrue(crawler.paused.wait(5))
+        # The two pages before the pause are indexed once the stages catch up
+        for _ in range(100):
+            if pipeline.indexer.total_documents == 2:
+                break
+            threading.Event().wait(0.01)
+        self.assertTrue(pipeline.is_running())
+        self.assertEqual(len(pipeline.search('index')), 2)
+        self.assertEqual(pipeline.search('crawlers'), [])
+
+        crawler.resume.set()
+        pipeline.wait()
+        self.assertFalse(pipeline.is_running())
+        self.assertEqual(len(pipeline.search('crawlers')), 1)
+
+    def test_03_backpressure_and_errors(self):
+        """A stalled indexer stops the crawl once the buffers are full; stage errors are re-raised"""
+        # Distinct URLs: a URL crawled again would replace its document
+        crawler = StubCrawler(pages=[dict(page, url=f"{page['url']}-{copy}") for copy in range(5) for page in PAGES])
+        pipeline = self._pipeline(crawler, buffer_size=1)
+        with pipeline.lock:
+            pipeline.start(['start'], max_pages=20)
+            threading.Event().wait(0.2)
+            # One page waits in each stage and one in each queue
+            self.assertLessEqual(crawler.yielded, 5)
+            self.assertEqual(pipeline.indexer.total_documents, 0)
+        pipeline.wait()
+        self.assertEqual(pipeline.indexer.total_documents, 20)
+
+        pipeline = self._pipeline(FailingCrawler())
+        with self.assertRaises(ConnectionError):
+            pipeline.run(['start'])
+
+
+if __name__ == "__main__":
+    unittest.main()
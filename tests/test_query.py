@@ -0,0 +1,129 @@
+# tests/test_query.py
+
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.postings import union_sorted, difference_sorted, phrase_starts, near_positions
+from src.query_parser import (
+    parse_query, has_operators, TermNode, PhraseNode, AndNode, OrNode, NotNode, NearNode
+)
+from src.query_executor import QueryExecutor
+from tests.helpers import WhitespaceProcessor
+
+
+DOCUMENTS = {
+    1: "the quick brown fox jumps over the lazy dog",
+    2: "brown dog meets quick fox",
+    3: "lazy brown cat",
+    4: "quick quick brown brown fox fox",
+    5: "dog",
+}
+
+
+class TestQuery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Index the documents with positions counted after stop word removal"""
+        processor = WhitespaceProcessor(stop_words={'the'})
+        cls.trie = Trie()
+        frozen = Trie()
+        for doc_id, text in DOCUMENTS.items():
+            word_positions = {}
+            for position, token in enumerate(processor.process_query(text)):
+                word_positions.setdefault(token, []).append(position)
+            cls.trie.insert_document(doc_id, word_positions)
+            frozen.insert_document(doc_id, word_positions)
+        cls.frozen = frozen.freeze()
+        cls.executors = [QueryExecutor(trie, processor, DOCUMENTS) for trie in [cls.trie, cls.frozen]]
+
+    def _matches(self, query):
+        results = [executor.execute(parse_query(query))[0] for executor in self.executors]
+        self.assertEqual(results[0], results[1])
+        return results[0]
+
+    def test_01_parser_precedence(self):
+        """OR binds loosest, then AND, NOT and NEAR/n"""
+        node = parse_query('a b OR NOT c NEAR/3 "d e"')
+        self.assertIsInstance(node, OrNode)
+        left, right = node.children
+        self.assertIsInstance(left, AndNode)
+        self.assertEqual([child.text for child in left.children], ['a', 'b'])
+        self.assertIsInstance(right, NotNode)
+        self.assertIsInstance(right.child, NearNode)
+        self.assertEqual(right.child.distance, 3)
+        self.assertIsInstance(right.child.left, TermNode)
+        self.assertIsInstance(right.child.right, PhraseNode)
+
+        node = parse_query('(a OR b) AND c')
+        self.assertIsInstance(node, AndNode)
+        self.assertIsInstance(node.children[0], OrNode)
+
+    def test_02_parser_is_forgiving(self):
+        """Malformed queries parse without errors"""
+        self.assertIsNone(parse_query(''))
+        self.assertIsNone(parse_query('AND OR ( )'))
+        self.assertEqual(parse_query('a OR').text, 'a')
+        self.assertEqual(parse_query('"a b').text, 'a b')
+        self.assertIsInstance(parse_query('(a OR b'), OrNode)
+        self.assertIsInstance(parse_query('a ) b'), AndNode)
+        self.assertFalse(has_operators('quick brown comput*'))
+        self.assertFalse(has_operators('cats and dogs or not'))
+        self.assertTrue(has_operators('"quick brown"'))
+        self.assertTrue(has_operators('quick NEAR/2 fox'))
+
+    def test_03_merge_primitives(self):
+        """Sorted list merges and position walks"""
+        self.assertEqual(union_sorted([[1, 3, 5], [2, 3], []]), [1, 2, 3, 5])
+        self.assertEqual(difference_sorted([1, 2, 3, 5, 8], [2, 5, 6]), [1, 3, 8])
+        self.assertEqual(phrase_starts([[1, 4, 9], [2, 7, 10], [3, 11]]), [1, 9])
+        self.assertEqual(phrase_starts([[5], [2]]), [])
+        self.assertEqual(near_positions([1, 20], [4, 30], 3), [1, 4])
+        self.assertEqual(near_positions([1, 20], [5, 30], 3), [])
+        # A position is not near itself
+        self.assertEqual(near_positions([1, 5], [1, 5], 3), [])
+        self.assertEqual(near_positions([1, 3], [1, 3], 3), [1, 3])
+
+    def test_04_boolean_queries(self):
+        """AND, OR and NOT combine document sets"""
+        self.assertEqual(self._matches('quick fox'), [1, 2, 4])
+        self.assertEqual(self._matches('quick AND dog'), [1, 2])
+        self.assertEqual(self._matches('cat OR dog'), [1, 2, 3, 5])
+        self.assertEqual(self._matches('brown NOT dog'), [3, 4])
+        self.assertEqual(self._matches('NOT brown'), [5])
+        self.assertEqual(self._matches('(cat OR fox) AND NOT quick'), [3])
+        self.assertEqual(self._matches('unicorn OR cat'), [3])
+        self.assertEqual(self._matches('unicorn AND cat'), [])
+
+    def test_05_phrase_and_proximity(self):
+        """Phrases need adjacent positions, NEAR/n nearby ones"""
+        self.assertEqual(self._matches('"quick brown"'), [1, 4])
+        self.assertEqual(self._matches('"brown fox"'), [1, 4])
+        self.assertEqual(self._matches('"the lazy dog"'), [1])
+        self.assertEqual(self._matches('"fox brown"'), [])
+        self.assertEqual(self._matches('fox NEAR/1 brown'), [1, 4])
+        self.assertEqual(self._matches('dog NEAR/1 fox'), [])
+        self.assertEqual(self._matches('dog NEAR/3 fox'), [2])
+        self.assertEqual(self._matches('dog NEAR/4 fox'), [1, 2])
+        self.assertEqual(self._matches('"quick brown" NEAR/2 jumps'), [])
+        self.assertEqual(self._matches('"quick brown" NEAR/3 jumps'), [1])
+        self.assertEqual(self._matches('qu* NEAR/1 fox'), [2])
+        # The same term needs two occurrences
+        self.assertEqual(self._matches('fox NEAR/3 fox'), [4])
+        self.assertEqual(self._matches('dog NEAR/3 dog'), [])
+        self.assertEqual(self._matches('quick NEAR/1 qu*'), [4])
+
+    def test_06_scoring_terms(self):
+        """Terms under NOT are excluded from ranking"""
+        doc_ids, occurrence_lists, term_ids = self.executors[0].execute(parse_query('"quick brown" NOT cat'))
+        self.assertEqual(doc_ids, [1, 4])
+        self.assertEqual(term_ids, [self.trie.search('quick')[1], self.trie.search('brown')[1]])
+        self.assertEqual(len(occurrence_lists), 2)
+        self.assertEqual(self.executors[0].execute(parse_query('the')), ([], [], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
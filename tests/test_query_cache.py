@@ -0,0 +1,76 @@
+# tests/test_query_cache.py
+
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.query_cache import QueryCache
+from src.searcher import SearchEngine
+from tests.helpers import WhitespaceProcessor
+
+
+DOCUMENTS = {
+    1: {'title': 'One', 'content': 'query cache hit', 'url': 'u1', 'links': set()},
+    2: {'title': 'Two', 'content': 'cache miss and cache eviction', 'url': 'u2', 'links': set()},
+    3: {'title': 'Three', 'content': 'index generation', 'url': 'u3', 'links': set()},
+}
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_01_lru_eviction(self):
+        """Least recently used entries go first, by entry count and by result count"""
+        cache = QueryCache(max_entries=2, max_results=5)
+        cache.put('a', 0, [(1, 1.0)])
+        cache.put('b', 0, [(2, 1.0)])
+        self.assertEqual(cache.get('a', 0), [(1, 1.0)])
+        cache.put('c', 0, [(3, 1.0)])
+        self.assertIsNone(cache.get('b', 0))
+        self.assertEqual(cache.get('c', 0), [(3, 1.0)])
+        cache.put('d', 0, [(doc_id, 1.0) for doc_id in range(4)])
+        self.assertEqual(list(cache.entries), ['c', 'd'])
+        cache.put('e', 0, [(doc_id, 1.0) for doc_id in range(2)])
+        self.assertEqual(list(cache.entries), ['e'])
+        self.assertEqual(cache.stats()['evictions'], 4)
+        # Another generation empties the cache
+        self.assertIsNone(cache.get('d', 1))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_02_search_engine_cache(self):
+        """Repeated and reordered queries hit the cache; index changes invalidate it"""
+        processor = WhitespaceProcessor()
+        indexer = Indexer(Trie())
+        documents = dict(DOCUMENTS)
+        for doc_id, doc_data in documents.items():
+            indexer.add_document(doc_id, doc_data, processor)
+        indexer.finish_index()
+        engine = SearchEngine(indexer.trie, documents, indexer=indexer, processor=processor)
+        results = engine.search('cache query')
+        self.assertEqual([doc_id for doc_id, _ in results], [1])
+        self.assertEqual(engine.search('query  cache'), results)
+        self.assertEqual(engine.search('cache', ranking='bm25'), engine.search('cache', ranking='bm25'))
+        stats = engine.cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+
+        # Changing the cached list does not change the cache
+        engine.search('cache query').clear()
+        self.assertEqual(engine.search('cache query'), results)
+
+        documents[4] = {'title': 'Four', 'content': 'query cache', 'url': 'u4', 'links': set()}
+        indexer.add_document(4, documents[4], processor)
+        self.assertEqual({doc_id for doc_id, _ in engine.search('cache query')}, {1, 4})
+        indexer.delete_document(1)
+        del documents[1]
+        engine.refresh_statistics()
+        self.assertEqual([doc_id for doc_id, _ in engine.search('cache query')], [4])
+
+        uncached = SearchEngine(indexer.trie, documents, indexer=indexer, processor=processor, cache_size=0)
+        self.assertEqual(uncached.search('cache query'), engine.search('cache query'))
+        self.assertIsNone(uncached.cache_stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+# tests/test_ranking.py
+
+import sys
+import os
+import random
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.ranking import FrequencyPositionScorer, BM25Scorer, StaticPrior, rank_all, rank_top_k
+from src.postings import UnionOccurrenceList
+from src.vector_ranking import VectorRanker, HAS_NUMPY
+
+
+class TokenListProcessor:
+    """Processor for documents whose content is already a list of terms"""
+
+    def process_document(self, tokens, doc_id):
+        word_positions = {}
+        for position, token in enumerate(tokens):
+            word_positions.setdefault(token, []).append(position)
+        return word_positions
+
+
+class TestRanking(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Build a random index with terms of very different frequencies"""
+        rng = random.Random(7)
+        vocabulary = [f"term{number}" for number in range(40)]
+        weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+        documents = {
+            doc_id: {'title': f"Document {doc_id}",
+                     'content': rng.choices(vocabulary, weights=weights, k=rng.randint(5, 60))}
+            for doc_id in range(1, 601)
+        }
+        cls.documents = documents
+        cls.indexer = Indexer(Trie())
+        cls.indexer.build_index(documents, TokenListProcessor())
+        cls.trie = cls.indexer.trie
+        cls.frozen_indexer = Indexer(Trie())
+        cls.frozen_indexer.build_index(documents, TokenListProcessor())
+        cls.frozen = cls.frozen_indexer.freeze()
+        cls.scorer = FrequencyPositionScorer()
+        cls.queries = [
+            ['term0'], ['term0', 'term1'], ['term3', 'term0', 'term25'],
+            ['term10', 'term11'], ['term2', 'term5', 'term9', 'term30'], ['term39', 'term0']
+        ]
+
+    def _lists(self, index, query):
+        return [index.get_occurrence_list(term) for term in query]
+
+    def test_01_conjunctive_top_k_matches_exhaustive(self):
+        """MaxScore top-k equals the head of the exhaustive AND ranking"""
+        for index in [self.trie, self.frozen]:
+            for query in self.queries:
+                lists = self._lists(index, query)
+                candidates = set.intersection(*(set(l.doc_ids()) for l in lists))
+                expected = rank_all(candidates, lists, self.scorer)
+                for k in [1, 3, 10, 1000]:
+                    self.assertEqual(rank_top_k(lists, self.scorer, k), expected[:k])
+
+    def test_02_disjunctive_top_k_matches_exhaustive(self):
+        """MaxScore top-k equals the head of the exhaustive OR ranking"""
+        for index in [self.trie, self.frozen]:
+            for query in self.queries:
+                lists = self._lists(index, query)
+                candidates = set().union(*(set(l.doc_ids()) for l in lists))
+                expected = rank_all(candidates, lists, self.scorer)
+                for k in [1, 3, 10, 1000]:
+                    self.assertEqual(rank_top_k(lists, self.scorer, k, conjunctive=False), expected[:k])
+
+    def test_03_bm25_matches_indexer_formula(self):
+        """BM25Scorer agrees with Indexer.calculate_bm25_score on every trie type"""
+        for indexer in [self.indexer, self.frozen_indexer]:
+            scorer = BM25Scorer(indexer)
+            for query in self.queries:
+                term_ids = [indexer.trie.search(term)[1] for term in query]
+                lists = [indexer.trie.occurrence_lists[term_id] for term_id in term_ids]
+                candidates = set().union(*(set(l.doc_ids()) for l in lists))
+                ranked = rank_all(candidates, lists, scorer, term_ids)
+                for doc_id, score in ranked[:20]:
+                    self.assertAlmostEqual(score, indexer.calculate_bm25_score(query, doc_id))
+                for k in [1, 5, 50]:
+                    self.assertEqual(rank_top_k(lists, scorer, k, conjunctive=False, term_ids=term_ids),
+                                     ranked[:k])
+                    conjunctive = rank_all(set.intersection(*(set(l.doc_ids()) for l in lists)),
+                                           lists, scorer, term_ids)
+                    self.assertEqual(rank_top_k(lists, scorer, k, term_ids=term_ids), conjunctive[:k])
+
+    def test_04_empty_inputs(self):
+        """Degenerate requests return no results"""
+        lists = self._lists(self.trie, ['term0'])
+        self.assertEqual(rank_top_k(lists, self.scorer, 0), [])
+        self.assertEqual(rank_top_k([], self.scorer, 5), [])
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+    def test_05_vector_ranker_matches_scalar(self):
+        """The NumPy ranker returns exactly the scalar rankings, top-k included"""
+        for indexer in [self.indexer, self.frozen_indexer]:
+            for scorer in [self.scorer, BM25Scorer(indexer)]:
+                ranker = VectorRanker(scorer)
+                for query in self.queries + [['term7', 'term2*']]:
+                    lists, term_ids = [], []
+                    for term in query:
+                        if term.endswith('*'):
+                            prefix = term[:-1]
+                            lists.append(UnionOccurrenceList(
+                                [indexer.trie.get_occurrence_list(word)
+                                 for word, _ in indexer.trie.prefix_search(prefix, 100)]))
+                            term_ids.append(None)
+                        else:
+                            term_id = indexer.trie.search(term)[1]
+                            lists.append(indexer.trie.occurrence_lists[term_id])
+                            term_ids.append(term_id)
+                    for conjunctive in [True, False]:
+                        sets = [set(l.doc_ids()) for l in lists]
+                        candidates = set.intersection(*sets) if conjunctive else set().union(*sets)
+                        expected = rank_all(candidates, lists, scorer, term_ids)
+                        self.assertEqual(ranker.rank(lists, conjunctive=conjunctive, term_ids=term_ids),
+                                         expected)
+                        for k in [1, 3, 10]:
+                            self.assertEqual(ranker.rank(lists, k, conjunctive, term_ids), expected[:k])
+
+    def test_06_static_prior(self):
+        """Top-k with a static prior equals the exhaustive ranking, on every backend"""
+        rng = random.Random(3)
+        # Shorter than the doc id range, so some documents have no prior
+        prior = StaticPrior([rng.random() ** 4 for _ in range(500)], weight=5.0)
+        self.assertAlmostEqual(prior.bound, 5.0)
+        self.assertEqual(prior.score(550), 0)
+        scorers = [self.scorer, BM25Scorer(self.indexer)]
+        rankers = [VectorRanker(scorer) for scorer in scorers] if HAS_NUMPY else [None, None]
+        for scorer, ranker in zip(scorers, rankers):
+            for query in self.queries:
+                lists = self._lists(self.trie, query)
+                sets = [set(l.doc_ids()) for l in lists]
+                for conjunctive in [True, False]:
+                    candidates = set.intersection(*sets) if conjunctive else set().union(*sets)
+                    expected = rank_all(candidates, lists, scorer, prior=prior)
+                    for doc_id, score in expected:
+                        self.assertEqual(score, rank_all([doc_id], lists, scorer)[0][1] + prior.score(doc_id))
+                    for k in [1, 3, 10, 1000]:
+                        self.assertEqual(rank_top_k(lists, scorer, k, conjunctive, prior=prior), expected[:k])
+                        if ranker is not None:
+                            self.assertEqual(ranker.rank(lists, k, conjunctive, prior=prior), expected[:k])
+
+    def test_07_bm25_after_freeze(self):
+        """A scorer for the mutable trie keeps its scores once the indexer is frozen"""
+        indexer = Indexer(Trie())
+        indexer.build_index(self.documents, TokenListProcessor())
+        mutable = indexer.trie
+        scorer = BM25Scorer(indexer)
+
+        def ranking(trie, scorer):
+            rankings = []
+            for query in self.queries:
+                term_ids = [trie.search(term)[1] for term in query]
+                lists = [trie.occurrence_lists[term_id] for term_id in term_ids]
+                rankings.append(rank_top_k(lists, scorer, 20, conjunctive=False, term_ids=term_ids))
+            return rankings
+
+        expected = ranking(mutable, scorer)
+        frozen = indexer.freeze()
+        self.assertEqual(ranking(mutable, scorer), expected)
+        self.assertEqual(ranking(mutable, BM25Scorer(indexer, trie=mutable)), expected)
+        for actual, expected_top in zip(ranking(frozen, BM25Scorer(indexer)), expected):
+            self.assertEqual([doc_id for doc_id, _ in actual], [doc_id for doc_id, _ in expected_top])
+            for (_, score), (_, expected_score) in zip(actual, expected_top):
+                self.assertAlmostEqual(score, expected_score)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -165,11 +165,11 @@ class TestSearchEngine(unittest.TestCase):
         """Test hyperlink verification"""
         print("\nTesting hyperlink verification...")
         link_count = 0
+        crawled_urls = set(self.test_urls) | {doc_data['url'] for doc_data in self.documents.values()}
         for doc_data in self.documents.values():
-            content = doc_data['content'].lower()
-            for url in self.test_urls:
-                if url.lower() in content:
-                    link_count += 1
+            # Links are kept in their own field, not appended to the content
+            self.assertIn('has_internal_links', doc_data)
+            link_count += len((doc_data['links'] & crawled_urls) - {doc_data['url']})
         
         print(f"Found {link_count} hyperlinks between documents")
         self.assertGreater(link_count, 0, "No hyperlinks found between documents")
@@ -0,0 +1,208 @@
+# tests/test_searcher.py
+
+import sys
+import os
+import subprocess
+import string
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.text_processor import TextProcessor, fast_tokenize, ENGLISH_STOP_WORDS
+from src.indexer import Indexer
+from src.searcher import SearchEngine
+from src.index_file import MappedIndex
+from src.vector_ranking import HAS_NUMPY
+
+DOCUMENTS = {
+    1: {'title': 'Computer', 'url': 'https://example.org/wiki/Computer', 'links': set(),
+        'content': 'A computer is a machine that can be programmed to carry out computations. '
+                   'Modern computers can perform generic sets of operations known as programs.'},
+    2: {'title': 'Computing', 'url': 'https://example.org/wiki/Computing', 'links': set(),
+        'content': 'Computing is any goal-oriented activity requiring computing machinery. '
+                   'It includes the study of algorithms and data structures.'},
+    3: {'title': 'Data structure', 'url': 'https://example.org/wiki/Data_structure', 'links': set(),
+        'content': 'In computer science, a data structure is a data organization and storage '
+                   'format chosen for efficient access to data. Data structures are studied '
+                   'alongside algorithms.'},
+    4: {'title': 'Python', 'url': 'https://example.org/wiki/Python', 'links': set(),
+        'content': 'Python is a high-level programming language. Python code is readable and '
+                   'python programs run on many platforms.'},
+    5: {'title': 'Algorithm', 'url': 'https://example.org/wiki/Algorithm', 'links': set(),
+        'content': 'An algorithm is a finite sequence of instructions. Algorithms are used for '
+                   'calculation and data processing in a computer program.'},
+}
+
+
+class TestSearcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Index a fixed set of documents without crawling"""
+        cls.processor = TextProcessor()
+        cls.trie = Trie()
+        cls.indexer = Indexer(cls.trie)
+        cls.indexer.build_index(DOCUMENTS, cls.processor)
+        cls.search_engine = SearchEngine(cls.trie, DOCUMENTS, indexer=cls.indexer)
+
+    def test_01_conjunctive_search(self):
+        """All query terms must occur in a result"""
+        results = self.search_engine.search("data structure")
+        self.assertEqual({doc_id for doc_id, _ in results}, {2, 3})
+        self.assertEqual(self.search_engine.search("python algorithm"), [])
+        self.assertEqual(self.search_engine.search(""), [])
+
+    def test_02_wildcard_search(self):
+        """A trailing * matches every term with that prefix"""
+        results = self.search_engine.search("comput*")
+        self.assertEqual({doc_id for doc_id, _ in results}, {1, 2, 3, 5})
+        results = self.search_engine.search("comput* python")
+        self.assertEqual(results, [])
+        results = self.search_engine.search("algorithm*  data")
+        self.assertEqual({doc_id for doc_id, _ in results}, {2, 3, 5})
+        self.assertEqual(self.search_engine.search("zzz*"), [])
+
+    def test_03_autocomplete(self):
+        """Completions come from the trie, most frequent first"""
+        completions = self.search_engine.autocomplete("comp")
+        self.assertEqual(completions[0], 'comput')
+        self.assertTrue(all(word.startswith('comp') for word in completions))
+        self.assertEqual(self.search_engine.autocomplete("COMP", limit=1), ['comput'])
+        self.assertEqual(self.search_engine.autocomplete("!!"), [])
+
+    def test_04_top_k_matches_full_ranking(self):
+        """search(query, k) returns the first k results of a full search"""
+        for query in ["data", "comput*", "algorithm data", "python"]:
+            full = self.search_engine.search(query)
+            for k in [1, 2, 10]:
+                self.assertEqual(self.search_engine.search(query, k=k), full[:k])
+
+    def test_05_bm25_ranking(self):
+        """BM25 mode ranks with the precomputed index statistics"""
+        results = self.search_engine.search("data algorithm", ranking='bm25')
+        self.assertEqual({doc_id for doc_id, _ in results}, {2, 3, 5})
+        query_terms = self.processor.process_query("data algorithm")
+        for doc_id, score in results:
+            self.assertAlmostEqual(score, self.indexer.calculate_bm25_score(query_terms, doc_id))
+        self.assertEqual(self.search_engine.search("data algorithm", k=2, ranking='bm25'), results[:2])
+
+        with self.assertRaises(ValueError):
+            SearchEngine(self.trie, DOCUMENTS, ranking='bm25')
+        with self.assertRaises(ValueError):
+            self.search_engine.search("data", ranking='tfidf')
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+    def test_06_numpy_backend(self):
+        """The vectorised backend returns the same results as the Python one"""
+        vector_engine = SearchEngine(self.trie, DOCUMENTS, indexer=self.indexer, backend='numpy')
+        for query in ["data", "comput*", "algorithm data", "python program", "zzz",
+                      'python OR data', '"data structure" NOT python']:
+            for ranking in ['frequency', 'bm25']:
+                for k in [None, 1, 3]:
+                    self.assertEqual(vector_engine.search(query, k=k, ranking=ranking),
+                                     self.search_engine.search(query, k=k, ranking=ranking))
+        with self.assertRaises(ValueError):
+            SearchEngine(self.trie, DOCUMENTS, backend='gpu')
+
+    def test_07_boolean_and_phrase_queries(self):
+        """Operators, phrases and proximity go through the query parser"""
+        results = self.search_engine.search('python OR algorithm')
+        self.assertEqual({doc_id for doc_id, _ in results}, {2, 3, 4, 5})
+        self.assertEqual(self.search_engine.search('data NOT computer'), [])
+        results = self.search_engine.search('"data structure"')
+        self.assertEqual({doc_id for doc_id, _ in results}, {2, 3})
+        results = self.search_engine.search('computer NEAR/1 program')
+        self.assertEqual([doc_id for doc_id, _ in results], [5])
+        results = self.search_engine.search('computer NEAR/2 program')
+        self.assertEqual({doc_id for doc_id, _ in results}, {1, 5})
+        results = self.search_engine.search('comput* AND NOT "data structure"', ranking='bm25')
+        self.assertEqual({doc_id for doc_id, _ in results}, {1, 5})
+        results = self.search_engine.search('python OR algorithm')
+        self.assertEqual(self.search_engine.search('python OR algorithm', k=2), results[:2])
+
+    def test_08_or_fallback(self):
+        """A plain query without a conjunctive match can fall back to OR"""
+        self.assertEqual(self.search_engine.search("python algorithm"), [])
+        results = self.search_engine.search("python algorithm unknownword", or_fallback=True)
+        self.assertEqual({doc_id for doc_id, _ in results}, {2, 3, 4, 5})
+        fallback_engine = SearchEngine(self.trie, DOCUMENTS, indexer=self.indexer, or_fallback=True)
+        self.assertEqual(fallback_engine.search("python algorithm"), results)
+        self.assertEqual(fallback_engine.search("python algorithm", k=1), results[:1])
+        self.assertEqual(fallback_engine.search("python data"),
+                         self.search_engine.search("python OR data"))
+
+    def test_09_snippets(self):
+        """Snippets come from the original text around the query terms"""
+        query_terms = self.processor.process_query("data structures")
+        snippet = self.search_engine.get_snippet(3, query_terms)
+        self.assertTrue(snippet.startswith("In computer science, a data structure is"))
+        self.assertTrue(snippet.endswith("alongside algorithms."))
+        snippet = self.search_engine.get_snippet(2, query_terms, highlight=True)
+        self.assertIn("**data** **structures**", snippet)
+        snippet = self.search_engine.get_snippet(4, query_terms, max_length=20)
+        self.assertTrue(snippet.endswith('...'))
+        self.assertLessEqual(len(snippet), 23)
+        self.assertEqual(self.search_engine.get_snippet(99, query_terms), "")
+
+        # Without token offsets the document text is scanned instead
+        scanning_engine = SearchEngine(self.trie, DOCUMENTS)
+        self.assertIn("data structure", scanning_engine.get_snippet(3, query_terms))
+
+    def test_10_fast_tokenizer_and_stem_cache(self):
+        """The fast tokenizer matches word_tokenize on cleaned text; stems are memoised"""
+        processor = TextProcessor()
+        text = processor.preprocess_text("I cannot say I wanna, it's gonna be a machine-learning test")
+        self.assertEqual(fast_tokenize(text), processor.tokenize(text))
+        self.assertEqual(fast_tokenize(text)[1:3], ['can', 'not'])
+
+        slow_processor = TextProcessor(fast_tokenizer=False)
+        for doc_data in DOCUMENTS.values():
+            self.assertEqual(processor.process_document(doc_data['content'], 0),
+                             slow_processor.process_document(doc_data['content'], 0))
+        processor.process_query("computers computing computer")
+        info = processor.stem_cache_info()
+        self.assertGreater(info['hits'], 0)
+        self.assertEqual(info['hit_rate'], info['hits'] / (info['hits'] + info['misses']))
+
+    def test_11_lazy_nltk(self):
+        """Importing the search engine does not load NLTK; stop words work offline"""
+        code = "import sys; import src.searcher; print('nltk' in sys.modules)"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+        self.assertEqual(output.stdout.strip(), 'False')
+        self.assertIn('the', self.processor.stop_words)
+        self.assertLessEqual({'the', 'and', 'of', 'is'}, ENGLISH_STOP_WORDS)
+
+    def test_12_wildcard_matches_every_completion(self):
+        """A wildcard with more completions than any cap still finds the rarest one"""
+        letters = string.ascii_lowercase[:13]
+        documents = {doc_id: {'title': f"Page {doc_id}", 'url': f"https://example.org/wiki/{doc_id}",
+                              'content': f"comp{first}{second}x common"}
+                     for doc_id, (first, second) in enumerate(
+                         ((first, second) for first in letters for second in letters), 1)}
+        documents[999] = {'title': 'Rare', 'url': 'https://example.org/wiki/Rare', 'content': 'compzzz rare'}
+        indexer = Indexer(Trie())
+        indexer.build_index(documents, self.processor)
+        mutable = SearchEngine(indexer.trie, documents, indexer=indexer, processor=self.processor)
+        self.assertEqual([doc_id for doc_id, _ in mutable.search('comp* rare')], [999])
+        self.assertEqual(len(mutable.search('comp*')), len(documents))
+        capped = SearchEngine(indexer.trie, documents, indexer=indexer, processor=self.processor,
+                              max_wildcard_expansions=100)
+        self.assertEqual(len(capped.search('comp*')), 100)
+
+        indexer.freeze()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'index.bin')
+            indexer.save_binary_index(path, documents)
+            with MappedIndex(path) as index:
+                engines = [SearchEngine(indexer.trie, documents, indexer=indexer, processor=self.processor),
+                           SearchEngine(index, index.documents, indexer=index, processor=self.processor)]
+                for engine in engines:
+                    self.assertEqual([doc_id for doc_id, _ in engine.search('comp* rare')], [999])
+                    self.assertEqual([doc_id for doc_id, _ in engine.search('comp* AND rare')], [999])
+                    self.assertEqual(len(engine.search('comp*')), len(documents))
+
+
+if __name__ == "__main__":
+    unittest.main()
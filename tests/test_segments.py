@@ -0,0 +1,134 @@
+# tests/test_segments.py
+
+import sys
+import os
+import contextlib
+import io
+import random
+import threading
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.segments import SegmentedIndex
+from src.searcher import SearchEngine
+from tests.helpers import WhitespaceProcessor
+
+
+WORDS = ['index', 'trie', 'search', 'query', 'rank', 'stem', 'token', 'page', 'merge', 'segment']
+
+
+def make_document(doc_id, version, rng):
+    content = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+    return {'title': f"Document {doc_id} v{version}", 'content': content,
+            'url': f"https://example.org/{doc_id}", 'links': set()}
+
+
+def apply_updates(indexer, seed=0, operations=300):
+    """
+    Random adds, updates and deletes; returns the live documents
+    """
+    rng = random.Random(seed)
+    processor = WhitespaceProcessor()
+    documents = {}
+    for step in range(operations):
+        doc_id = rng.randint(1, 40)
+        if doc_id in documents and rng.random() < 0.3:
+            indexer.delete_document(doc_id)
+            del documents[doc_id]
+        else:
+            documents[doc_id] = make_document(doc_id, step, rng)
+            indexer.update_document(doc_id, documents[doc_id], processor)
+    return documents
+
+
+def rebuild(documents):
+    indexer = Indexer(Trie())
+    with contextlib.redirect_stdout(io.StringIO()):
+        indexer.build_index(documents, WhitespaceProcessor())
+    return indexer
+
+
+class TestSegments(unittest.TestCase):
+    def _assert_same_index(self, indexer, expected):
+        self.assertEqual(indexer.index_stats, expected.index_stats)
+        self.assertEqual(indexer.document_vectors, expected.document_vectors)
+        for word in WORDS:
+            occurrence_list = indexer.trie.get_occurrence_list(word)
+            expected_list = expected.trie.get_occurrence_list(word)
+            self.assertEqual(list(occurrence_list.doc_ids()), list(expected_list.doc_ids()))
+            for doc_id in expected_list.doc_ids():
+                self.assertEqual(list(occurrence_list.get_positions(doc_id)),
+                                 expected_list.get_positions(doc_id))
+                self.assertEqual(occurrence_list.term_frequency(doc_id), expected_list.term_frequency(doc_id))
+
+    def test_01_updates_match_rebuild(self):
+        """Adds, updates and deletes over segments give the index of a full rebuild"""
+        for index in [Trie(), SegmentedIndex(flush_threshold=5, max_segments=3)]:
+            indexer = Indexer(index)
+            documents = apply_updates(indexer)
+            expected = rebuild(documents)
+            self._assert_same_index(indexer, expected)
+            self.assertFalse(indexer.delete_document(999))
+            # Freezing merges everything into a FrozenTrie without the deleted documents
+            frozen = index.freeze()
+            for word in WORDS:
+                self.assertEqual(list(frozen.get_occurrence_list(word).doc_ids()),
+                                 list(expected.trie.get_occurrence_list(word).doc_ids()))
+
+    def test_02_segments_are_merged(self):
+        """Flushes create frozen segments with tombstones; merges keep their number bounded"""
+        index = SegmentedIndex(flush_threshold=4, max_segments=2)
+        indexer = Indexer(index)
+        documents = apply_updates(indexer, seed=1)
+        self.assertLessEqual(len(index.frozen_segments), 2)
+        self.assertTrue(any(segment.deleted for segment in index.frozen_segments))
+        index.merge()
+        self.assertEqual(len(index.frozen_segments), 1)
+        self.assertFalse(index.frozen_segments[0].deleted)
+        self._assert_same_index(indexer, rebuild(documents))
+
+        background = SegmentedIndex(flush_threshold=4, max_segments=2, background_merge=True)
+        indexer = Indexer(background)
+        documents = apply_updates(indexer, seed=2)
+        background.wait_for_merge()
+        self._assert_same_index(indexer, rebuild(documents))
+
+    def test_03_search_after_updates(self):
+        """SearchEngine over a SegmentedIndex ranks like one over a rebuilt index"""
+        indexer = Indexer(SegmentedIndex(flush_threshold=5))
+        documents = apply_updates(indexer, seed=3)
+        indexer.finish_index()
+        processor = WhitespaceProcessor()
+        engine = SearchEngine(indexer.trie, documents, indexer=indexer, processor=processor)
+        expected = rebuild(documents)
+        expected_engine = SearchEngine(expected.trie, documents, indexer=expected, processor=processor)
+        for query in ['index', 'merge segment', 'page OR stem', 'query NOT rank', '"trie search"', 'seg*']:
+            for ranking in ['frequency', 'bm25']:
+                self.assertEqual(engine.search(query, ranking=ranking),
+                                 expected_engine.search(query, ranking=ranking), (query, ranking))
+        self.assertEqual(engine.autocomplete('se'), expected_engine.autocomplete('se'))
+        self.assertEqual([word for word, _ in indexer.trie.prefix_terms('s')],
+                         [word for word, _ in expected.trie.prefix_terms('s')])
+
+    def test_04_concurrent_merges(self):
+        """A merge called during a background merge does not merge the same segments twice"""
+        # Enough terms that the second merge starts before the first one ends
+        words = {f"w{number}": [number] for number in range(5000)}
+        for _ in range(5):
+            index = SegmentedIndex(flush_threshold=1, max_segments=1, background_merge=True)
+            index.insert_document(1, dict(words, a=[0]))
+            index.insert_document(2, dict(words, a=[0]))
+            caller = threading.Thread(target=index.merge)
+            caller.start()
+            caller.join()
+            index.wait_for_merge()
+            self.assertEqual([sorted(segment.doc_ids) for segment in index.frozen_segments], [[1, 2]])
+            index.delete_document(1)
+            self.assertEqual(list(index.get_occurrence_list('a').doc_ids()), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
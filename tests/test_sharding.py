@@ -0,0 +1,75 @@
+# tests/test_sharding.py
+
+import sys
+import os
+import contextlib
+import io
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie
+from src.indexer import Indexer
+from src.searcher import SearchEngine
+from src.sharding import build_shards, partition_documents, ShardedSearchEngine
+from tests.helpers import WhitespaceProcessor
+
+
+WORDS = ['index', 'trie', 'search', 'query', 'rank', 'stem', 'token', 'page', 'shard', 'merge']
+
+QUERIES = ['index', 'shard merge', 'page OR stem', 'query NOT rank', '"trie search"', 'sh*', 'missing']
+
+
+def make_documents(count=60, seed=0):
+    rng = random.Random(seed)
+    return {
+        doc_id: {'title': f"Document {doc_id}", 'url': f"https://example.org/{doc_id}", 'links': set(),
+                 'content': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 15)))}
+        for doc_id in range(1, count + 1)
+    }
+
+
+class TestSharding(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Index the documents once as a single index and once as three shards"""
+        cls.documents = make_documents()
+        cls.processor = WhitespaceProcessor()
+        cls.directory = tempfile.mkdtemp()
+        with contextlib.redirect_stdout(io.StringIO()):
+            indexer = Indexer(Trie())
+            indexer.build_index(cls.documents, cls.processor)
+            cls.paths = build_shards(cls.documents, cls.processor, 3, cls.directory)
+        cls.engine = SearchEngine(indexer.trie, cls.documents, indexer=indexer, processor=cls.processor)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_01_partition(self):
+        """Every document lands in exactly one shard"""
+        shards = partition_documents(self.documents, 3)
+        self.assertEqual(sum(len(shard) for shard in shards), len(self.documents))
+        self.assertEqual(set(shards[1]), {doc_id for doc_id in self.documents if doc_id % 3 == 1})
+
+    def test_02_scatter_gather_matches_single_index(self):
+        """Merged shard results equal those of one index, scores included"""
+        for processes in [False, True]:
+            with ShardedSearchEngine(self.paths, self.processor, processes=processes) as sharded:
+                for query in QUERIES:
+                    # Wildcard IDF comes from shard-local document frequencies
+                    rankings = ['frequency'] if '*' in query else ['frequency', 'bm25']
+                    for ranking in rankings:
+                        for k in [None, 5]:
+                            self.assertEqual(sharded.search(query, k=k, ranking=ranking),
+                                             self.engine.search(query, k=k, ranking=ranking),
+                                             (query, ranking, k, processes))
+                doc_id = sharded.search('shard')[0][0]
+                self.assertEqual(sharded.get_document_title(doc_id), f"Document {doc_id}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# tests/test_snippets.py
+
+import sys
+import os
+import re
+import unittest
+from array import array
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.text_processor import TextProcessor
+from src.snippets import merge_hits, best_window, build_snippet, HIGHLIGHT_START, HIGHLIGHT_END
+
+
+def token_offsets(content):
+    """Offsets of every word, as an indexer would record them without stop words"""
+    offsets = array('I')
+    for match in re.finditer(r'[a-zA-Z]+', content):
+        offsets.extend(match.span())
+    return offsets
+
+
+class TestSnippets(unittest.TestCase):
+    def test_01_merge_hits(self):
+        """Hits are merged in position order and tagged with their term"""
+        self.assertEqual(merge_hits([[3, 9], [1, 4], []]), [(1, 1), (3, 0), (4, 1), (9, 0)])
+        self.assertEqual(merge_hits([]), [])
+
+    def test_02_best_window(self):
+        """The window covering the most distinct terms wins, then the most hits"""
+        hits = merge_hits([[0, 1, 2], [50], [52, 80]])
+        self.assertEqual(best_window(hits, 10), (50, 52))
+        hits = merge_hits([[0, 1, 2, 40], [41]])
+        self.assertEqual(best_window(hits, 10), (40, 41))
+        self.assertEqual(best_window(merge_hits([[5, 7, 30]]), 10), (5, 7))
+        self.assertIsNone(best_window([]))
+
+    def test_03_build_snippet(self):
+        """Snippets are cut from the original text around the hits"""
+        words = [f"word{number}" for number in range(100)]
+        words[60] = "Needle"
+        content = ' '.join(words) + '.'
+        offsets = token_offsets(content)
+        snippet = build_snippet(content, offsets, merge_hits([[60]]), max_length=1000, window_size=10)
+        self.assertEqual(snippet, ' '.join(words[57:67]))
+        snippet = build_snippet(content, offsets, merge_hits([[60]]), max_length=1000,
+                                highlight=True, window_size=10)
+        self.assertIn(f"{HIGHLIGHT_START}Needle{HIGHLIGHT_END}", snippet)
+
+        snippet = build_snippet(content, offsets, merge_hits([[60]]), max_length=30, window_size=10)
+        self.assertTrue(snippet.endswith('...'))
+        self.assertTrue(snippet.startswith('word57'))
+        self.assertLessEqual(len(snippet), 33)
+
+        # No hits: the start of the document; near the end: the last window
+        self.assertTrue(build_snippet(content, offsets, [], window_size=5).startswith('word0 '))
+        self.assertEqual(build_snippet(content, offsets, merge_hits([[99]]), window_size=5),
+                         ' '.join(words[95:]) + '.')
+        self.assertEqual(build_snippet("", array('I'), []), "")
+
+    def test_04_window_keeps_every_hit(self):
+        """The lead-in never pushes the last hit of the best window out of the snippet"""
+        words = [f"word{number}" for number in range(100)]
+        content = ' '.join(words)
+        offsets = token_offsets(content)
+        snippet = build_snippet(content, offsets, merge_hits([[40], [49]]), max_length=1000, window_size=10)
+        self.assertEqual(snippet, ' '.join(words[40:50]))
+        snippet = build_snippet(content, offsets, merge_hits([[40], [47]]), max_length=1000, window_size=10)
+        self.assertEqual(snippet, ' '.join(words[38:48]))
+
+    def test_05_align_tokens(self):
+        """Tokens are aligned with whole words, not with parts of earlier words"""
+        processor = TextProcessor()
+        text = "Theirs: the heir of Caf\u00e9 cafes."
+        tokens = ['heir', 'caf', 'cafes']
+        offsets = processor.align_tokens(text, tokens)
+        self.assertEqual([text[offsets[2 * i]:offsets[2 * i + 1]] for i in range(len(tokens))],
+                         ['heir', 'Caf', 'cafes'])
+        self.assertEqual(list(processor.align_tokens("heirs", ['heir'])), [0, 0])
+
+    def test_06_hits_survive_max_length(self):
+        """Cutting a snippet to max_length drops context before it drops the hits"""
+        content = ' '.join(f"Filler{number} describing something." for number in range(40))
+        content += " Finally Rossum appears."
+        offsets = token_offsets(content)
+        rossum = len(offsets) // 2 - 2
+        snippet = build_snippet(content, offsets, merge_hits([[rossum]]), highlight=True)
+        self.assertIn(f"{HIGHLIGHT_START}Rossum{HIGHLIGHT_END}", snippet)
+        self.assertTrue(snippet.endswith('...'))
+        self.assertLessEqual(len(snippet), 200 + 2 * len(HIGHLIGHT_START) + 3)
+
+        # Hits spread over more than max_length: the first hit still shows
+        first = rossum - 25
+        snippet = build_snippet(content, offsets, merge_hits([[first], [rossum]]), max_length=40)
+        self.assertTrue(snippet.startswith(content[offsets[2 * first]:offsets[2 * first + 1]]))
+
+
+if __name__ == "__main__":
+    unittest.main()
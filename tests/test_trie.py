@@ -0,0 +1,161 @@
+# tests/test_trie.py
+
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.trie import Trie, FrozenTrie
+from src.postings import (
+    CompactOccurrenceList, encode_positions, decode_positions, gallop, intersect_sorted
+)
+
+
+class TestTrie(unittest.TestCase):
+    def setUp(self):
+        """Build a small index without crawling"""
+        self.documents = {
+            1: {'data': [0, 4, 9], 'structur': [1], 'algorithm': [2, 7]},
+            2: {'data': [3], 'python': [0, 1, 150, 2000]},
+            3: {'python': [5], 'algorithm': [6], 'structur': [8]},
+        }
+        self.trie = Trie()
+        for doc_id, word_positions in self.documents.items():
+            self.trie.insert_document(doc_id, word_positions)
+
+    def test_01_bulk_insert_matches_per_position_insert(self):
+        """insert_document builds the same postings as insert"""
+        trie = Trie()
+        for doc_id, word_positions in self.documents.items():
+            for word, positions in word_positions.items():
+                for position in reversed(positions):
+                    trie.insert(word, doc_id, position)
+        for word in ['data', 'structur', 'algorithm', 'python']:
+            self.assertEqual(
+                trie.get_occurrence_list(word).documents,
+                self.trie.get_occurrence_list(word).documents
+            )
+
+    def test_02_varint_round_trip(self):
+        """Delta + varint encoding preserves positions"""
+        positions = [0, 1, 127, 128, 300, 16384, 2 ** 31]
+        self.assertEqual(decode_positions(encode_positions(positions)), positions)
+        self.assertEqual(decode_positions(encode_positions([])), [])
+
+    def test_03_compact_lists_read_transparently(self):
+        """Compacted lists expose the same postings as mutable ones"""
+        expected = {
+            word: dict(self.trie.get_occurrence_list(word).documents)
+            for word in ['data', 'structur', 'algorithm', 'python']
+        }
+        before = self.trie.intersection_search(['data', 'structur'])
+        self.trie.compact()
+
+        for word, documents in expected.items():
+            occurrence_list = self.trie.get_occurrence_list(word)
+            self.assertIsInstance(occurrence_list, CompactOccurrenceList)
+            self.assertEqual(dict(occurrence_list.documents), documents)
+            self.assertEqual(list(occurrence_list.doc_ids()), sorted(documents))
+            for doc_id, positions in documents.items():
+                self.assertEqual(occurrence_list.get_positions(doc_id), positions)
+                self.assertEqual(occurrence_list.term_frequency(doc_id), len(positions))
+            self.assertEqual(occurrence_list.get_positions(999), [])
+            self.assertNotIn(999, occurrence_list)
+
+        self.assertEqual(self.trie.intersection_search(['data', 'structur']), before)
+        with self.assertRaises(TypeError):
+            self.trie.insert('data', 4, 0)
+
+    def test_04_frozen_trie_keeps_search_semantics(self):
+        """A frozen trie answers lookups like the original"""
+        frozen = self.trie.freeze()
+        self.assertIsInstance(frozen, FrozenTrie)
+        self.assertEqual([word for word, _ in frozen.iter_terms()],
+                         ['algorithm', 'data', 'python', 'structur'])
+        for word in ['data', 'structur', 'algorithm', 'python', 'DATA']:
+            is_found, index = frozen.search(word)
+            self.assertTrue(is_found)
+            self.assertIs(frozen.occurrence_lists[index], frozen.get_occurrence_list(word))
+            self.assertEqual(dict(frozen.get_occurrence_list(word).documents),
+                             self.trie.get_occurrence_list(word).documents)
+        self.assertEqual(frozen.search('dat'), (False, None))
+        self.assertIsNone(frozen.get_occurrence_list('pythons'))
+        for query in [['data'], ['data', 'algorithm'], ['python', 'structur'], ['data', 'missing']]:
+            self.assertEqual(frozen.intersection_search(query), self.trie.intersection_search(query))
+        with self.assertRaises(TypeError):
+            frozen.insert_document(4, {'data': [0]})
+
+    def test_05_prefix_search(self):
+        """Completions are ranked by document frequency on every trie type"""
+        trie = Trie()
+        trie.insert_document(1, {'comput': [0], 'compil': [1], 'code': [2]})
+        trie.insert_document(2, {'comput': [0], 'compress': [1]})
+        trie.insert_document(3, {'comput': [0], 'compil': [1]})
+        expected = [('comput', 3), ('compil', 2), ('compress', 1)]
+
+        frozen = trie.freeze()
+        for index in [trie, frozen]:
+            self.assertEqual(index.prefix_search('comp'), expected)
+            self.assertEqual(index.prefix_search('COMP', limit=1), [('comput', 3)])
+            self.assertEqual(index.prefix_search('c', limit=50), expected[:2] + [('code', 1), ('compress', 1)])
+            self.assertEqual(index.prefix_search('comput'), [('comput', 3)])
+            self.assertEqual(index.prefix_search('x'), [])
+
+        # Caches are refreshed after further inserts
+        trie.insert_document(4, {'compress': [0]})
+        trie.insert_document(5, {'compress': [0]})
+        self.assertEqual(trie.prefix_search('comp', limit=2), [('compress', 3), ('comput', 3)])
+
+    def test_06_prefix_search_large_vocabulary(self):
+        """Cached and scanned prefix ranges agree with a brute-force ranking"""
+        trie = Trie()
+        words = [first + second + third + fourth for first in 'ab' for second in 'abcdefghij'
+                 for third in 'abcdefghijklmnopqrst' for fourth in 'xy']
+        for doc_id in range(1, 40):
+            trie.insert_document(doc_id, {word: [0] for number, word in enumerate(words)
+                                          if number % doc_id == 0})
+        frozen = trie.freeze()
+        for prefix in ['', 'a', 'ab', 'abc', 'b', 'bj', 'bjtx']:
+            expected = sorted(
+                ((word, len(trie.get_occurrence_list(word))) for word in words if word.startswith(prefix)),
+                key=lambda item: (-item[1], item[0])
+            )[:10]
+            self.assertEqual(trie.prefix_search(prefix), expected)
+            self.assertEqual(frozen.prefix_search(prefix), expected)
+            # prefix_terms lists every completion, in sorted order
+            completions = sorted(word for word in words if word.startswith(prefix))
+            self.assertEqual([word for word, _ in trie.prefix_terms(prefix)], completions)
+            self.assertEqual([word for word, _ in frozen.prefix_terms(prefix)], completions)
+        self.assertEqual(list(trie.prefix_terms('z')), [])
+        self.assertEqual(list(frozen.prefix_terms('z')), [])
+
+    def test_07_galloping_intersection(self):
+        """Galloping intersection matches set intersection"""
+        doc_ids = [2, 3, 5, 8, 13, 21, 34, 55, 89]
+        for target in range(0, 100):
+            for start in range(len(doc_ids) + 1):
+                expected = next((index for index in range(start, len(doc_ids))
+                                 if doc_ids[index] >= target), len(doc_ids))
+                self.assertEqual(gallop(doc_ids, target, start), expected)
+
+        trie = Trie()
+        for doc_id in range(1, 2001):
+            word_positions = {'common': [0]}
+            if doc_id % 7 == 0:
+                word_positions['seven'] = [1]
+            if doc_id % 500 == 0:
+                word_positions['rare'] = [2]
+            trie.insert_document(doc_id, word_positions)
+        frozen = trie.freeze()
+        for index in [trie, frozen]:
+            lists = [index.get_occurrence_list(word) for word in ['common', 'seven', 'rare']]
+            # No document up to 2000 is a multiple of both 7 and 500
+            self.assertEqual(intersect_sorted(lists), [])
+            self.assertEqual(intersect_sorted(lists[:2]), list(range(7, 2001, 7)))
+            self.assertEqual(intersect_sorted([lists[0], lists[2]]), [500, 1000, 1500, 2000])
+            self.assertEqual(intersect_sorted([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()